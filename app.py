@@ -1,121 +1,124 @@
-import streamlit as st
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import CrossEncoderReranker
-from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+import time
+APP_START = time.perf_counter()
 
-from src import config, data_loader, vector_store, llm
+import streamlit as st
 
-def format_docs(docs):
-    """검색된 문서를 프롬프트에 삽입할 문자열로 포맷합니다."""
-    return "\n\n".join(doc.page_content for doc in docs)
+# 무거운 모듈(langchain, faiss, torch 등)은 StartupLoader가 백그라운드에서 import합니다.
+from src import config
+from src.startup import StartupLoader
 
 @st.cache_resource
-def get_rag_chain_with_source():
+def get_startup_loader() -> StartupLoader:
     """
-    답변과 출처를 함께 반환하는 RAG 체인을 초기화합니다.
-    Streamlit의 캐시 기능을 사용하여 리소스를 한 번만 로드합니다.
+    RAG 체인 준비(모델/인덱스 로드, 필요할 때만 인덱스 구축)를 백그라운드에서 시작합니다.
+    Streamlit의 캐시 기능을 사용하여 프로세스당 한 번만 로드합니다.
     """
-    # 1. 데이터 로드 및 분할
-    docs = data_loader.load_all_documents()
-    if not docs:
-        return None
-    splits = data_loader.split_documents(docs)
-
-    # 2. 임베딩 및 벡터 저장소 생성
-    embeddings = vector_store.get_embedding_model()
-    db = vector_store.build_vector_store(splits, embeddings)
-    
-    # 2.1. 기본 리트리버 설정 (더 많은 후보군 확보)
-    base_retriever = db.as_retriever(search_kwargs={"k": 20})
-
-    # 2.2. 재순위화(Re-ranking) 모델 설정
-    cross_encoder_model = HuggingFaceCrossEncoder(model_name="dragonkue/bge-reranker-v2-m3-ko")
-    compressor = CrossEncoderReranker(model=cross_encoder_model, top_n=6)
-    compression_retriever = ContextualCompressionRetriever(
-        base_compressor=compressor, base_retriever=base_retriever
-    )
-
-    # 3. LLM 인스턴스화
-    llm_instance = llm.get_llm()
-
-    # 4. 프롬프트 템플릿 정의
-    template = """
-"당신은 한국 법령 리서처입니다. 아래 <컨텍스트>만을 근거로 "
-"간결하고 정확히 답변하고, 인용(제목/출처)을 제시하세요. "
-"모르면 모른다고 말하세요."
-
-<컨텍스트>
-{context}
-
-[질문]
-{question}
-
-형식:
-- 요약(2~5문장)
-- 핵심포인트(불릿)
-- 인용(제목/출처)
-- 면책고지
-
-최종 답만 한국어로. 사고흐름/메타 금지.
-"""
-    prompt = PromptTemplate.from_template(template)
-
-    # 5. LCEL을 사용한 RAG 체인 구성 (출처 포함)
-    
-    # 답변 생성 부분
-    rag_chain_from_docs = (
-        RunnablePassthrough.assign(context=(lambda x: format_docs(x["context"])))
-        | prompt
-        | llm_instance
-        | StrOutputParser()
-    )
-
-    # 출처(context)와 질문(question)을 받고, 답변(answer)을 생성하여 함께 반환
-    rag_chain_with_source = RunnableParallel(
-        {"context": compression_retriever, "question": RunnablePassthrough()}
-    ).assign(answer=rag_chain_from_docs)
-    
-    return rag_chain_with_source
+    return StartupLoader().start()
+
+def show_startup_breakdown(loader: StartupLoader, ui_seconds: float) -> None:
+    """사이드바에 시작 시간 내역(화면 표시, 단계별 로드 시간, 목표 대비)을 표시합니다."""
+    breakdown = loader.breakdown()
+    with st.sidebar.expander("⏱️ 시작 시간", expanded=not breakdown["within_budget"]):
+        st.caption(f"화면 표시까지 {ui_seconds:.2f}초 (이번 실행)")
+        if not breakdown["ready"]:
+            st.caption(f"모델/인덱스 로드 중... {breakdown['total_seconds']:.1f}초 경과")
+        else:
+            st.caption(
+                f"모델/인덱스 준비 {breakdown['total_seconds']:.2f}초 · 목표 {breakdown['budget_seconds']:.0f}초"
+                + ("" if breakdown["within_budget"] else " ⚠️ 초과")
+            )
+        if breakdown["steps"]:
+            st.dataframe(breakdown["steps"], use_container_width=True)
 
 # --- Streamlit UI 구성 ---
 
 st.title("법률 RAG Q&A 시스템")
 st.markdown("---")
 
-# RAG 체인 로드
-rag_chain = get_rag_chain_with_source()
-
-if rag_chain is None:
-    st.error(f"⚠️  데이터 파일을 찾을 수 없습니다. '{config.DATA_DIR}' 디렉토리에 .txt 또는 .pdf 파일을 넣어주세요.")
-else:
-    # 사용자 질문 입력
-    query = st.text_input(
-        "궁금한 법률 정보를 질문하세요:",
-        placeholder="예: 근로기준법상 연차 유급휴가에 대해 알려줘"
-    )
-
-    if st.button("질문하기"):
-        if query:
-            with st.spinner("답변을 생성하는 중입니다..."):
-                try:
-                    # 체인 실행 (결과에 'answer'와 'context' 포함)
-                    result = rag_chain.invoke(query)
-
-                    st.markdown("#### 답변")
-                    st.markdown(result["answer"].strip())
-                    
-                    # 답변 근거 (출처) 표시
-                    st.markdown("---")
-                    with st.expander("📂 답변 근거 보기"):
-                        for doc in result["context"]:
-                            st.markdown(f"**[출처: {doc.metadata.get('source', 'N/A')}]**")
-                            st.markdown(doc.page_content)
-                            st.markdown("---")
-
-                except Exception as e:
-                    st.error(f"답변 생성 중 오류가 발생했습니다: {e}")
+# RAG 체인 로드는 백그라운드에서 진행되며, 그동안에도 질문을 입력할 수 있습니다.
+loader = get_startup_loader()
+
+# 사용자 질문 입력
+query = st.text_input(
+    "궁금한 법률 정보를 질문하세요:",
+    placeholder="예: 근로기준법상 연차 유급휴가에 대해 알려줘"
+)
+asked = st.button("질문하기")
+status_box = st.empty()
+if not loader.ready:
+    status_box.info("⏳ 모델과 인덱스를 불러오는 중입니다. 질문은 바로 입력할 수 있습니다.")
+ui_seconds = time.perf_counter() - APP_START
+
+if asked:
+    if query:
+        try:
+            with st.spinner("모델과 인덱스를 불러오는 중입니다..."):
+                rag_chain = loader.wait()
+            status_box.empty()
+        except Exception as e:
+            rag_chain = None
+            st.error(f"모델/인덱스 로드 중 오류가 발생했습니다: {e}")
         else:
-            st.warning("질문을 입력해주세요.")
+            if rag_chain is None:
+                st.error(f"⚠️  데이터 파일을 찾을 수 없습니다. '{config.DATA_DIR}' 디렉토리에 .txt 또는 .pdf 파일을 넣어주세요.")
+
+        if rag_chain is not None:
+            from src import instrumentation
+
+            try:
+                st.markdown("#### 답변")
+                answer_box = st.empty()
+                sources_box = st.empty()
+                timing_box = st.empty()
+                answer_box.markdown("_관련 문서를 검색하는 중입니다..._")
+
+                # 체인을 스트리밍으로 실행: 근거 문서(context)가 먼저 도착하고, 이어서 답변 토큰이 도착합니다.
+                # (기준표 직접 조회나 답변 캐시 적중 시에는 결과 전체가 한 번에 도착합니다.)
+                trace = instrumentation.QueryTrace()
+                start = time.perf_counter()
+                first_token_time = None
+                answer = ""
+                for chunk in rag_chain.stream(query, config={"callbacks": [trace]}):
+                    if "context" in chunk:
+                        # 답변 근거 (출처) 표시
+                        with sources_box.container():
+                            st.markdown("---")
+                            with st.expander("📂 답변 근거 보기"):
+                                for doc in chunk["context"]:
+                                    st.markdown(f"**[출처: {doc.metadata.get('source', 'N/A')}]**")
+                                    st.markdown(doc.page_content)
+                                    st.markdown("---")
+                    if chunk.get("answer"):
+                        if first_token_time is None:
+                            first_token_time = time.perf_counter() - start
+                        answer += chunk["answer"]
+                        answer_box.markdown(answer + "▌")
+
+                total_time = time.perf_counter() - start
+                answer_box.markdown(answer.strip())
+                timing_box.caption(
+                    f"첫 토큰까지 {first_token_time or total_time:.2f}초 · 전체 {total_time:.2f}초"
+                )
+
+                # 마지막 질문의 단계별 소요 시간 (답변 캐시 적중 / 기준표 직접 조회 시에는 기록이 없습니다)
+                with st.expander("🔍 디버그: 단계별 소요 시간"):
+                    if trace.records:
+                        st.dataframe(
+                            [{key: value for key, value in record.items() if key not in ("ts", "trace")}
+                             for record in trace.records],
+                            use_container_width=True,
+                        )
+                    else:
+                        st.markdown("검색/LLM 단계 없이 답변했습니다 (답변 캐시 또는 기준표 직접 조회).")
+                    st.markdown("**누적 통계 (초)**")
+                    st.dataframe(
+                        [{"stage": stage, **stats} for stage, stats in instrumentation.get_recorder().summary().items()],
+                        use_container_width=True,
+                    )
+
+            except Exception as e:
+                st.error(f"답변 생성 중 오류가 발생했습니다: {e}")
+    else:
+        st.warning("질문을 입력해주세요.")
+
+show_startup_breakdown(loader, ui_seconds)
@@ -0,0 +1,356 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Tuple
+import numpy as np
+from langchain_community.cross_encoders import BaseCrossEncoder
+from langchain_core.embeddings import Embeddings
+
+from src import config, bm25, data_loader, instrumentation
+
+# 합성 코퍼스 생성용 어휘
+SUBJECTS = ["사업주", "근로자", "사용자", "고용노동부장관", "지방자치단체의 장", "위원회", "보험자", "수급권자"]
+OBJECTS = ["임금", "근로시간", "연차 유급휴가", "안전보건교육", "건강진단", "재해 예방", "근로계약", "퇴직급여", "보험료", "작업환경측정"]
+ACTIONS = ["실시하여야 한다", "보고하여야 한다", "지급하여야 한다", "게시하여야 한다", "보존하여야 한다", "지원할 수 있다", "정할 수 있다"]
+CONDITIONS = ["대통령령으로 정하는 바에 따라", "고용노동부령으로 정하는 기준에 따라", "특별한 사정이 없으면", "매년 1회 이상", "지체 없이"]
+
+class HashingEmbeddings(Embeddings):
+    """문자 bigram을 해시 버킷에 세어 L2 정규화하는 가벼운 임베딩입니다 (모델 다운로드 없이 벤치마크할 때 사용)."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in bm25.tokenize(text):
+                vectors[row, zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class OverlapCrossEncoder(BaseCrossEncoder):
+    """질문 bigram 중 문서에 나타나는 비율을 점수로 쓰는 가벼운 cross-encoder입니다 (모델 다운로드 없이 벤치마크할 때 사용)."""
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        scores = []
+        for query, doc in text_pairs:
+            query_tokens = set(bm25.tokenize(query))
+            scores.append(len(query_tokens & set(bm25.tokenize(doc))) / max(1, len(query_tokens)))
+        return scores
+
+def write_synthetic_corpus(output_dir: str, laws: int, articles: int, seed: int) -> List[Tuple[str, int, str]]:
+    """
+    '제N조(제목) ① ...' 형식의 합성 법령 텍스트 파일을 만들고, (법령명, 조 번호, 조 제목) 목록을 반환합니다.
+    같은 seed이면 항상 같은 코퍼스를 만듭니다.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    catalog = []
+    for law in range(1, laws + 1):
+        name = f"합성법{law:03d}"
+        lines = [name, ""]
+        for number in range(1, articles + 1):
+            title = f"{rng.choice(OBJECTS)}의 {rng.choice(['기준', '의무', '절차', '특례', '신고'])}"
+            catalog.append((name, number, title))
+            lines.append(f"제{number}조({title})")
+            for paragraph in "①②③④"[:rng.randint(1, 4)]:
+                sentence = (f"{paragraph} {rng.choice(SUBJECTS)}는 {rng.choice(CONDITIONS)} "
+                            f"{rng.choice(OBJECTS)}에 관한 사항을 {rng.choice(ACTIONS)}.")
+                lines.append(sentence * rng.randint(1, 3))
+            lines.append("")
+        with open(os.path.join(output_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+    return catalog
+
+def make_queries(catalog: List[Tuple[str, int, str]], count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{name} 제{number}조 {title}에 대해 알려줘" for name, number, title in rng.sample(catalog, min(count, len(catalog)))]
+
+def latency_stats(samples: List[float]) -> dict:
+    values = np.array(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+    }
+
+def load_models(fake_models: bool):
+    """(임베딩, 재순위화 단계)를 만듭니다. fake_models이면 모델 다운로드 없이 동작하는 대체 모델을 씁니다."""
+    from src import reranker, vector_store
+
+    if fake_models:
+        return HashingEmbeddings(), reranker.get_reranker(model=OverlapCrossEncoder())
+    return vector_store.get_embedding_model(), reranker.get_reranker()
+
+def configure(work_dir: str, data_dir: str, args) -> Dict[str, str]:
+    """벤치마크용 작업 디렉토리를 쓰도록 설정을 바꾸고, 같은 설정을 자식 프로세스에 넘길 환경 변수를 반환합니다."""
+    env = {
+        "DATA_DIR": data_dir,
+        "INDEX_DIR": os.path.join(work_dir, "index"),
+        "PARSED_CACHE_DIR": os.path.join(work_dir, "cache", "parsed"),
+        "EMBED_CACHE_DIR": os.path.join(work_dir, "cache", "embeddings"),
+        "INSTRUMENTATION_LOG": os.path.join(work_dir, "stages.jsonl"),
+        "PARSE_CACHE": "0",
+        "EMBED_CACHE": "0",
+        "ANSWER_CACHE": "0",
+        # 같은 질문을 반복 측정하므로 질문 임베딩/재순위화 점수 캐시는 끕니다.
+        "QUERY_CACHE_SIZE": "0",
+        "RERANK_CACHE_SIZE": "0",
+        # 합성 질문은 모두 '법령명 제N조'를 인용하므로, 조문 직접 조회를 켜 두면 검색/재순위화 없이 답합니다.
+        # 검색 파이프라인을 측정하도록 끄고, 조문 직접 조회 경로는 measure_queries에서 따로 측정합니다.
+        "ARTICLE_LOOKUP": "0",
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FAKE_LLM_TOKEN_DELAY": str(args.llm_token_delay),
+    }
+    config.DATA_DIR = env["DATA_DIR"]
+    config.INDEX_DIR = env["INDEX_DIR"]
+    config.PARSED_CACHE_DIR = env["PARSED_CACHE_DIR"]
+    config.EMBED_CACHE_DIR = env["EMBED_CACHE_DIR"]
+    config.INSTRUMENTATION_LOG = env["INSTRUMENTATION_LOG"]
+    config.PARSE_CACHE = config.EMBED_CACHE = config.ANSWER_CACHE = False
+    config.QUERY_CACHE_SIZE = config.RERANK_CACHE_SIZE = 0
+    config.ARTICLE_LOOKUP = False
+    config.LLM_BACKEND = "fake"
+    config.FAKE_LLM_LATENCY = args.llm_latency
+    config.FAKE_LLM_TOKEN_DELAY = args.llm_token_delay
+    return env
+
+def measure_ingestion() -> dict:
+    """
+    파일 로드(documents/s)와 청크 분할(chunks/s) 처리량을 측정합니다.
+    documents는 로더가 만든 Document 수(.txt 파일 하나, PDF 페이지 텍스트, 표 행)이고,
+    pdf_pages는 파서가 실제로 읽은 PDF 페이지 수입니다.
+    """
+    documents_count = chunks = 0
+    split_seconds = 0.0
+    parse_stats = {}
+    start = time.perf_counter()
+    loaded = list(data_loader.iter_file_documents(stats=parse_stats))
+    load_seconds = time.perf_counter() - start
+    for _, documents in loaded:
+        documents_count += len(documents)
+        start = time.perf_counter()
+        chunks += len(data_loader.split_documents(documents))
+        split_seconds += time.perf_counter() - start
+    pdf_pages = parse_stats.get("pages", 0)
+    return {
+        "files": len(loaded),
+        "documents": documents_count,
+        "pdf_pages": pdf_pages,
+        "chunks": chunks,
+        "load_seconds": round(load_seconds, 4),
+        "split_seconds": round(split_seconds, 4),
+        "documents_per_sec": round(documents_count / load_seconds, 1) if load_seconds else None,
+        "pdf_pages_per_sec": round(pdf_pages / load_seconds, 1) if load_seconds and pdf_pages else None,
+        "chunks_per_sec": round(chunks / split_seconds, 1) if split_seconds else None,
+    }
+
+def measure_queries(db, embeddings, compressor, queries: List[str], repeat: int) -> dict:
+    """
+    검색, 재순위화, 체인 전체(fake LLM 포함)의 질문당 지연 시간을 측정합니다.
+    end_to_end는 조문 직접 조회 없이 검색/재순위화를 거치는 경로이고, end_to_end_article_lookup은
+    ARTICLE_LOOKUP을 켠 체인(인용된 조문은 검색 없이 바로 가져옴)으로 같은 질문을 실행한 시간입니다.
+    """
+    from src import chain, retrieval
+
+    base_retriever = retrieval.get_base_retriever(db, index_dir=config.INDEX_DIR)
+    rag_chain = chain.build_rag_chain(db, embeddings, compressor=compressor)
+    rag_chain.invoke(queries[0])  # 워밍업
+
+    retrieve, rerank, end_to_end = [], [], []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            candidates = base_retriever.invoke(query)
+            retrieved = time.perf_counter()
+            compressor.compress_documents(candidates, query)
+            reranked = time.perf_counter()
+            rag_chain.invoke(query)
+            finished = time.perf_counter()
+            retrieve.append(retrieved - start)
+            rerank.append(reranked - retrieved)
+            end_to_end.append(finished - reranked)
+
+    config.ARTICLE_LOOKUP = True
+    try:
+        lookup_chain = chain.build_rag_chain(db, embeddings, compressor=compressor)
+    finally:
+        config.ARTICLE_LOOKUP = False
+    lookup_chain.invoke(queries[0])
+    article_lookup = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            lookup_chain.invoke(query)
+            article_lookup.append(time.perf_counter() - start)
+    return {
+        "retrieve": latency_stats(retrieve),
+        "rerank": latency_stats(rerank),
+        "end_to_end": latency_stats(end_to_end),
+        "end_to_end_article_lookup": latency_stats(article_lookup),
+    }
+
+def cold_start_probe(args) -> None:
+    """(자식 프로세스) 인덱스 로드부터 첫 답변까지의 시간을 측정하여 JSON 한 줄로 출력합니다."""
+    start = time.perf_counter()
+    from src import chain, vector_store
+    imported = time.perf_counter()
+    embeddings, compressor = load_models(args.fake_models)
+    db = vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR)
+    rag_chain = chain.build_rag_chain(db, embeddings, compressor=compressor)
+    ready = time.perf_counter()
+    rag_chain.invoke(args.probe_query)
+    answered = time.perf_counter()
+    print(json.dumps({
+        "import_seconds": round(imported - start, 4),
+        "load_seconds": round(ready - imported, 4),
+        "first_query_seconds": round(answered - ready, 4),
+    }))
+
+def measure_cold_start(env: Dict[str, str], args, query: str) -> dict:
+    """새 프로세스에서 인터프리터 시작 ~ 첫 답변까지의 시간을 측정합니다 (인덱스는 이미 구축된 상태)."""
+    command = [sys.executable, os.path.abspath(__file__), "--cold-start-probe", "--probe-query", query]
+    if args.fake_models:
+        command.append("--fake-models")
+    start = time.perf_counter()
+    output = subprocess.run(
+        command, env=dict(os.environ, **env), capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    total = time.perf_counter() - start
+    return dict(json.loads(output.strip().splitlines()[-1]), total_seconds=round(total, 4))
+
+def flatten(result: dict, prefix: str = "") -> Dict[str, float]:
+    items = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+def compare(previous_path: str, result: dict) -> None:
+    """이전 결과 파일과 수치 항목을 비교하여 출력합니다."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = flatten(json.load(f))
+    print(f"\n--- '{previous_path}' 대비 ---")
+    for name, value in flatten(result).items():
+        if name in previous and previous[name]:
+            change = (value - previous[name]) / previous[name] * 100
+            print(f"{name}: {previous[name]} → {value} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="네트워크 없이 수집/인덱싱/검색/재순위화/체인 성능을 측정합니다.")
+    parser.add_argument("--corpus", help="벤치마크에 쓸 문서 디렉토리 (없으면 합성 코퍼스 생성)")
+    parser.add_argument("--laws", type=int, default=20, help="합성 코퍼스의 법령 파일 수")
+    parser.add_argument("--articles", type=int, default=80, help="합성 법령당 조문 수")
+    parser.add_argument("--queries", type=int, default=30, help="측정할 질문 수")
+    parser.add_argument("--repeat", type=int, default=3, help="질문 반복 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fake-models", action="store_true", help="임베딩/재순위화 모델 대신 해시 임베딩/겹침 점수 사용")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake LLM의 첫 토큰 전 지연 시간(초)")
+    parser.add_argument("--llm-token-delay", type=float, default=0.0, help="fake LLM의 토큰당 지연 시간(초)")
+    parser.add_argument("--output", default="benchmark_result.json")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--cold-start-probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--probe-query", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_probe:
+        cold_start_probe(args)
+        return
+
+    from src import vector_store
+
+    with tempfile.TemporaryDirectory(prefix="rag_bench_") as work_dir:
+        if args.corpus:
+            data_dir = os.path.abspath(args.corpus)
+            catalog = []
+        else:
+            data_dir = os.path.join(work_dir, "raw")
+            catalog = write_synthetic_corpus(data_dir, args.laws, args.articles, args.seed)
+        env = configure(work_dir, data_dir, args)
+        if catalog:
+            queries = make_queries(catalog, args.queries, args.seed)
+        else:
+            import pandas as pd
+            queries = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_dataset.csv"))["question"].tolist()[:args.queries]
+
+        print("1. 수집 처리량 측정...")
+        ingestion = measure_ingestion()
+        print(ingestion)
+
+        print("2. 인덱스 구축 시간 측정...")
+        embeddings, compressor = load_models(args.fake_models)
+        start = time.perf_counter()
+        db = vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR)
+        if db is None:
+            raise ValueError(f"'{data_dir}' 디렉토리에 문서가 없습니다.")
+        index_build = {"seconds": round(time.perf_counter() - start, 4), "vectors": vector_store.vector_count(db)}
+        with open(config.INSTRUMENTATION_LOG, encoding="utf-8") as f:
+            for record in map(json.loads, f):
+                if record.get("build") == "full":
+                    index_build[f"{record['stage']}_seconds"] = record["seconds"]
+        index_build["rss_after_build_mb"] = instrumentation.current_rss_mb()
+        print(index_build)
+
+        print("3. 질문 지연 시간 측정...")
+        query_latency = measure_queries(db, embeddings, compressor, queries, args.repeat)
+        print(query_latency)
+
+        print("4. 콜드 스타트 측정...")
+        cold_start = measure_cold_start(env, args, queries[0])
+        print(cold_start)
+
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "corpus": args.corpus or f"synthetic(laws={args.laws}, articles={args.articles}, seed={args.seed})",
+            "fake_models": args.fake_models,
+            "embed_model": None if args.fake_models else config.EMBED_MODEL,
+            "reranker_model": None if args.fake_models else config.RERANKER_MODEL,
+            "reranker_backend": None if args.fake_models else config.RERANKER_BACKEND,
+            "index_type": config.INDEX_TYPE,
+            "chunk_size": config.CHUNK_SIZE,
+            "overlap": config.OVERLAP,
+            "retrieval_k": config.RETRIEVAL_K,
+            "retrieval_fetch_k": config.RETRIEVAL_FETCH_K,
+            "rerank_top_n": config.RERANK_TOP_N,
+            "hybrid_retrieval": config.HYBRID_RETRIEVAL,
+            "adaptive_rerank": config.ADAPTIVE_RERANK,
+            "article_lookup": config.ARTICLE_LOOKUP,
+            "queries": len(queries),
+            "repeat": args.repeat,
+            "llm_latency": args.llm_latency,
+            "llm_token_delay": args.llm_token_delay,
+        },
+        "ingestion": ingestion,
+        "index_build": index_build,
+        "query": query_latency,
+        "cold_start": cold_start,
+        "memory": {"peak_rss_mb": instrumentation.peak_rss_mb()},
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n'{args.output}' 파일로 벤치마크 결과가 저장되었습니다.")
+    if args.compare:
+        compare(args.compare, result)
+
+if __name__ == "__main__":
+    main()
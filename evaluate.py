@@ -1,4 +1,11 @@
+import argparse
+import json
 import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from datasets import Dataset
 from ragas import evaluate
@@ -11,8 +18,9 @@ from ragas.metrics import (
 import asyncio
 from dotenv import load_dotenv
 
-from app import get_rag_chain_with_source
+from src.chain import get_rag_chain_with_source
 from src.llm import get_llm
+from src import config
 from src.config import EMBED_MODEL
 from langchain_huggingface import HuggingFaceEmbeddings
 from ragas.llms import LangchainLLMWrapper
@@ -26,45 +34,132 @@ load_dotenv()
 if os.name == 'nt':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-def create_evaluation_dataset() -> Dataset:
+RATE_LIMIT_PATTERN = re.compile(r"429|rate.?limit|quota|resource.?exhausted|too many requests", re.IGNORECASE)
+RETRY_AFTER_PATTERN = re.compile(r"retry(?:[ _-]?(?:in|after|delay))?\D{0,20}?(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+# 시간 초과/연결 오류/일시적 서버 오류 (예: TimeoutError, httpx.ConnectError, google DeadlineExceeded, 503 ServiceUnavailable)
+TRANSIENT_ERROR_PATTERN = re.compile(
+    r"time.?out|timed out|deadline|connect|unavailable|temporarily|\b50[234]\b", re.IGNORECASE
+)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return bool(RATE_LIMIT_PATTERN.search(f"{type(error).__name__} {error}"))
+
+def is_transient_error(error: Exception) -> bool:
+    """재시도하면 성공할 수 있는 오류(요청 한도 초과, 시간 초과, 연결 오류)인지 판단합니다."""
+    if isinstance(error, (TimeoutError, ConnectionError)) or is_rate_limit_error(error):
+        return True
+    return bool(TRANSIENT_ERROR_PATTERN.search(f"{type(error).__name__} {error}"))
+
+def invoke_with_retry(rag_chain, query: str, max_retries: int = 5, base_delay: float = 2.0) -> dict:
+    """
+    체인을 실행하고, 일시적인 오류(is_transient_error)로 실패하면 지수 백오프(+지터)로 재시도합니다.
+    요청 한도 초과(429/quota) 오류는 대기 시간을 4배로 늘리고, 오류 메시지에 재시도 대기 시간이 있으면 그 값을 따릅니다.
+    잘못된 API 키, 체인 내부 오류(KeyError 등) 같은 그 밖의 오류는 재시도하지 않고 바로 발생시킵니다.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return rag_chain.invoke(query)
+        except Exception as e:
+            if attempt == max_retries or not is_transient_error(e):
+                raise
+            delay = base_delay * (2 ** attempt)
+            if is_rate_limit_error(e):
+                match = RETRY_AFTER_PATTERN.search(str(e))
+                delay = float(match.group(1)) if match else delay * 4
+            delay *= random.uniform(1.0, 1.25)
+            print(f"질문 '{query}' 처리 실패 ({attempt + 1}/{max_retries}회 재시도, {delay:.1f}초 대기): {e}")
+            time.sleep(delay)
+
+def load_checkpoint(path: str) -> dict:
+    """체크포인트(JSONL)에서 성공한 질문의 결과를 {질문 번호: 결과}로 읽습니다."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 중단 시 마지막 줄이 잘렸을 수 있음
+            if not record.get("error"):
+                done[record["id"]] = record
+    return done
+
+def create_evaluation_dataset(checkpoint_path: str, concurrency: int = 4, max_retries: int = 5,
+                              resume: bool = True, rag_chain=None,
+                              dataset_path: str = "eval_dataset.csv") -> Dataset:
     """
     CSV 파일에서 평가 데이터셋을 로드하고, RAG 체인을 실행하여
     'answer'와 'contexts'를 추가한 뒤 Hugging Face Dataset으로 변환합니다.
+    질문은 스레드 풀에서 최대 concurrency개씩 동시에 실행하며, 결과는 질문마다 checkpoint_path(JSONL)에 기록합니다.
+    resume이 참이면 체크포인트에 이미 성공한 질문은 건너뜁니다.
+    rag_chain을 주면 그 체인을 평가합니다 (sweep.py가 설정별로 구성한 체인). 없으면 현재 설정으로 체인을 로드합니다.
     """
     # 1. 평가 데이터셋 로드
-    eval_df = pd.read_csv("eval_dataset.csv")
+    eval_df = pd.read_csv(dataset_path)
     questions = eval_df["question"].tolist()
     ground_truths = eval_df["ground_truth"].tolist()
 
-    # 2. RAG 체인 로드
-    print("RAG 체인을 로드하는 중입니다...")
-    rag_chain = get_rag_chain_with_source()
-    if rag_chain is None:
-        raise ValueError("RAG 체인을 로드할 수 없습니다. 데이터 파일이 있는지 확인하세요.")
-    print("RAG 체인 로드 완료.")
-
-    # 3. 각 질문에 대해 RAG 체인 실행 및 결과 수집
-    answers = []
-    contexts = []
-    print(f"{len(questions)}개의 질문에 대해 답변 및 근거 문서를 생성합니다...")
-    for query in questions:
-        try:
-            result = rag_chain.invoke(query)
-            answers.append(result["answer"])
-            contexts.append([doc.page_content for doc in result["context"]])
-        except Exception as e:
-            print(f"질문 '{query}' 처리 중 오류 발생: {e}")
-            answers.append("")
-            contexts.append([])
-    
-    print("답변 생성 완료.")
+    if not resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done = {
+        i: record for i, record in load_checkpoint(checkpoint_path).items()
+        if i < len(questions) and record["question"] == questions[i]
+    }
+    pending = [i for i in range(len(questions)) if i not in done]
+    if done:
+        print(f"체크포인트 '{checkpoint_path}'에서 {len(done)}개 질문의 결과를 불러왔습니다.")
+
+    if pending and rag_chain is None:
+        # 2. RAG 체인 로드
+        print("RAG 체인을 로드하는 중입니다...")
+        # 평가는 현재 파이프라인 자체를 측정해야 하므로 답변 캐시를 사용하지 않습니다.
+        config.ANSWER_CACHE = False
+        rag_chain = get_rag_chain_with_source()
+        if rag_chain is None:
+            raise ValueError("RAG 체인을 로드할 수 없습니다. 데이터 파일이 있는지 확인하세요.")
+        print("RAG 체인 로드 완료.")
+
+    if pending:
+        # 3. 각 질문에 대해 RAG 체인 실행 및 결과 수집 (동시 실행 + 질문별 체크포인트)
+        print(f"{len(pending)}개의 질문에 대해 답변 및 근거 문서를 생성합니다 (동시 실행 {concurrency}개)...")
+        lock = threading.Lock()
+
+        def run(i: int) -> dict:
+            record = {"id": i, "question": questions[i], "answer": "", "contexts": []}
+            try:
+                result = invoke_with_retry(rag_chain, questions[i], max_retries=max_retries)
+                record["answer"] = result["answer"]
+                record["contexts"] = [doc.page_content for doc in result["context"]]
+            except Exception as e:
+                print(f"질문 '{questions[i]}' 처리 중 오류 발생: {e}")
+                record["error"] = str(e)
+            with lock:
+                with open(checkpoint_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return record
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [executor.submit(run, i) for i in pending]
+            for completed, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                done[record["id"]] = record
+                print(f"  [{completed}/{len(pending)}] {record['question']}")
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for i in pending if done[i].get("error"))
+        print(f"답변 생성 완료: {len(pending)}개 질문, {elapsed:.1f}초 "
+              f"({len(pending) / elapsed * 60:.1f} questions/min), 실패 {failed}개")
+        if failed:
+            print("실패한 질문은 같은 명령을 다시 실행하면 이어서 재시도합니다.")
 
     # 4. RAGAs가 요구하는 형식으로 데이터 구성
     response_dataset = Dataset.from_dict({
         "question": questions,
         "ground_truth": ground_truths,
-        "answer": answers,
-        "contexts": contexts,
+        "answer": [done[i]["answer"] for i in range(len(questions))],
+        "contexts": [done[i]["contexts"] for i in range(len(questions))],
     })
 
     return response_dataset
@@ -104,19 +199,25 @@ def run_evaluation(dataset: Dataset):
     return result
 
 if __name__ == "__main__":
-    import sys
-
-    # 커맨드 라인 인자로부터 실험 이름 가져오기 (없으면 'baseline')
-    if len(sys.argv) > 1:
-        experiment_name = sys.argv[1]
-    else:
-        experiment_name = "baseline"
+    parser = argparse.ArgumentParser(description="Ragas로 RAG 파이프라인을 평가합니다.")
+    parser.add_argument("experiment_name", nargs="?", default="baseline", help="실험 이름 (결과 파일명에 사용)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 질문 수")
+    parser.add_argument("--max-retries", type=int, default=5, help="질문당 최대 재시도 횟수")
+    parser.add_argument("--checkpoint", help="질문별 결과 체크포인트(JSONL) 경로")
+    parser.add_argument("--no-resume", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    args = parser.parse_args()
+    experiment_name = args.experiment_name
 
     print(f"--- {experiment_name} 실험을 시작합니다. ---")
 
 
-    # 평가 데이터셋 생성
-    evaluation_dataset = create_evaluation_dataset()
+    # 평가 데이터셋 생성 (중단되면 같은 명령으로 이어서 실행)
+    evaluation_dataset = create_evaluation_dataset(
+        args.checkpoint or f"eval_checkpoint_{experiment_name}.jsonl",
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        resume=not args.no_resume,
+    )
     
     # 평가 실행
     evaluation_result = run_evaluation(evaluation_dataset)
@@ -125,4 +226,4 @@ if __name__ == "__main__":
     df_result = evaluation_result.to_pandas()
     output_filename = f"evaluation_result_{experiment_name}.csv"
     df_result.to_csv(output_filename, index=False, encoding="utf-8-sig")
-    print(f"\n'{output_filename}' 파일로 성능 평가 결과가 저장되었습니다.")
\ No newline at end of file
+    print(f"\n'{output_filename}' 파일로 성능 평가 결과가 저장되었습니다.")
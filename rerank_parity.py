@@ -0,0 +1,79 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src import config, vector_store, retrieval, reranker
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """두 점수 배열의 스피어만 순위 상관계수를 계산합니다."""
+    if len(a) < 2:
+        return 1.0
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+def timed_score(model, pairs):
+    start = time.perf_counter()
+    scores = np.asarray(list(model.score(pairs)), dtype=np.float64)
+    return scores, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch와 ONNX 재순위화 모델의 순위 일치도와 지연 시간을 비교합니다.")
+    parser.add_argument("--top-n", type=int, default=config.RERANK_TOP_N)
+    parser.add_argument("--output", default="rerank_parity_report.csv")
+    args = parser.parse_args()
+
+    embeddings = vector_store.get_embedding_model()
+    db = vector_store.get_or_build_vector_store(embeddings)
+    if db is None:
+        raise ValueError(f"'{config.DATA_DIR}' 디렉토리에 문서가 없습니다.")
+    base_retriever = retrieval.get_base_retriever(db)
+
+    print("재순위화 모델 로드 중 (torch, onnx)...")
+    torch_model = reranker.get_cross_encoder("torch")
+    onnx_model = reranker.get_cross_encoder("onnx")
+
+    rows = []
+    for i, question in enumerate(pd.read_csv("eval_dataset.csv")["question"]):
+        pairs = [(question, doc.page_content) for doc in base_retriever.invoke(question)]
+        if not pairs:
+            continue
+        # 첫 호출의 워밍업 비용과 캐시 효과가 한쪽에만 실리지 않도록 질문마다 측정 순서를 바꿉니다.
+        if i % 2 == 0:
+            torch_scores, torch_ms = timed_score(torch_model, pairs)
+            onnx_scores, onnx_ms = timed_score(onnx_model, pairs)
+        else:
+            onnx_scores, onnx_ms = timed_score(onnx_model, pairs)
+            torch_scores, torch_ms = timed_score(torch_model, pairs)
+
+        torch_top = list(np.argsort(-torch_scores)[:args.top_n])
+        onnx_top = list(np.argsort(-onnx_scores)[:args.top_n])
+        rows.append({
+            "question": question,
+            "candidates": len(pairs),
+            "top1_agree": torch_top[0] == onnx_top[0],
+            f"top{args.top_n}_overlap": len(set(torch_top) & set(onnx_top)) / min(args.top_n, len(pairs)),
+            f"top{args.top_n}_same_order": torch_top == onnx_top,
+            "spearman": round(spearman(torch_scores, onnx_scores), 4),
+            "max_abs_diff": round(float(np.max(np.abs(torch_scores - onnx_scores))), 4),
+            "torch_ms": round(torch_ms, 1),
+            "onnx_ms": round(onnx_ms, 1),
+        })
+        print(rows[-1])
+
+    report = pd.DataFrame(rows)
+    report.to_csv(args.output, index=False, encoding="utf-8-sig")
+
+    print("\n--- 요약 ---")
+    print(f"top-1 일치율: {report['top1_agree'].mean():.3f}")
+    print(f"top-{args.top_n} 평균 겹침: {report[f'top{args.top_n}_overlap'].mean():.3f}")
+    print(f"top-{args.top_n} 순서 완전 일치율: {report[f'top{args.top_n}_same_order'].mean():.3f}")
+    print(f"평균 스피어만 상관계수: {report['spearman'].mean():.4f}")
+    for backend in ("torch", "onnx"):
+        latencies = report[f"{backend}_ms"]
+        print(f"{backend} 지연 시간(ms): p50={latencies.quantile(0.5):.1f}, p99={latencies.quantile(0.99):.1f}")
+    print(f"\n'{args.output}' 파일로 비교 결과가 저장되었습니다.")
+
+if __name__ == "__main__":
+    main()
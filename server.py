@@ -0,0 +1,189 @@
+import argparse
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from src import config, chain, instrumentation, reranker, vector_store
+from src.batching import BatchedCrossEncoder, BatchedQueryEmbeddings
+from src.embedding_cache import QueryCacheEmbeddings
+
+def _json_default(value: Any):
+    # numpy 스칼라(점수 등)는 파이썬 숫자로, 그 외 직렬화할 수 없는 값은 문자열로 변환합니다.
+    return value.item() if hasattr(value, "item") else str(value)
+
+def to_json(payload: dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+def serialize_documents(docs) -> list:
+    return [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+
+class QueryService:
+    """
+    프로세스당 임베딩/재순위화 모델을 한 벌만 로드하여 모든 요청이 공유하는 질의 서비스입니다.
+    동시에 들어온 요청의 질문 인코딩과 cross-encoder 채점은 MicroBatcher로 모아 한 번에 실행합니다.
+    """
+
+    def __init__(self):
+        embeddings = vector_store.get_embedding_model()
+        # 질문 임베딩 LRU 캐시 뒤에 배치 처리를 두어, 캐시 적중은 배치를 기다리지 않고 바로 반환합니다.
+        if isinstance(embeddings, QueryCacheEmbeddings):
+            embeddings.query_embeddings = BatchedQueryEmbeddings(embeddings.query_embeddings)
+            self.query_encoder = embeddings.query_embeddings
+        else:
+            embeddings = self.query_encoder = BatchedQueryEmbeddings(embeddings)
+
+        db = vector_store.get_or_build_vector_store(embeddings)
+        if db is None:
+            raise ValueError(f"'{config.DATA_DIR}' 디렉토리에 문서가 없습니다.")
+        self.cross_encoder = BatchedCrossEncoder(reranker.get_cross_encoder())
+        self.embeddings = embeddings
+        self.rag_chain = chain.build_rag_chain(db, embeddings, compressor=reranker.get_reranker(model=self.cross_encoder))
+
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _tracked(self):
+        """처리 중인 요청 수와 누적 요청/오류 수를 집계합니다."""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def answer(self, question: str) -> dict:
+        trace = instrumentation.QueryTrace()
+        start = time.perf_counter()
+        with self._tracked():
+            result = self.rag_chain.invoke(question, config={"callbacks": [trace]})
+        return {
+            "question": question,
+            "answer": result["answer"],
+            "context": serialize_documents(result["context"]),
+            "seconds": round(time.perf_counter() - start, 4),
+            "stages": trace.records,
+        }
+
+    def stream(self, question: str):
+        """질문의 결과를 (근거 문서 → 답변 토큰 → 완료) 순서의 이벤트로 생성합니다."""
+        trace = instrumentation.QueryTrace()
+        start = time.perf_counter()
+        with self._tracked():
+            for chunk in self.rag_chain.stream(question, config={"callbacks": [trace]}):
+                if "context" in chunk:
+                    yield {"context": serialize_documents(chunk["context"])}
+                if chunk.get("answer"):
+                    yield {"answer": chunk["answer"]}
+        yield {"done": True, "seconds": round(time.perf_counter() - start, 4), "stages": trace.records}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            requests = {"total": self.requests, "in_flight": self.in_flight, "errors": self.errors}
+        metrics = {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": requests,
+            "query_encoder": self.query_encoder.batcher.stats(),
+            "cross_encoder": self.cross_encoder.batcher.stats(),
+            "stages": instrumentation.get_recorder().summary(),
+        }
+        if isinstance(self.embeddings, QueryCacheEmbeddings):
+            metrics["query_cache"] = self.embeddings.stats()
+        return metrics
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health  : 상태 확인
+    GET  /metrics : 요청 수, 배치 큐 길이/배치 크기 분포, 단계별 p50/p95/p99
+    POST /query   : {"question": "...", "stream": false}
+                    stream이 참이면 근거 문서, 답변 토큰, 완료 이벤트를 JSON lines(application/x-ndjson)로 보냅니다.
+    """
+
+    server_version = "LegalRAG/1.0"
+
+    @property
+    def service(self) -> QueryService:
+        return self.server.service
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = to_json(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/query":
+            self._send_json(404, {"error": f"알 수 없는 경로입니다: {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            question = str(request.get("question", "")).strip()
+        except (ValueError, AttributeError):
+            self._send_json(400, {"error": "요청 본문은 JSON 객체여야 합니다."})
+            return
+        if not question:
+            self._send_json(400, {"error": "question을 입력해주세요."})
+            return
+
+        if not request.get("stream"):
+            try:
+                self._send_json(200, self.service.answer(question))
+            except Exception as e:
+                self._send_json(500, {"error": f"답변 생성 중 오류가 발생했습니다: {e}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.end_headers()
+        try:
+            for event in self.service.stream(question):
+                self.wfile.write(to_json(event) + b"\n")
+                self.wfile.flush()
+        except Exception as e:
+            self.wfile.write(to_json({"error": f"답변 생성 중 오류가 발생했습니다: {e}"}) + b"\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG 체인을 HTTP(JSON) 질의 서비스로 실행합니다.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fake-llm", action="store_true", help="Gemini 대신 로컬 fake LLM 사용 (LLM_BACKEND=fake)")
+    args = parser.parse_args()
+    if args.fake_llm:
+        config.LLM_BACKEND = "fake"
+
+    print("모델과 인덱스를 로드하는 중입니다...")
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    server.daemon_threads = True
+    server.service = QueryService()
+    print(f"질의 서비스 시작: http://{args.host}:{args.port} (POST /query, GET /metrics, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableGenerator, RunnableLambda
+from langchain.docstore.document import Document
+from collections import OrderedDict
+from typing import Iterator, Optional
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+from . import config
+
+# 답변에 영향을 주는 검색/재순위화/컨텍스트/LLM 설정: 값이 바뀌면 캐시된 답변을 무효화합니다.
+ANSWER_SETTINGS = (
+    "RETRIEVAL_K", "RETRIEVAL_FETCH_K", "HYBRID_RETRIEVAL", "ARTICLE_LOOKUP",
+    "RERANKER_MODEL", "RERANK_TOP_N", "ADAPTIVE_RERANK", "RERANK_BATCH_SIZE", "RERANK_STOP_SCORE",
+    "RERANK_DENSE_BOUND", "RERANK_DENSE_SLACK",
+    "CONTEXT_PACKING", "CONTEXT_TOKEN_BUDGET", "CONTEXT_DEDUP_THRESHOLD",
+    "LLM_BACKEND", "LLM_MODEL",
+)
+
+# 법령명으로 보이는 단어('근로기준법', '시행령', '시행규칙' 등)와 숫자(조 번호, 나이, 등급)
+LAW_NAME_PATTERN = re.compile(r"시행령|시행규칙|[가-힣]+?(?:법률|법|규칙|규정|조례)")
+NUMBER_PATTERN = re.compile(r"\d+")
+
+def manifest_fingerprint(manifest: Optional[dict]) -> str:
+    """
+    인덱스 manifest(설정 + 코퍼스 지문 + 파일 목록)와 답변에 영향을 주는 설정(ANSWER_SETTINGS)의 지문을 계산합니다.
+    인덱스가 재구축/증분 갱신되거나 검색·재순위화·컨텍스트·LLM 설정이 바뀌면 값이 달라져 답변 캐시가 무효화됩니다.
+    """
+    manifest = {key: value for key, value in (manifest or {}).items() if key != "created_at"}
+    settings = {name: getattr(config, name) for name in ANSWER_SETTINGS}
+    payload = {"manifest": manifest, "settings": settings}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def citation_signature(text: str) -> str:
+    """
+    질문이 인용한 법령명과 숫자의 집합입니다. '근로기준법 제60조'와 '제61조', '시행령'과 '시행규칙'처럼
+    임베딩은 거의 같지만 답이 다른 질문을 구분하기 위해, 이 값이 같은 캐시 항목만 적중으로 봅니다.
+    ('방법'처럼 법령명이 아닌 단어도 포함될 수 있으나, 이 경우 적중이 줄어들 뿐 다른 질문의 답을 반환하지는 않습니다.)
+    """
+    laws = sorted(set(LAW_NAME_PATTERN.findall(text)))
+    numbers = sorted(set(NUMBER_PATTERN.findall(text)), key=int)
+    return "|".join(laws) + "#" + ",".join(numbers)
+
+class SemanticAnswerCache:
+    """
+    RAG 체인 앞에 두는 의미 기반 답변 캐시입니다.
+    - 새 질문과 인용한 법령명/숫자(citation_signature)가 같은 캐시 항목 중, 질문 임베딩의 코사인 유사도가
+      threshold 이상인 항목이 있으면 저장된 답변과 근거 문서를 반환합니다.
+    - 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터(LRU), ttl_seconds가 지난 항목은 조회 시 제거합니다.
+    - 지문(fingerprint: 인덱스 + 답변 관련 설정)이 바뀌면 기존 항목을 모두 버립니다.
+    - path를 주면 저장할 때마다 새 항목 한 줄을 JSON lines 파일에 덧붙여 재시작 후에도 유지됩니다.
+      (첫 줄은 지문, 같은 질문은 뒤의 줄이 우선) 파일의 줄 수가 max_entries의 두 배를 넘으면 현재 항목만으로 다시 씁니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, fingerprint: str, path: Optional[str] = None,
+                 threshold: Optional[float] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.embeddings = embeddings
+        self.fingerprint = fingerprint
+        self.path = path
+        self.threshold = threshold if threshold is not None else config.ANSWER_CACHE_THRESHOLD
+        self.max_entries = max_entries if max_entries is not None else config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.ANSWER_CACHE_TTL
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 파일에 기록된 항목 줄 수 (None이면 파일을 새로 써야 함)
+        self._lines: Optional[int] = None
+        self._load()
+
+    # --- 저장/로드 ---
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("fingerprint") != self.fingerprint:
+                    print("인덱스 또는 답변 설정이 바뀌어 답변 캐시를 초기화합니다.")
+                    return
+                lines = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 기록 도중 중단된 마지막 줄
+                    lines += 1
+                    entry["vector"] = np.asarray(entry["vector"], dtype=np.float32)
+                    self._entries.pop(entry["question"], None)
+                    self._entries[entry["question"]] = entry
+        except (OSError, ValueError) as e:
+            print(f"답변 캐시 읽기 실패 ({self.path}): {e}")
+            self._entries.clear()
+            return
+        self._lines = lines
+        self._evict_expired()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _dump(entry: dict) -> str:
+        return json.dumps(dict(entry, vector=entry["vector"].tolist()), ensure_ascii=False) + "\n"
+
+    def _rewrite(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"fingerprint": self.fingerprint}) + "\n")
+            for entry in self._entries.values():
+                f.write(self._dump(entry))
+        os.replace(tmp_path, self.path)
+        self._lines = len(self._entries)
+
+    def _save(self, entry: dict) -> None:
+        """새 항목 한 줄을 파일에 덧붙입니다. 파일이 없거나 지문이 달랐거나 줄이 많이 쌓였으면 현재 항목으로 다시 씁니다."""
+        if not self.path:
+            return
+        if self._lines is None or self._lines >= 2 * max(self.max_entries, 1):
+            self._rewrite()
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(self._dump(entry))
+        self._lines += 1
+
+    def _evict_expired(self) -> None:
+        if not self.ttl_seconds:
+            return
+        now = time.time()
+        for question in [q for q, e in self._entries.items() if now - e["created_at"] > self.ttl_seconds]:
+            del self._entries[question]
+
+    # --- 조회/저장 ---
+
+    def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, query: str) -> Optional[dict]:
+        """
+        유사한 질문이 캐시에 있으면 RAG 체인과 같은 형식({'question', 'context', 'answer'})의 결과를 반환합니다.
+        """
+        vector = self._embed(query)
+        signature = citation_signature(query)
+        with self._lock:
+            self._evict_expired()
+            questions = [q for q, entry in self._entries.items() if entry.get("citations") == signature]
+            if not questions:
+                self.misses += 1
+                return None
+            similarities = np.stack([self._entries[q]["vector"] for q in questions]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = self._entries[questions[best]]
+            self._entries.move_to_end(questions[best])
+
+        print(f"답변 캐시 적중: '{entry['question']}' (유사도 {similarities[best]:.3f})")
+        return {
+            "question": query,
+            "context": [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in entry["context"]],
+            "answer": entry["answer"],
+        }
+
+    def store(self, query: str, result: dict) -> None:
+        """체인 결과를 캐시에 저장합니다. 답변이 비어 있으면 저장하지 않습니다."""
+        if not result.get("answer"):
+            return
+        entry = {
+            "question": query,
+            "vector": self._embed(query),
+            "citations": citation_signature(query),
+            "answer": result["answer"],
+            "context": [{"page_content": d.page_content, "metadata": d.metadata} for d in result.get("context", [])],
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._entries[query] = entry
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save(entry)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+def with_answer_cache(chain: Runnable, cache: SemanticAnswerCache) -> Runnable:
+    """
+    RAG 체인을 답변 캐시로 감쌉니다. 캐시 적중 시 저장된 결과를 바로 반환하고,
+    아니면 체인을 실행하면서(스트리밍 청크도 그대로 전달) 최종 결과를 캐시에 저장합니다.
+    """
+    def run(query: str):
+        hit = cache.lookup(query)
+        if hit is not None:
+            return hit
+
+        def store_through(chunks: Iterator[dict]) -> Iterator[dict]:
+            result = {}
+            for chunk in chunks:
+                for key, value in chunk.items():
+                    if key == "answer":
+                        result["answer"] = result.get("answer", "") + value
+                    else:
+                        result[key] = value
+                yield chunk
+            cache.store(query, result)
+
+        return chain | RunnableGenerator(store_through)
+
+    return RunnableLambda(run)
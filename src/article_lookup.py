@@ -0,0 +1,136 @@
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from langchain_community.docstore.base import Docstore
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import re
+from .docstore import fetch_documents, iter_documents
+
+ARTICLE_INDEX_FILE = "articles.json"
+
+# 질문의 조문 인용 (예: '제60조', '제 60 조의 2', '제60조제1항'은 제60조)
+ARTICLE_REFERENCE_PATTERN = r"제\s*(?P<article_number>\d+)\s*조(?:\s*의\s*(?P<article_branch>\d+))?"
+# 법령명 바로 뒤에 붙으면 다른 법령(하위 법령)을 가리키는 말
+SUBORDINATE_SUFFIX = re.compile(r"\s*시행\s*(?:령|규칙)")
+# 법령명과 떨어져 쓰인 하위 법령 ('근로기준법 제60조 및 시행령 제33조'), 색인되지 않은 법령명으로 보이는 말
+SUBORDINATE_PATTERN = r"시행\s*(?:령|규칙)"
+OTHER_LAW_PATTERN = r"[가-힣]+?(?:법률|법|규칙|규정|조례)"
+
+Key = Tuple[str, str]
+
+def _name_pattern(name: str) -> str:
+    """법령명의 글자 사이 공백 유무와 관계없이 찾는 정규식 ('산업안전보건법 시행령' = '산업안전보건법시행령')"""
+    return r"\s*".join(re.escape(char) for char in name.replace(" ", ""))
+
+class ArticleIndex:
+    """
+    (법령명, 조 번호) → 조문 청크의 docstore ID 목록 인덱스입니다. 조문 단위 분할(data_loader.split_statute_articles)로
+    만든 청크의 metadata(law, article, article_chunk)로 구축하며, 부칙의 조문은 본칙과 번호가 겹치므로 제외합니다.
+    질문이 법령명과 조 번호를 함께 인용하면 벡터 검색·재순위화 없이 해당 조문 청크만 docstore에서 바로 가져옵니다.
+    """
+
+    def __init__(self, articles: Optional[Dict[Key, List[str]]] = None, laws: Optional[Iterable[str]] = None):
+        """laws를 주면 색인된 조문과 관계없이 그 법령명들의 인용을 찾습니다 (references 참고)."""
+        self.articles: Dict[Key, List[str]] = articles or {}
+        laws = set(laws) if laws is not None else {law for law, _ in self.articles}
+        self.laws = sorted(laws, key=lambda law: len(law.replace(" ", "")), reverse=True)
+        self._pattern = None
+        if self.laws:
+            names = "|".join(f"(?:{_name_pattern(law)})" for law in self.laws)
+            self._pattern = re.compile(
+                f"(?P<law>{names})|(?P<subordinate>{SUBORDINATE_PATTERN})|(?P<other>{OTHER_LAW_PATTERN})"
+                f"|(?P<article>{ARTICLE_REFERENCE_PATTERN})"
+            )
+        self._law_by_name = {law.replace(" ", ""): law for law in self.laws}
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Tuple[str, Document]]) -> "ArticleIndex":
+        """(docstore ID, 청크) 목록으로 인덱스를 만듭니다. 조문 안의 청크는 article_chunk 순서로 둡니다."""
+        chunks: Dict[Key, List[Tuple[int, str]]] = {}
+        for doc_id, doc in documents:
+            meta = doc.metadata
+            if "law" not in meta or "article" not in meta or meta.get("supplement"):
+                continue
+            chunks.setdefault((meta["law"], meta["article"]), []).append((meta.get("article_chunk", 0), doc_id))
+        return cls({key: [doc_id for _, doc_id in sorted(items)] for key, items in chunks.items()})
+
+    # --- 저장/로드 ---
+
+    def save(self, index_dir: str) -> None:
+        records = [{"law": law, "article": article, "ids": ids} for (law, article), ids in self.articles.items()]
+        with open(os.path.join(index_dir, ARTICLE_INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "ArticleIndex":
+        """저장된 인덱스를 읽습니다. 파일이 없으면 빈 인덱스를 반환합니다."""
+        path = os.path.join(index_dir, ARTICLE_INDEX_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        return cls({(record["law"], record["article"]): record["ids"] for record in records})
+
+    # --- 조회 ---
+
+    def _scan(self, text: str) -> Tuple[List[Key], bool]:
+        """
+        텍스트에서 인용된 (법령명, 조 번호)를 순서대로 찾아 (키 목록, 법령을 알 수 없는 조문 인용이 있는지)를 반환합니다.
+        조 번호는 바로 앞에 나온 법령명에 속하며 ('근로기준법 제60조, 제61조'), 떨어져 쓰인 '시행령'/'시행규칙'은
+        앞 법령의 하위 법령('근로기준법 제60조 및 시행령 제33조')을 가리킵니다. 법령명이 없거나, 알려진 법령명이 아닌
+        법령('근로기준법 시행령'이 없을 때의 시행령, 색인되지 않은 '산업안전보건법')을 가리키는 조문은 알 수 없는 인용입니다.
+        """
+        if self._pattern is None:
+            return [], bool(re.search(ARTICLE_REFERENCE_PATTERN, text))
+        keys: List[Key] = []
+        unresolved = False
+        law = None
+        for match in self._pattern.finditer(text):
+            if match.group("law"):
+                name = self._law_by_name[re.sub(r"\s+", "", match.group("law"))]
+                subordinate = SUBORDINATE_SUFFIX.match(text, match.end())
+                law = None if subordinate and not SUBORDINATE_SUFFIX.search(name) else name
+            elif match.group("subordinate"):
+                base = SUBORDINATE_SUFFIX.sub("", law.replace(" ", "")) if law else None
+                law = self._law_by_name.get(base + re.sub(r"\s+", "", match.group("subordinate"))) if base else None
+            elif match.group("other"):
+                law = None
+            elif law is None:
+                unresolved = True
+            else:
+                # ARTICLE_REFERENCE_PATTERN의 그룹: 조 번호, 가지 번호('의N')
+                number, branch = match.group("article_number"), match.group("article_branch")
+                key = (law, number + (f"의{branch}" if branch else ""))
+                if key not in keys:
+                    keys.append(key)
+        return keys, unresolved
+
+    def references(self, text: str) -> List[Key]:
+        """텍스트에서 법령을 알 수 있는 조문 인용 (법령명, 조 번호)를 색인 여부와 관계없이 순서대로 반환합니다."""
+        return self._scan(text)[0]
+
+    def match_keys(self, query: str) -> List[Key]:
+        """
+        질문이 인용한 조문이 모두 색인되어 있으면 그 (법령명, 조 번호)를 순서대로, 아니면 빈 목록을 반환합니다.
+        일부만 색인된 경우 그 조문만으로 답하면 컨텍스트가 빠지므로 검색 경로로 넘깁니다.
+        """
+        keys, unresolved = self._scan(query)
+        if unresolved or any(key not in self.articles for key in keys):
+            return []
+        return keys
+
+    def lookup(self, query: str, docstore: Docstore) -> List[Document]:
+        """
+        질문이 인용한 조문의 청크를 docstore에서 조문 순서대로 가져옵니다.
+        인용한 조문이 없거나 일부가 색인되어 있지 않으면 빈 목록을 반환합니다 (체인은 검색/재순위화로 답합니다).
+        """
+        ids = [doc_id for key in self.match_keys(query) for doc_id in self.articles[key]]
+        return [doc for doc in fetch_documents(docstore, ids) if doc is not None] if ids else []
+
+def build_article_index(db: FAISS) -> ArticleIndex:
+    """FAISS docstore에 저장된 조문 청크로 조회 인덱스를 만듭니다."""
+    return ArticleIndex.from_documents(iter_documents(db))
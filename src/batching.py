@@ -0,0 +1,123 @@
+from langchain_community.cross_encoders import BaseCrossEncoder
+from langchain_core.embeddings import Embeddings
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+import queue
+import threading
+import time
+from . import config
+
+class MicroBatcher:
+    """
+    여러 스레드(요청)에서 들어온 작업을 max_wait_ms 동안 모아 batch_fn 한 번으로 처리합니다.
+    - 첫 작업이 도착하면 최대 max_wait_ms까지, 또는 max_batch_size개가 찰 때까지 기다렸다가 실행합니다.
+    - batch_fn은 작업 목록을 받아 같은 순서의 결과 목록을 반환해야 하며, 예외가 나면 배치의 모든 작업에 전달됩니다.
+    배치를 실행하는 스레드는 하나이므로 모델 호출은 한 번에 하나씩 이루어집니다.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], name: str = "batcher",
+                 max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max_batch_size or config.BATCH_MAX_SIZE
+        self.max_wait = (config.BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self._queue: "queue.Queue[Tuple[Any, Future, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Any:
+        """작업을 큐에 넣고, 배치 처리 결과를 기다려 반환합니다."""
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[Any, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            finished = time.perf_counter()
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._items += len(batch)
+                self._wait_seconds += sum(start - queued for _, _, queued in batch)
+                self._run_seconds += finished - start
+
+    def stats(self) -> dict:
+        """큐 길이, 배치 수/크기 분포, 평균 대기/실행 시간을 반환합니다."""
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / batches, 2) if batches else 0.0,
+                "max_batch_size": max(self._batch_sizes, default=0),
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "mean_queue_wait_ms": round(self._wait_seconds / self._items * 1000, 3) if self._items else 0.0,
+                "mean_batch_run_ms": round(self._run_seconds / batches * 1000, 3) if batches else 0.0,
+            }
+
+class BatchedQueryEmbeddings(Embeddings):
+    """
+    동시에 들어온 질문 임베딩(embed_query) 요청을 모아 embeddings.embed_documents 한 번으로 인코딩합니다.
+    (sentence-transformers 계열처럼 질문과 문서를 같은 방식으로 인코딩하는 모델을 전제로 합니다.)
+    """
+
+    def __init__(self, embeddings: Embeddings, **batcher_kwargs):
+        self.embeddings = embeddings
+        self.batcher = MicroBatcher(embeddings.embed_documents, name="query_encoder", **batcher_kwargs)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.batcher.submit(text)
+
+class BatchedCrossEncoder(BaseCrossEncoder):
+    """
+    동시에 들어온 score() 요청들의 (질문, 문서) 쌍을 이어 붙여 model.score 한 번으로 채점하고 요청별로 나눠 돌려줍니다.
+    """
+
+    def __init__(self, model: BaseCrossEncoder, **batcher_kwargs):
+        self.model = model
+        self.batcher = MicroBatcher(self._score_batch, name="cross_encoder", **batcher_kwargs)
+
+    def _score_batch(self, requests: List[List[Tuple[str, str]]]) -> List[List[float]]:
+        scores = list(self.model.score([pair for pairs in requests for pair in pairs]))
+        results, offset = [], 0
+        for pairs in requests:
+            results.append(scores[offset:offset + len(pairs)])
+            offset += len(pairs)
+        return results
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        if not text_pairs:
+            return []
+        return self.batcher.submit(list(text_pairs))
@@ -0,0 +1,141 @@
+from array import array
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
+import heapq
+import math
+import os
+import re
+import numpy as np
+
+# BM25 파라미터
+K1 = 1.2
+B = 0.75
+
+BM25_INDEX_FILE = "bm25.npz"
+# 토큰화/저장 형식 버전 (바뀌면 올려서 manifest 불일치로 저장된 인덱스를 다시 만들게 합니다)
+BM25_VERSION = 1
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    텍스트를 문자 bigram 토큰으로 변환합니다.
+    한국어는 조사/어미가 붙어 어절 단위 일치가 어렵기 때문에, 어절(한글/영숫자 연속 구간)마다
+    인접한 두 글자씩 잘라 사용합니다. 한 글자 어절은 그대로 토큰이 됩니다.
+    예: '근로기준법 제60조' → ['근로', '로기', '기준', '준법', '제6', '60', '0조']
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class BM25Index:
+    """
+    문자 bigram 역색인 기반 BM25 검색 인덱스입니다.
+    포스팅은 용어별로 문서 번호(array 'I')와 용어 빈도(array 'H')를 나란히 저장하여 메모리를 아낍니다.
+    문서 본문은 보관하지 않고 외부 ID(예: FAISS docstore ID)만 저장합니다.
+    """
+
+    def __init__(self):
+        self.doc_ids: List[str] = []
+        self.doc_lengths = array("I")
+        self.vocabulary: Dict[str, int] = {}
+        self.postings_docs: List[array] = []
+        self.postings_tfs: List[array] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """문서 하나를 색인에 추가합니다."""
+        doc_index = len(self.doc_ids)
+        tokens = tokenize(text)
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                term_id = self.vocabulary[token] = len(self.postings_docs)
+                self.postings_docs.append(array("I"))
+                self.postings_tfs.append(array("H"))
+            self.postings_docs[term_id].append(doc_index)
+            self.postings_tfs[term_id].append(min(tf, 0xFFFF))
+
+    @classmethod
+    def from_texts(cls, items: Iterable[Tuple[str, str]]) -> "BM25Index":
+        """(문서 ID, 텍스트) 목록으로 인덱스를 만듭니다."""
+        index = cls()
+        for doc_id, text in items:
+            index.add(doc_id, text)
+        return index
+
+    # --- 저장/로드 ---
+
+    def save(self, index_dir: str) -> None:
+        """용어별 포스팅을 이어 붙인 배열과 용어별 시작 위치(offsets)로 index_dir에 저장합니다 (pickle 미사용)."""
+        offsets = np.zeros(len(self.postings_docs) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(docs) for docs in self.postings_docs])
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(os.path.join(index_dir, BM25_INDEX_FILE), "wb") as f:
+            np.savez(
+                f,
+                doc_ids=np.array(self.doc_ids, dtype=str),
+                doc_lengths=np.array(self.doc_lengths, dtype=np.uint32),
+                terms=np.array(terms, dtype=str),
+                offsets=offsets,
+                docs=np.array([doc for docs in self.postings_docs for doc in docs], dtype=np.uint32),
+                tfs=np.array([tf for tfs in self.postings_tfs for tf in tfs], dtype=np.uint16),
+            )
+
+    @classmethod
+    def load(cls, index_dir: str) -> Optional["BM25Index"]:
+        """저장된 인덱스를 읽습니다. 파일이 없으면 None을 반환합니다."""
+        path = os.path.join(index_dir, BM25_INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index.doc_ids = data["doc_ids"].tolist()
+            index.doc_lengths = array("I", data["doc_lengths"].tolist())
+            index.total_length = int(data["doc_lengths"].sum())
+            offsets, docs, tfs = data["offsets"], data["docs"], data["tfs"]
+            for term_id, term in enumerate(data["terms"].tolist()):
+                start, end = offsets[term_id], offsets[term_id + 1]
+                index.vocabulary[term] = term_id
+                index.postings_docs.append(array("I", docs[start:end].tolist()))
+                index.postings_tfs.append(array("H", tfs[start:end].tolist()))
+        return index
+
+    # --- 검색 ---
+
+    def search(self, query: str, k: int, allowed: Optional[AbstractSet[str]] = None) -> List[Tuple[str, float]]:
+        """
+        질문과 BM25 점수가 높은 상위 k개의 (문서 ID, 점수)를 반환합니다.
+        allowed를 주면 그 ID의 문서만 후보로 삼습니다 (IDF는 전체 문서 기준).
+        """
+        if not self.doc_ids:
+            return []
+        num_docs = len(self.doc_ids)
+        avg_length = self.total_length / num_docs or 1.0
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            docs, tfs = self.postings_docs[term_id], self.postings_tfs[term_id]
+            idf = math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_index, tf in zip(docs, tfs):
+                norm = K1 * (1 - B + B * self.doc_lengths[doc_index] / avg_length)
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        if allowed is not None:
+            scores = {doc_index: score for doc_index, score in scores.items() if self.doc_ids[doc_index] in allowed}
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.doc_ids[doc_index], score) for doc_index, score in top]
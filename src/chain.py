@@ -0,0 +1,138 @@
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import BaseDocumentCompressor
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough, RunnableParallel
+from typing import Optional
+import time
+from . import config, vector_store, retrieval, reranker, table_lookup, article_lookup, context_packing, llm, answer_cache, instrumentation
+
+PROMPT_TEMPLATE = """
+"당신은 한국 법령 리서처입니다. 아래 <컨텍스트>만을 근거로 "
+"간결하고 정확히 답변하고, 인용(제목/출처)을 제시하세요. "
+"모르면 모른다고 말하세요."
+
+<컨텍스트>
+{context}
+
+[질문]
+{question}
+
+형식:
+- 요약(2~5문장)
+- 핵심포인트(불릿)
+- 인용(제목/출처)
+- 면책고지
+
+최종 답만 한국어로. 사고흐름/메타 금지.
+"""
+
+def format_docs(docs):
+    """검색된 문서를 프롬프트에 삽입할 문자열로 포맷합니다."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+def build_rag_chain(
+    db: FAISS,
+    embeddings: Embeddings,
+    llm_instance: Optional[BaseChatModel] = None,
+    compressor: Optional[BaseDocumentCompressor] = None,
+    index_dir: Optional[str] = None,
+) -> Runnable:
+    """
+    준비된 벡터 저장소로 답변과 출처를 함께 반환하는 RAG 체인을 구성합니다.
+    llm_instance / compressor를 주지 않으면 설정(LLM_BACKEND, RERANKER_BACKEND 등)에 따라 만듭니다.
+    """
+    index_dir = index_dir or config.INDEX_DIR
+
+    # 2.1. 기본 리트리버 설정 (FAISS + BM25 하이브리드 검색으로 더 많은 후보군 확보)
+    base_retriever = retrieval.get_base_retriever(db, index_dir=index_dir)
+
+    # 2.2. 재순위화(Re-ranking) 모델 설정 (후보를 배치로 채점하며 조기 종료)
+    compressor = compressor or reranker.get_reranker()
+
+    # 2.3. 조문 직접 조회 (질문이 '근로기준법 제60조'처럼 법령명과 조 번호를 인용하면 검색/재순위화 생략)
+    article_index = article_lookup.ArticleIndex.load(index_dir) if config.ARTICLE_LOOKUP else article_lookup.ArticleIndex()
+
+    def retrieve_and_rerank(question, config):
+        # 검색/재순위화 단계의 소요 시간과 문서 수를 instrumentation 기록으로 남깁니다.
+        start = time.perf_counter()
+        articles = article_index.lookup(question, db.docstore)
+        if articles:
+            instrumentation.report_stage("article_lookup", time.perf_counter() - start, config, count=len(articles))
+            return articles
+        candidates = base_retriever.invoke(question, config)
+        retrieved = time.perf_counter()
+        docs, stats = reranker.rerank_with_stats(compressor, candidates, question)
+        instrumentation.report_stage("retrieve", retrieved - start, config, count=len(candidates))
+        instrumentation.report_stage("rerank", time.perf_counter() - retrieved, config, count=len(docs), **stats)
+        return docs
+
+    # 3. LLM 인스턴스화
+    llm_instance = llm_instance or llm.get_llm()
+
+    # 4. 프롬프트 템플릿 정의
+    prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+
+    # 5. LCEL을 사용한 RAG 체인 구성 (출처 포함)
+
+    # CONTEXT_PACKING이 켜져 있으면 겹치는 청크 병합/중복 제거 후 토큰 예산만큼만 넣고, 절약한 토큰 수를 기록합니다.
+    pack_context = config.CONTEXT_PACKING
+
+    def format_context(x, config):
+        start = time.perf_counter()
+        if pack_context:
+            context, stats = context_packing.pack_context(x["context"])
+        else:
+            context, stats = format_docs(x["context"]), {}
+        instrumentation.report_stage(
+            "format", time.perf_counter() - start, config,
+            count=len(x["context"]), chars=len(context), tokens=instrumentation.estimate_tokens(context), **stats,
+        )
+        return context
+
+    # 답변 생성 부분
+    rag_chain_from_docs = (
+        RunnablePassthrough.assign(context=format_context)
+        | prompt
+        | llm_instance
+        | StrOutputParser()
+    )
+
+    # 출처(context)와 질문(question)을 받고, 답변(answer)을 생성하여 함께 반환
+    rag_chain_with_source = RunnableParallel(
+        {"context": RunnableLambda(retrieve_and_rerank), "question": RunnablePassthrough()}
+    ).assign(answer=rag_chain_from_docs)
+
+    # 5.1. 의미 기반 답변 캐시 (비슷한 질문은 검색/재순위화/LLM 호출 없이 저장된 답변과 근거를 반환)
+    # 인덱스 manifest나 답변에 영향을 주는 설정(answer_cache.ANSWER_SETTINGS)이 바뀌면 캐시된 답변은 무효화됩니다.
+    if config.ANSWER_CACHE:
+        fingerprint = answer_cache.manifest_fingerprint(vector_store.load_manifest(index_dir))
+        cache = answer_cache.SemanticAnswerCache(embeddings, fingerprint, path=config.ANSWER_CACHE_PATH)
+        rag_chain_with_source = answer_cache.with_answer_cache(rag_chain_with_source, cache)
+
+    # 6. 체력검정 기준표 직접 조회
+    # (구분, 종목, 등급, 나이)를 모두 지정한 질문은 표에서 바로 답하고, 나머지는 RAG 체인으로 넘깁니다.
+    table_index = table_lookup.FitnessTableIndex.load(index_dir)
+    if not len(table_index):
+        return rag_chain_with_source
+
+    def route(query):
+        return table_index.lookup(query) or rag_chain_with_source
+
+    return RunnableLambda(route)
+
+def get_rag_chain_with_source(index_dir: Optional[str] = None) -> Optional[Runnable]:
+    """
+    임베딩 모델과 벡터 저장소를 준비하고 RAG 체인을 초기화합니다.
+    데이터 디렉토리에 문서가 없으면 None을 반환합니다.
+    """
+    # 1~2. 임베딩 모델 로드 및 벡터 저장소 준비
+    # (manifest가 일치하는 저장된 인덱스가 있으면 불러오고, 없으면 로드/분할/임베딩 후 저장)
+    index_dir = index_dir or config.INDEX_DIR
+    embeddings = vector_store.get_embedding_model()
+    db = vector_store.get_or_build_vector_store(embeddings, index_dir)
+    if db is None:
+        return None
+    return build_rag_chain(db, embeddings, index_dir=index_dir)
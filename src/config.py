@@ -7,11 +7,131 @@ _current_dir = os.path.dirname(os.path.abspath(__file__))
 _project_root = os.path.dirname(_current_dir)
 
 # 데이터 디렉토리
-DATA_DIR = os.path.join(_project_root, "data", "raw")
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(_project_root, "data", "raw"))
+
+# 벡터 인덱스 아티팩트 디렉토리 (FAISS 인덱스 + docstore + manifest)
+INDEX_DIR = os.getenv("INDEX_DIR", os.path.join(_project_root, "data", "index"))
+
+# PDF 파싱 결과 캐시 (파일 내용이 같으면 pdfplumber를 다시 실행하지 않음)
+PARSE_CACHE = os.getenv("PARSE_CACHE", "1") == "1"
+PARSED_CACHE_DIR = os.getenv("PARSED_CACHE_DIR", os.path.join(_project_root, "data", "cache", "parsed"))
+
+# PDF 파싱 병렬화 (1이면 단일 프로세스로 순차 파싱)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+# 큰 PDF를 나눌 페이지 범위 크기 (병렬 파싱 작업 단위)
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
 
 # 청킹
 CHUNK_SIZE, OVERLAP = 800, 150
+# .txt 법령 파일을 조문(제N조) 단위로 분할 (CHUNK_SIZE를 넘는 조문만 항/호 경계, 그다음 글자 수 기준으로 추가 분할)
+ARTICLE_SPLIT = os.getenv("ARTICLE_SPLIT", "1") == "1"
+
+# 스트리밍 인덱싱 시 한 번에 임베딩하여 인덱스에 추가할 청크 수
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+
+# --- 벡터 인덱스 설정 ---
+# FAISS 인덱스 종류: "flat"(정확 검색), "hnsw", "ivf_flat", "ivf_pq"
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat")
+# HNSW: 노드당 연결 수, 구축/검색 시 탐색 폭
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "80"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+# IVF: 클러스터 수(코퍼스가 작으면 자동으로 줄어듦), 검색 시 탐색할 클러스터 수, 학습에 쓸 최대 벡터 수
+IVF_NLIST = int(os.getenv("IVF_NLIST", "256"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+IVF_TRAIN_SIZE = int(os.getenv("IVF_TRAIN_SIZE", "20000"))
+# IVF-PQ: 서브 벡터 수(임베딩 차원의 약수), 서브 벡터당 비트 수
+PQ_M = int(os.getenv("PQ_M", "16"))
+PQ_NBITS = int(os.getenv("PQ_NBITS", "8"))
+
+# 청크 본문/metadata 저장소: "sqlite"(디스크, 검색된 청크만 읽음) 또는 "memory"(LangChain InMemoryDocstore, pickle 저장)
+DOCSTORE = os.getenv("DOCSTORE", "sqlite")
+# SQLite docstore를 mmap으로 읽을 최대 크기(MB): 여러 프로세스가 같은 파일의 페이지 캐시를 공유합니다.
+DOCSTORE_MMAP_MB = int(os.getenv("DOCSTORE_MMAP_MB", "256"))
+
+# 인덱스 샤딩: "source"(원본 파일마다 별도 FAISS 인덱스/docstore, 질문의 법령명으로 검색 샤드를 제한) 또는 "none"(단일 인덱스)
+INDEX_SHARDING = os.getenv("INDEX_SHARDING", "source")
+# 법령명이 없는 질문을 전체 샤드에 병렬로 검색할 스레드 수
+SHARD_SEARCH_WORKERS = int(os.getenv("SHARD_SEARCH_WORKERS", "4"))
+
+# --- 검색 설정 ---
+# 재순위화 전 기본 검색 후보 수, 재순위화 후 LLM에 전달할 문서 수
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "20"))
+# 하이브리드 검색에서 FAISS/BM25가 각각 가져와 RRF로 합칠 후보 수 (RETRIEVAL_K보다 작으면 RETRIEVAL_K 사용)
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "50"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "6"))
+# FAISS + BM25(문자 bigram) 하이브리드 검색 사용 여부
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") == "1"
+# 질문이 법령명과 조 번호(예: '근로기준법 제60조')를 인용하면 벡터 검색 없이 해당 조문을 바로 가져옴
+ARTICLE_LOOKUP = os.getenv("ARTICLE_LOOKUP", "1") == "1"
+
+# 적응형 재순위화: 후보를 배치 단위로 채점하다 남은 후보가 상위 N에 들 수 없으면 조기 종료
+ADAPTIVE_RERANK = os.getenv("ADAPTIVE_RERANK", "1") == "1"
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "4"))
+# 상위 N번째 점수가 이 값 이상이면 종료
+RERANK_STOP_SCORE = float(os.getenv("RERANK_STOP_SCORE", "0.95"))
+# 남은 후보의 재순위화 점수를 'dense_score + RERANK_DENSE_SLACK'으로 추정하여 조기 종료 (기본 꺼짐)
+# dense_score와 cross-encoder 점수는 척도가 달라 상한이 아닌 경험적 추정이므로, 켜기 전에 slack을 보정해야 합니다.
+RERANK_DENSE_BOUND = os.getenv("RERANK_DENSE_BOUND", "0") == "1"
+RERANK_DENSE_SLACK = float(os.getenv("RERANK_DENSE_SLACK", "0.35"))
+# (질문, 청크) 점수 캐시 크기
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+
+# 컨텍스트 압축: 같은 원본의 겹치는/이어지는 청크 병합, 중복(표 행과 같은 페이지 본문 등) 제거 후 토큰 예산만큼 채움
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "1") == "1"
+# 프롬프트 컨텍스트의 추정 토큰 예산 (0이면 제한 없음)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2500"))
+# 이미 넣은 구간에 청크의 문자 8-gram이 이 비율 이상 들어 있으면 중복(거의 같은 내용)으로 보고 제외
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.9"))
 
 # --- 모델 설정 ---
+# LLM 백엔드: "gemini"(Google Gemini) 또는 "fake"(네트워크 없이 동작하는 결정적 테스트 모델)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# fake 모델의 첫 토큰 전 지연 시간과 토큰당 지연 시간(초)
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+FAKE_LLM_TOKEN_DELAY = float(os.getenv("FAKE_LLM_TOKEN_DELAY", "0.01"))
+# Gemini 모델 이름
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash-exp")
 # HuggingFace 임베딩 모델 이름
-EMBED_MODEL = os.getenv("EMBED_MODEL", "jhgan/ko-sbert-nli")
\ No newline at end of file
+EMBED_MODEL = os.getenv("EMBED_MODEL", "jhgan/ko-sbert-nli")
+# 재순위화(Cross-Encoder) 모델 이름
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "dragonkue/bge-reranker-v2-m3-ko")
+# 재순위화 모델 실행 백엔드: "torch"(PyTorch) 또는 "onnx"(ONNX Runtime)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "torch")
+RERANKER_ONNX_QUANTIZE = os.getenv("RERANKER_ONNX_QUANTIZE", "1") == "1"
+
+# ONNX 변환 모델 저장 디렉토리, ONNX Runtime intra-op 스레드 수 (0이면 onnxruntime 기본값)
+ONNX_DIR = os.getenv("ONNX_DIR", os.path.join(_project_root, "data", "models", "onnx"))
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+
+# 문서 임베딩 캐시 (모델명 + 텍스트 해시 → float16 벡터)
+EMBED_CACHE = os.getenv("EMBED_CACHE", "1") == "1"
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", os.path.join(_project_root, "data", "cache", "embeddings"))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "1000000"))
+
+# 질문 인코더 백엔드: "torch"(sentence-transformers) 또는 "onnx"(ONNX Runtime, 선택적으로 int8 양자화)
+QUERY_ENCODER_BACKEND = os.getenv("QUERY_ENCODER_BACKEND", "torch")
+QUERY_ENCODER_ONNX_QUANTIZE = os.getenv("QUERY_ENCODER_ONNX_QUANTIZE", "0") == "1"
+# 질문 임베딩 LRU 캐시 크기
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+# 의미 기반 답변 캐시: 질문 임베딩의 코사인 유사도가 임계값 이상이면 저장된 답변/근거를 재사용
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", os.path.join(_project_root, "data", "cache", "answers.jsonl"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+# 항목 유효 시간(초, 0이면 만료 없음)
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+
+# 단계별 측정 기록 파일 (JSON lines, 기본값: 빈 값이면 파일에 쓰지 않음. 예: data/logs/stages.jsonl)
+INSTRUMENTATION_LOG = os.getenv("INSTRUMENTATION_LOG", "")
+# 기록 파일이 이 크기(MB)를 넘으면 '<파일>.1'로 교체하고 새 파일에 씁니다 (0이면 교체하지 않음)
+INSTRUMENTATION_LOG_MAX_MB = float(os.getenv("INSTRUMENTATION_LOG_MAX_MB", "50"))
+# p50/p95/p99 요약에 쓸 단계별 최근 기록 수
+INSTRUMENTATION_HISTORY = int(os.getenv("INSTRUMENTATION_HISTORY", "1000"))
+
+# 질의 서비스(server.py)의 요청 간 마이크로 배치: 최대 배치 크기(요청 수), 첫 요청 이후 최대 대기 시간(ms)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# app.py 시작 시간 목표(초): 백그라운드 로드(import, 모델, 인덱스, 체인 구성)가 이 시간을 넘기면 경고합니다.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "15"))
@@ -0,0 +1,139 @@
+from langchain.docstore.document import Document
+from typing import List, Optional, Tuple
+import re
+from . import config, instrumentation
+from .data_loader import table_row_cells
+
+# 이보다 짧게 겹치는 경우는 우연히 같은 문구로 보고 병합하지 않습니다.
+MIN_MERGE_OVERLAP = 20
+PASSAGE_SEPARATOR = "\n\n"
+# 중복 판단에 쓰는 문자 n-gram(shingle) 길이 (공백 제거 후)
+SHINGLE_SIZE = 8
+
+def _normalize(text: str) -> str:
+    """공백/개행 차이를 무시하고 비교하기 위해 공백을 모두 제거합니다."""
+    return re.sub(r"\s+", "", text)
+
+def _overlap(left: str, right: str) -> int:
+    """left의 끝과 right의 시작이 겹치는 가장 긴 길이 (OVERLAP 이하, MIN_MERGE_OVERLAP 미만이면 0)"""
+    for size in range(min(len(left), len(right), config.OVERLAP), MIN_MERGE_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+def _shingles(normalized: str) -> set:
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(max(len(normalized) - SHINGLE_SIZE + 1, 1))}
+
+def _drop_first_line(text: str) -> str:
+    return text.split("\n", 1)[1] if "\n" in text else ""
+
+class _Passage:
+    """프롬프트에 넣을 구간 하나 (병합된 청크들). rank는 포함된 청크 중 가장 높은 재순위화 순위입니다."""
+
+    def __init__(self, text: str, docs: List[Document], rank: int):
+        self.text = text
+        self.docs = docs
+        self.rank = rank
+        meta = docs[0].metadata
+        self.source, self.page = meta.get("source"), meta.get("page")
+        # 표 행(table_row/complex_table_row)은 다른 구간과 병합하지 않고, 셀 값 비교는 table_row에만 적용합니다.
+        self.row = len(docs) == 1 and docs[0].metadata.get("type") in ("table_row", "complex_table_row")
+        self.cells = table_row_cells(docs[0]) if len(docs) == 1 else []
+        self.normalized = _normalize(text)
+        self.shingles = _shingles(self.normalized)
+        # 조문 단위 청크: (원본, 조 번호, 부칙)이 같고 article_chunk가 이어지면 조문 제목을 한 번만 남기고 잇습니다.
+        self.article = None
+        if all("article_chunk" in doc.metadata for doc in docs):
+            keys = {(doc.metadata.get("source"), doc.metadata.get("article"), doc.metadata.get("supplement")) for doc in docs}
+            if len(keys) == 1:
+                self.article = keys.pop()
+                chunks = [doc.metadata["article_chunk"] for doc in docs]
+                self.first_chunk, self.last_chunk = min(chunks), max(chunks)
+
+    def covers(self, other: "_Passage", threshold: float) -> bool:
+        """other의 내용이 이미 이 구간에 들어 있는지 (포함, 같은 페이지 table_row의 셀 값 포함, 문자 n-gram 포함률) 판단합니다."""
+        if other.normalized in self.normalized:
+            return True
+        if other.cells and not self.row and (other.source, other.page) == (self.source, self.page):
+            if all(_normalize(cell) in self.normalized for cell in other.cells):
+                return True
+        return len(other.shingles & self.shingles) / len(other.shingles) >= threshold
+
+    def merge(self, other: "_Passage") -> Optional["_Passage"]:
+        """other가 이 구간과 겹치거나(OVERLAP) 바로 이어지는(같은 조문의 다음/이전 청크) 경우 병합한 구간을, 아니면 None을 반환합니다."""
+        rank = min(self.rank, other.rank)
+        if self.article is not None and other.article == self.article:
+            # article_chunk가 1 이상인 청크는 앞에 조문 제목 줄이 붙어 있습니다.
+            if other.first_chunk == self.last_chunk + 1:
+                return _Passage(self.text + "\n" + _drop_first_line(other.text), self.docs + other.docs, rank)
+            if other.last_chunk == self.first_chunk - 1:
+                return _Passage(other.text + "\n" + _drop_first_line(self.text), other.docs + self.docs, rank)
+        if (other.source, other.page) != (self.source, self.page) or self.row or other.row:
+            return None
+        # 반복되는 문구로 인한 짧은 우연한 일치보다 실제 청크 겹침이 길므로, 양방향 중 더 길게 겹치는 쪽으로 잇습니다.
+        after, before = _overlap(self.text, other.text), _overlap(other.text, self.text)
+        if after and after >= before:
+            return _Passage(self.text + other.text[after:], self.docs + other.docs, rank)
+        if before:
+            return _Passage(other.text + self.text[before:], other.docs + self.docs, rank)
+        return None
+
+def _join(passages: List[_Passage]) -> str:
+    return PASSAGE_SEPARATOR.join(passage.text for passage in sorted(passages, key=lambda passage: passage.rank))
+
+def pack_context(
+    docs: List[Document],
+    budget: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> Tuple[str, dict]:
+    """
+    재순위화된 청크를 프롬프트 컨텍스트 문자열로 압축합니다.
+    - 같은 원본에서 OVERLAP만큼 겹치거나 같은 조문에서 이어지는 청크는 하나의 구간으로 병합하고
+    - 이미 넣은 구간에 포함되는 청크(같은 페이지 본문에 셀 값이 모두 있는 표 행, 문자 n-gram 포함률이 threshold 이상인 청크)는 제외하며
+    - 재순위화 순서대로 추정 토큰 수(instrumentation.estimate_tokens)가 budget 이하가 되도록 채웁니다 (0이면 제한 없음).
+      예산을 넘는 청크는 건너뛰되, 첫 청크가 예산보다 크면 예산만큼 잘라 넣습니다.
+    (컨텍스트 문자열, 통계)를 반환합니다. 통계의 raw_tokens는 청크를 그대로 이어 붙였을 때의 추정 토큰 수,
+    saved_tokens는 그 대비 줄어든 토큰 수입니다.
+    """
+    budget = config.CONTEXT_TOKEN_BUDGET if budget is None else budget
+    threshold = config.CONTEXT_DEDUP_THRESHOLD if threshold is None else threshold
+    passages: List[_Passage] = []
+    stats = {"merged": 0, "deduplicated": 0, "dropped": 0, "truncated": False}
+
+    for rank, doc in enumerate(docs):
+        text = doc.page_content.strip()
+        if not text:
+            continue
+        new = _Passage(text, [doc], rank)
+        if any(passage.covers(new, threshold) for passage in passages):
+            stats["deduplicated"] += 1
+            continue
+
+        # 병합된 구간이 다른 구간과 다시 이어질 수 있으므로(예: 1번과 3번 청크 사이의 2번 청크) 더 병합할 구간이 없을 때까지 반복합니다.
+        merged, rest, merges = new, list(passages), 0
+        while (pair := next(((p, m) for p in rest if (m := p.merge(merged)) is not None), None)) is not None:
+            rest.remove(pair[0])
+            merged, merges = pair[1], merges + 1
+        if merges:
+            candidate, outcome = rest + [merged], {"merged": merges}
+        else:
+            # 새 구간이 앞서 넣은 구간(예: 같은 페이지의 표 행)을 포함하면 그 구간을 대신합니다.
+            covered = [passage for passage in passages if new.covers(passage, threshold)]
+            if covered:
+                new.rank = min(passage.rank for passage in covered)
+            candidate = [passage for passage in passages if passage not in covered] + [new]
+            outcome = {"deduplicated": len(covered)}
+
+        if budget and instrumentation.estimate_tokens(_join(candidate)) > budget:
+            if passages:
+                stats["dropped"] += 1
+                continue
+            candidate, stats["truncated"] = [_Passage(text[:int(budget * instrumentation.CHARS_PER_TOKEN)], [doc], rank)], True
+        passages = candidate
+        for key, count in outcome.items():
+            stats[key] += count
+
+    context = _join(passages)
+    raw_tokens = instrumentation.estimate_tokens(PASSAGE_SEPARATOR.join(doc.page_content for doc in docs))
+    stats.update(passages=len(passages), raw_tokens=raw_tokens, saved_tokens=raw_tokens - instrumentation.estimate_tokens(context))
+    return context, stats
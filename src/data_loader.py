@@ -1,11 +1,78 @@
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from typing import List
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pdfplumber
+import hashlib
 import os
 import re
-from . import config
+from . import config, doc_cache
+
+# 파서 버전 (파싱 결과가 달라지는 변경 시 올려서 파싱 캐시를 무효화합니다)
+PARSER_VERSION = "2"
+
+# 인덱싱 대상 파일 확장자
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+
+# 체력검정 기준표처럼 카테고리-테이블 매칭 파싱이 필요한 파일의 접두어
+COMPLEX_TABLE_PREFIX = "[별표 31]"
+# '[별표 31]' 파일의 카테고리 제목 (예: '1. 남군')
+CATEGORY_PATTERN = r'^\d+\.\s*(남\s*군|여\s*군|남자\s*군무원|여자\s*군무원)'
+
+# 법령 텍스트의 구조: 조문 제목(예: '제60조(연차 유급휴가)', '제5조의2 삭제'), 장/절 제목, 부칙
+ARTICLE_PATTERN = re.compile(r'^\s*제(\d+)조(?:의(\d+))?(?:\s*\([^)\n]*\))?(?=\s|$)')
+DIVISION_PATTERN = re.compile(r'^\s*제\d+(?:장|절|관|편)(?:의\d+)?(?:\s|$)')
+SUPPLEMENT_PATTERN = re.compile(r'^\s*부\s*칙')
+# 큰 조문을 나눌 경계: 항(①~⑳), 호('1.', '2의2.'), 목('가.')
+CLAUSE_PATTERNS = (
+    re.compile(r'^\s*[\u2460-\u2473]'),
+    re.compile(r'^\s*\d+(?:의\d+)?\.\s'),
+    re.compile(r'^\s*[가-하]\.\s'),
+)
+
+def list_source_files() -> List[str]:
+    """
+    DATA_DIR 아래의 인덱싱 대상 파일 경로를 정렬된 순서로 반환합니다.
+    """
+    paths = []
+    for root, _, files in os.walk(config.DATA_DIR):
+        for file in files:
+            if file.endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+def compute_file_hash(path: str) -> str:
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def relative_source_path(path: str) -> str:
+    """DATA_DIR 기준 상대 경로를 '/' 구분자로 반환합니다. manifest의 파일 키로 사용됩니다."""
+    return os.path.relpath(path, config.DATA_DIR).replace(os.sep, "/")
+
+def compute_file_hashes() -> Dict[str, str]:
+    """DATA_DIR 아래 각 파일의 {상대 경로: 내용 해시}를 계산합니다."""
+    return {relative_source_path(path): compute_file_hash(path) for path in list_source_files()}
+
+def compute_corpus_fingerprint(file_hashes: Optional[Dict[str, str]] = None) -> str:
+    """
+    DATA_DIR 전체 코퍼스의 지문(fingerprint)을 계산합니다.
+    파일의 상대 경로와 내용 해시를 결합하므로, 파일이 추가/삭제/수정되면 값이 달라집니다.
+    """
+    if file_hashes is None:
+        file_hashes = compute_file_hashes()
+    digest = hashlib.sha256()
+    for rel_path in sorted(file_hashes):
+        digest.update(rel_path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_hashes[rel_path].encode("ascii"))
+        digest.update(b"\n")
+    return digest.hexdigest()
 
 def parse_complex_table(table: list, file_name: str, page_num: int, category: str) -> List[Document]:
     """
@@ -79,117 +146,282 @@ def parse_complex_table(table: list, file_name: str, page_num: int, category: st
             )
             documents.append(Document(
                 page_content=sentence,
-                metadata={"source": file_name, "page": page_num, "type": "complex_table_row", "category": category}
+                metadata={
+                    "source": file_name, "page": page_num, "type": "complex_table_row", "category": category,
+                    "sport": current_sport, "grade": grade, "age": clean_text(age_group),
+                    "pass_fail": current_pass_fail, "value": formatted_cell_value,
+                }
             ))
             
     return documents
 
-def load_pdf_documents() -> List[Document]:
+def parse_simple_table(table: list, file_name: str, page_num: int) -> List[Document]:
     """
-    지정된 디렉토리에서 PDF 문서를 로드하고, 페이지별 텍스트와 테이블을 처리합니다.
+    일반 PDF의 간단한 테이블을 헤더 기준의 행 단위 문장으로 변환합니다.
+    """
+    documents = []
+    if not table or len(table) < 2:
+        return documents
+    header = [str(h).strip() if h is not None else "" for h in table[0]]
+    if not any(header):
+        return documents
+    body_rows = table[1:]
+    for row_data in body_rows:
+        row = [str(c).strip() if c is not None else "" for c in row_data]
+        if len(row) != len(header):
+            continue
+        key_parts, value_parts = [], []
+        num_key_cols = min(2, len(header) - 1) if len(header) > 1 else 1
+        for idx, (h, c) in enumerate(zip(header, row)):
+            if not h or not c: continue
+            c = c.replace('\n', ' ')
+            if idx < num_key_cols:
+                key_parts.append(f"'{h}'이(가) '{c}'")
+            else:
+                value_parts.append(f"{h}: {c}")
+        if not key_parts or not value_parts: continue
+        key_str = "이고 ".join(key_parts)
+        value_str = ", ".join(value_parts)
+        sentence = f"'{file_name}' 문서의 표에서 {key_str}인 경우, 세부 내용은 다음과 같습니다: {value_str}."
+        documents.append(Document(
+            page_content=sentence,
+            metadata={"source": file_name, "page": page_num, "type": "table_row"}
+        ))
+    return documents
+
+def table_row_cells(document: Document) -> List[str]:
+    """
+    간단한 표 행 문서(table_row)가 원본 표에서 가져온 셀 값들, 즉 parse_simple_table이 만든 문장의
+    키 셀('h'이(가) 'c')과 값 셀(h: c)을 반환합니다. table_row가 아니면 빈 목록입니다.
+    (complex_table_row는 페이지 텍스트에서 사라진 구분/등급/나이 연결을 담고 있으므로 셀 값만으로 비교하지 않습니다.)
+    """
+    meta = document.metadata
+    if meta.get("type") != "table_row":
+        return []
+    text = document.page_content
+    cells = [cell for _, cell in re.findall(r"'([^']*)'이\(가\) '([^']*)'", text)]
+    _, _, values = text.partition("세부 내용은 다음과 같습니다: ")
+    for part in values.rstrip(".").split(", "):
+        cells.append(part.split(": ", 1)[-1])
+    return [cell for cell in cells if cell.strip()]
+
+def page_may_have_tables(page) -> bool:
+    """
+    페이지에 테이블 후보(괘선)가 있는지 빠르게 확인합니다.
+    extract_tables()의 기본 전략('lines')은 선/사각형/곡선 객체의 경계선으로만 테이블을 찾으므로,
+    이런 객체가 하나도 없는 페이지는 결과가 항상 비어 있어 추출을 건너뛰어도 출력이 같습니다.
+    """
+    return bool(page.lines or page.rects or page.curves)
+
+def _empty_part(error: bool = False) -> dict:
+    return {"documents": [], "categories": [], "tables": [], "error": error, "pages": 0, "table_pages_skipped": 0}
+
+def parse_pdf_pages(pdf_path: str, start: int = 0, end: Optional[int] = None) -> dict:
+    """
+    PDF의 [start, end) 페이지 범위를 파싱합니다. 병렬 파싱 시 작업 단위가 됩니다.
+    - '[별표 31]' 파일: 페이지 텍스트 문서와 함께, 파일 전체에서 매칭해야 하는
+      카테고리와 테이블을 순서대로 수집하여 반환합니다 (매칭은 merge_pdf_parts에서 수행).
+    - 그 외 파일: 페이지 텍스트와 간단한 테이블 행 문서를 페이지 순서대로 반환합니다.
+    """
+    file_name = os.path.basename(pdf_path)
+    is_complex = file_name.startswith(COMPLEX_TABLE_PREFIX)
+    part = _empty_part()
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            for i, page in enumerate(pdf.pages[start:end], start=start):
+                page_num = i + 1
+                part["pages"] += 1
+                has_table_candidates = page_may_have_tables(page)
+                if not has_table_candidates:
+                    part["table_pages_skipped"] += 1
+
+                if is_complex:
+                    page_text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+
+                    # 카테고리 찾기 (정규식에서 $ 제거)
+                    found_categories = re.findall(CATEGORY_PATTERN, page_text, re.MULTILINE)
+                    if found_categories:
+                        part["categories"].extend([c.replace(" ", "") for c in found_categories])
+
+                    # 테이블 찾기 (괘선이 없는 페이지는 생략)
+                    tables = page.extract_tables() if has_table_candidates else []
+                    if tables:
+                        for table in tables:
+                            part["tables"].append({"page": page_num, "table": table})
+
+                    # 원본 페이지 텍스트는 항상 추가
+                    if page_text.strip():
+                        part["documents"].append(Document(
+                            page_content=page_text,
+                            metadata={"source": file_name, "page": page_num, "type": "text"}
+                        ))
+                    continue
+
+                # --- 그 외 모든 PDF 파일에 대한 일반 처리 ---
+                page_text = page.extract_text() or ""
+
+                if page_text.strip():
+                    part["documents"].append(Document(
+                        page_content=page_text,
+                        metadata={"source": file_name, "page": page_num, "type": "text"}
+                    ))
+
+                tables = page.extract_tables() if has_table_candidates else []
+                if tables:
+                    for table in tables:
+                        part["documents"].extend(parse_simple_table(table, file_name, page_num))
+    except Exception as e:
+        print(f"'{pdf_path}' 파일 처리 중 오류 발생: {e}")
+        part["error"] = True
+    return part
+
+def merge_pdf_parts(pdf_path: str, parts: List[dict]) -> List[Document]:
+    """
+    페이지 범위별 파싱 결과를 페이지 순서대로 합칩니다.
+    '[별표 31]' 파일은 파일 전체에서 수집한 카테고리와 테이블을 1:1로 매칭하여 파싱합니다.
+    """
+    file_name = os.path.basename(pdf_path)
+    documents = [doc for part in parts for doc in part["documents"]]
+    if not file_name.startswith(COMPLEX_TABLE_PREFIX) or any(part["error"] for part in parts):
+        return documents
+
+    all_categories = [c for part in parts for c in part["categories"]]
+    all_tables_with_pages = [t for part in parts for t in part["tables"]]
+
+    # 수집된 카테고리와 테이블을 1:1로 매칭하여 파싱
+    if len(all_categories) == len(all_tables_with_pages):
+        for i, table_info in enumerate(all_tables_with_pages):
+            category = all_categories[i]
+            table = table_info["table"]
+            page_num = table_info["page"]
+            documents.extend(parse_complex_table(table, file_name, page_num, category))
+    else:
+        print(f"Warning in {file_name}: Found {len(all_categories)} categories and {len(all_tables_with_pages)} tables. Could not perform reliable parsing.")
+    return documents
+
+def load_pdf_file(pdf_path: str) -> List[Document]:
+    """
+    PDF 파일 하나를 로드하고, 페이지별 텍스트와 테이블을 처리합니다.
     - '[별표 31]' 파일은 카테고리(남군, 여군 등)를 식별하여 특별 파싱합니다.
     - 그 외 PDF는 일반 텍스트와 간단한 테이블 행을 파싱합니다.
     """
-    documents = []
-    for root, _, files in os.walk(config.DATA_DIR):
-        for file in files:
-            if not file.endswith(".pdf"):
-                continue
-            
-            pdf_path = os.path.join(root, file)
-            file_name = os.path.basename(pdf_path)
-
-            # '[별표 31]' 파일은 특별 로직으로 처리
-            if file.startswith("[별표 31]"):
-                try:
-                    with pdfplumber.open(pdf_path) as pdf:
-                        all_categories = []
-                        all_tables_with_pages = []
-
-                        # 1. PDF의 모든 페이지를 순회하며 카테고리와 테이블을 순서대로 수집
-                        for i, page in enumerate(pdf.pages):
-                            page_num = i + 1
-                            page_text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-                            
-                            # 카테고리 찾기 (정규식에서 $ 제거)
-                            found_categories = re.findall(r'^\d+\.\s*(남\s*군|여\s*군|남자\s*군무원|여자\s*군무원)', page_text, re.MULTILINE)
-                            if found_categories:
-                                all_categories.extend([c.replace(" ", "") for c in found_categories])
-                            
-                            # 테이블 찾기
-                            tables = page.extract_tables()
-                            if tables:
-                                for table in tables:
-                                    all_tables_with_pages.append({"page": page_num, "table": table})
-                            
-                            # 원본 페이지 텍스트는 항상 추가
-                            if page_text.strip():
-                                documents.append(Document(
-                                    page_content=page_text,
-                                    metadata={"source": file_name, "page": page_num, "type": "text"}
-                                ))
-
-                        # 2. 수집된 카테고리와 테이블을 1:1로 매칭하여 파싱
-                        if len(all_categories) == len(all_tables_with_pages):
-                            for i, table_info in enumerate(all_tables_with_pages):
-                                category = all_categories[i]
-                                table = table_info["table"]
-                                page_num = table_info["page"]
-                                documents.extend(parse_complex_table(table, file_name, page_num, category))
-                        else:
-                            print(f"Warning in {file_name}: Found {len(all_categories)} categories and {len(all_tables_with_pages)} tables. Could not perform reliable parsing.")
-
-                except Exception as e:
-                    print(f"'{pdf_path}' 파일 처리 중 오류 발생: {e}")
-                continue
+    return merge_pdf_parts(pdf_path, [parse_pdf_pages(pdf_path)])
 
-            # --- 그 외 모든 PDF 파일에 대한 일반 처리 ---
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    for i, page in enumerate(pdf.pages):
-                        page_num = i + 1
-                        page_text = page.extract_text() or ""
-                        
-                        if page_text.strip():
-                            documents.append(Document(
-                                page_content=page_text,
-                                metadata={"source": file_name, "page": page_num, "type": "text"}
-                            ))
-
-                        tables = page.extract_tables()
-                        if tables:
-                            for table in tables:
-                                if not table or len(table) < 2:
-                                    continue
-                                header = [str(h).strip() if h is not None else "" for h in table[0]]
-                                if not any(header):
-                                    continue
-                                body_rows = table[1:]
-                                for row_data in body_rows:
-                                    row = [str(c).strip() if c is not None else "" for c in row_data]
-                                    if len(row) != len(header):
-                                        continue
-                                    key_parts, value_parts = [], []
-                                    num_key_cols = min(2, len(header) - 1) if len(header) > 1 else 1
-                                    for idx, (h, c) in enumerate(zip(header, row)):
-                                        if not h or not c: continue
-                                        c = c.replace('\n', ' ')
-                                        if idx < num_key_cols:
-                                            key_parts.append(f"'{h}'이(가) '{c}'")
-                                        else:
-                                            value_parts.append(f"{h}: {c}")
-                                    if not key_parts or not value_parts: continue
-                                    key_str = "이고 ".join(key_parts)
-                                    value_str = ", ".join(value_parts)
-                                    sentence = f"'{file_name}' 문서의 표에서 {key_str}인 경우, 세부 내용은 다음과 같습니다: {value_str}."
-                                    documents.append(Document(
-                                        page_content=sentence,
-                                        metadata={"source": file_name, "page": page_num, "type": "table_row"}
-                                    ))
-            except Exception as e:
-                print(f"'{pdf_path}' 파일 처리 중 오류 발생: {e}")
+def _count_pdf_pages(pdf_path: str) -> Optional[int]:
+    """PDF의 페이지 수를 반환합니다. 열 수 없으면 None을 반환합니다."""
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except Exception as e:
+        print(f"'{pdf_path}' 파일 처리 중 오류 발생: {e}")
+        return None
+
+def _parse_pdf_pages_task(task: tuple) -> dict:
+    """ProcessPoolExecutor.submit에 넘기기 위한 parse_pdf_pages 래퍼입니다."""
+    return parse_pdf_pages(*task)
+
+def _new_parse_stats() -> dict:
+    """적재 한 번의 파싱 통계: PDF 수, 파싱 캐시 적중 수, 파싱한 페이지 수, 테이블 추출을 생략한 페이지 수"""
+    return {"pdf_files": 0, "cache_hits": 0, "pages": 0, "table_pages_skipped": 0}
+
+def _report_parse_stats(stats: dict) -> None:
+    if config.PARSE_CACHE and stats["pdf_files"]:
+        print(f"파싱 캐시: {stats['cache_hits']}/{stats['pdf_files']}개 PDF 적중")
+    if stats["pages"]:
+        print(f"테이블 추출 생략: {stats['table_pages_skipped']}/{stats['pages']} 페이지 (괘선 없음)")
+
+def _submit_file(path: str, executor: Optional[ProcessPoolExecutor], stats: dict) -> dict:
+    """
+    파일 하나의 로드를 시작합니다. .txt와 파싱 캐시에 있는 PDF는 바로 문서 목록을 담고,
+    그 외 PDF는 executor가 있으면 파일과 큰 파일의 페이지 범위(PDF_PAGES_PER_TASK) 단위로 작업을 제출합니다.
+    """
+    entry = {"path": path, "documents": None, "parts": None, "cache_key": None}
+    if not path.endswith(".pdf"):
+        entry["documents"] = load_txt_file(path)
+        return entry
+    stats["pdf_files"] += 1
+    if config.PARSE_CACHE:
+        entry["cache_key"] = doc_cache.make_cache_key(os.path.basename(path), compute_file_hash(path), PARSER_VERSION)
+        cached = doc_cache.load_documents(entry["cache_key"])
+        if cached is not None:
+            stats["cache_hits"] += 1
+            entry["documents"] = cached
+            return entry
+    if executor is None:
+        return entry
+    num_pages = _count_pdf_pages(path)
+    if num_pages is None:
+        # 순차 파싱과 같이 오류 결과를 남겨, 빈 문서 목록이 파싱 캐시에 저장되지 않도록 합니다.
+        entry["parts"] = [_empty_part(error=True)]
+        return entry
+    entry["parts"] = [
+        executor.submit(_parse_pdf_pages_task, (path, start, min(start + config.PDF_PAGES_PER_TASK, num_pages)))
+        for start in range(0, num_pages, config.PDF_PAGES_PER_TASK)
+    ]
+    return entry
+
+def _finish_file(entry: dict, stats: dict) -> List[Document]:
+    """_submit_file로 시작한 로드를 (필요하면 작업 결과를 기다려) 마치고 문서 목록을 반환합니다."""
+    if entry["documents"] is not None:
+        return entry["documents"]
+    path = entry["path"]
+    if entry["parts"] is None:
+        parts = [parse_pdf_pages(path)]
+    else:
+        # 작업 제출 순서대로 결과를 모으므로 문서 순서가 결정적으로 유지됩니다.
+        parts = [part if isinstance(part, dict) else part.result() for part in entry["parts"]]
+    documents = merge_pdf_parts(path, parts)
+    stats["pages"] += sum(part["pages"] for part in parts)
+    stats["table_pages_skipped"] += sum(part["table_pages_skipped"] for part in parts)
+    # 파싱 중 오류가 난 파일은 다음 실행에서 다시 시도하도록 캐시하지 않습니다.
+    if entry["cache_key"] is not None and not any(part["error"] for part in parts):
+        doc_cache.save_documents(entry["cache_key"], documents)
     return documents
 
+def _iter_loaded_files(paths: List[str], workers: int, stats: dict) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    파일들을 로드하여 (경로, 문서 목록)을 입력 순서대로 생성합니다.
+    workers가 2 이상이면 적재 전체에서 프로세스 풀 하나를 쓰며, 메모리를 제한하기 위해
+    결과를 기다리는 파일을 최대 workers * 2개까지만 앞서 제출합니다.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and any(path.endswith(".pdf") for path in paths) else None
+    pending: Deque[dict] = deque()
+    try:
+        for path in paths:
+            pending.append(_submit_file(path, executor, stats))
+            while len(pending) > max(1, workers) * 2:
+                entry = pending.popleft()
+                yield entry["path"], _finish_file(entry, stats)
+        while pending:
+            entry = pending.popleft()
+            yield entry["path"], _finish_file(entry, stats)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def load_pdf_files(pdf_paths: List[str], workers: Optional[int] = None) -> Dict[str, List[Document]]:
+    """
+    여러 PDF 파일을 로드하여 {경로: 문서 목록}을 입력 순서대로 반환합니다.
+    - PARSE_CACHE가 켜져 있으면 (파일명, 내용 해시, PARSER_VERSION)으로 파싱 캐시를 먼저 조회하고,
+      캐시에 없는 파일만 pdfplumber로 파싱한 뒤 결과를 캐시에 저장합니다.
+    - 파싱은 workers(기본값: PDF_WORKERS) 설정에 따라 병렬로 수행됩니다.
+    """
+    return load_files(pdf_paths, workers)
+
+def load_pdf_documents(workers: Optional[int] = None) -> List[Document]:
+    """
+    지정된 디렉토리에서 PDF 문서를 로드하고, 페이지별 텍스트와 테이블을 처리합니다.
+    """
+    pdf_paths = [path for path in list_source_files() if path.endswith(".pdf")]
+    loaded = load_pdf_files(pdf_paths, workers)
+    return [doc for path in pdf_paths for doc in loaded[path]]
+
+def load_txt_file(txt_path: str) -> List[Document]:
+    """
+    .txt 파일 하나를 로드합니다.
+    """
+    return TextLoader(txt_path, encoding="utf-8").load()
+
 def load_txt_documents() -> List[Document]:
     """
     지정된 디렉토리에서 .txt 문서를 로드합니다.
@@ -204,6 +436,39 @@ def load_txt_documents() -> List[Document]:
     )
     return txt_loader.load()
 
+def load_files(paths: List[str], workers: Optional[int] = None) -> Dict[str, List[Document]]:
+    """
+    여러 파일을 로드하여 {경로: 문서 목록}을 입력 순서대로 반환합니다.
+    PDF는 (설정 시) 파싱 캐시를 거쳐 병렬로 파싱합니다.
+    """
+    return dict(iter_file_documents(paths, workers))
+
+def iter_file_documents(
+    paths: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    stats: Optional[dict] = None,
+) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    파일 단위로 (경로, 문서 목록)을 순서대로 생성합니다.
+    전체 코퍼스를 한 번에 메모리에 올리지 않도록, 병렬 작업자 수의 두 배까지만 파일을 앞서 파싱합니다.
+    파싱 통계는 끝까지 생성한 뒤 한 번 출력하며, stats(dict)를 주면 같은 통계를 누적해 기록합니다.
+    """
+    paths = list_source_files() if paths is None else paths
+    workers = config.PDF_WORKERS if workers is None else workers
+    totals = _new_parse_stats()
+    yield from _iter_loaded_files(paths, workers, totals)
+    _report_parse_stats(totals)
+    if stats is not None:
+        for key, value in totals.items():
+            stats[key] = stats.get(key, 0) + value
+
+def iter_all_documents() -> Iterator[Document]:
+    """
+    지정된 디렉토리의 모든 문서(.txt, .pdf)를 파일 순서대로 하나씩 생성합니다.
+    """
+    for _, documents in iter_file_documents():
+        yield from documents
+
 def load_all_documents() -> List[Document]:
     """
     지정된 디렉토리에서 모든 문서(.txt, .pdf)를 로드하고 결합합니다.
@@ -212,14 +477,124 @@ def load_all_documents() -> List[Document]:
     pdf_documents = load_pdf_documents()
     return txt_documents + pdf_documents
 
-def split_documents(documents: List[Document]) -> List[Document]:
-    """
-    로드된 문서를 설정에 따라 청크로 분할합니다.
-    """
-    splitter = RecursiveCharacterTextSplitter(
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    """설정(CHUNK_SIZE, OVERLAP)에 따른 텍스트 분할기를 만듭니다."""
+    return RecursiveCharacterTextSplitter(
         chunk_size=config.CHUNK_SIZE,
         chunk_overlap=config.OVERLAP,
         length_function=len,
         is_separator_regex=False,
     )
-    return splitter.split_documents(documents)
\ No newline at end of file
+
+def law_name_from_source(source: str) -> str:
+    """'근로기준법(법률)(제18176호).txt' 같은 파일 경로에서 법령명('근로기준법')을 추출합니다."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return re.sub(r'\s*[(\[].*$', '', stem).strip() or stem
+
+def _split_at(text: str, pattern: re.Pattern) -> List[str]:
+    """pattern과 일치하는 줄마다 새 단위를 시작하여 텍스트를 나눕니다."""
+    units: List[List[str]] = []
+    for line in text.splitlines():
+        if not units or pattern.match(line):
+            units.append([])
+        units[-1].append(line)
+    return ["\n".join(unit) for unit in units]
+
+def _pack(units: List[str], limit: int) -> List[str]:
+    """연속된 단위를 limit 글자를 넘지 않는 범위에서 하나로 합칩니다."""
+    packed = []
+    for unit in units:
+        if packed and len(packed[-1]) + 1 + len(unit) <= limit:
+            packed[-1] += "\n" + unit
+        else:
+            packed.append(unit)
+    return packed
+
+def _split_clauses(text: str, limit: int, splitter: RecursiveCharacterTextSplitter, patterns=CLAUSE_PATTERNS) -> List[str]:
+    """limit을 넘는 조문을 항 → 호 → 목 경계 순으로 나누고, 그래도 큰 단위만 글자 수 기준으로 나눕니다."""
+    if len(text) <= limit:
+        return [text]
+    if not patterns:
+        return splitter.split_text(text)
+    units = _split_at(text, patterns[0])
+    if len(units) == 1:
+        return _split_clauses(text, limit, splitter, patterns[1:])
+    return [piece for unit in _pack(units, limit) for piece in _split_clauses(unit, limit, splitter, patterns[1:])]
+
+def split_statute_articles(document: Document, splitter: Optional[RecursiveCharacterTextSplitter] = None) -> Optional[List[Document]]:
+    """
+    법령 텍스트를 조문(제N조) 단위 청크로 나눕니다. 조문 제목이 없는 문서이면 None을 반환합니다.
+    - 조문 하나가 청크 하나이며, 청크 사이에 겹침(overlap)이 없습니다.
+    - CHUNK_SIZE를 넘는 조문만 항/호/목 경계로 나누고, 이어지는 청크 앞에는 조문 제목을 붙입니다.
+    - 청크 metadata에 law(법령명), article('60', '60의2'), article_chunk(조문 안 순서)를 기록합니다.
+      장/절 제목은 division에, 부칙의 조문은 supplement에 부칙 제목을 기록합니다.
+    - 첫 조문 앞의 머리말(법령명, 시행일 등)과 조문이 없는 부칙 본문은 일반 분할기로 나눕니다.
+    """
+    lines = document.page_content.splitlines()
+    if not any(ARTICLE_PATTERN.match(line) for line in lines):
+        return None
+    splitter = splitter or get_text_splitter()
+    law = law_name_from_source(document.metadata.get("source", ""))
+
+    # (조문 제목 match 또는 None, 장/절 제목, 부칙 제목, 줄 목록) 단위로 모읍니다.
+    sections = [(None, None, None, [])]
+    division = supplement = None
+    for line in lines:
+        if SUPPLEMENT_PATTERN.match(line):
+            division, supplement = None, line.strip()
+            sections.append((None, None, supplement, [line]))
+        elif DIVISION_PATTERN.match(line):
+            division = line.strip()
+        elif match := ARTICLE_PATTERN.match(line):
+            sections.append((match, division, supplement, [line]))
+        else:
+            sections[-1][3].append(line)
+
+    chunks = []
+    for match, division, supplement, section_lines in sections:
+        text = "\n".join(section_lines).strip()
+        if not text or (match is None and text == supplement):
+            continue
+        if match is None:
+            chunks.extend(splitter.split_documents([Document(page_content=text, metadata=dict(document.metadata))]))
+            continue
+        heading = match.group(0).strip()
+        metadata = dict(
+            document.metadata, law=law,
+            article=match.group(1) + (f"의{match.group(2)}" if match.group(2) else ""),
+        )
+        if division:
+            metadata["division"] = division
+        if supplement:
+            metadata["supplement"] = supplement
+        # 이어지는 청크 앞에 붙일 조문 제목만큼 여유를 둡니다.
+        pieces = _split_clauses(text, max(config.CHUNK_SIZE - len(heading) - 1, 1), splitter)
+        for i, piece in enumerate(pieces):
+            chunks.append(Document(
+                page_content=piece if i == 0 else f"{heading}\n{piece}",
+                metadata=dict(metadata, article_chunk=i),
+            ))
+    return chunks
+
+def _split_document(document: Document, splitter: RecursiveCharacterTextSplitter) -> List[Document]:
+    """ARTICLE_SPLIT이 켜져 있으면 .txt 법령은 조문 단위로, 그 외 문서는 분할기 설정대로 나눕니다."""
+    if config.ARTICLE_SPLIT and document.metadata.get("source", "").endswith(".txt"):
+        chunks = split_statute_articles(document, splitter)
+        if chunks is not None:
+            return chunks
+    return splitter.split_documents([document])
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    """
+    로드된 문서를 설정에 따라 청크로 분할합니다.
+    """
+    splitter = get_text_splitter()
+    return [chunk for document in documents for chunk in _split_document(document, splitter)]
+
+def iter_split_documents(documents: Iterable[Document]) -> Iterator[Document]:
+    """
+    문서 스트림을 하나씩 분할하여 청크를 생성합니다. split_documents의 스트리밍 버전입니다.
+    """
+    splitter = get_text_splitter()
+    for document in documents:
+        yield from _split_document(document, splitter)
\ No newline at end of file
@@ -0,0 +1,49 @@
+from langchain.docstore.document import Document
+from typing import List, Optional
+import gzip
+import hashlib
+import json
+import os
+from . import config
+
+def make_cache_key(file_name: str, file_hash: str, parser_version: str) -> str:
+    """
+    파일명, 파일 내용 해시, 파서 버전으로 캐시 키를 만듭니다.
+    문서 metadata의 'source'에 파일명이 들어가므로 파일명도 키에 포함합니다.
+    """
+    raw = f"{parser_version}\0{file_name}\0{file_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _cache_path(key: str, cache_dir: Optional[str]) -> str:
+    cache_dir = cache_dir or config.PARSED_CACHE_DIR
+    return os.path.join(cache_dir, key[:2], f"{key}.jsonl.gz")
+
+def load_documents(key: str, cache_dir: Optional[str] = None) -> Optional[List[Document]]:
+    """
+    캐시된 문서 목록을 읽습니다. 캐시가 없거나 손상된 경우 None을 반환합니다.
+    """
+    path = _cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [
+                Document(page_content=record["c"], metadata=record["m"])
+                for record in map(json.loads, f)
+            ]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"파싱 캐시 읽기 실패 ({path}): {e}")
+        return None
+
+def save_documents(key: str, documents: List[Document], cache_dir: Optional[str] = None) -> None:
+    """
+    문서 목록(page_content + metadata)을 gzip 압축된 JSON Lines로 저장합니다.
+    """
+    path = _cache_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for doc in documents:
+            record = {"c": doc.page_content, "m": doc.metadata}
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, path)
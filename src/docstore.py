@@ -0,0 +1,120 @@
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import json
+import os
+import sqlite3
+import threading
+from . import config
+
+DOCSTORE_FILE = "docstore.sqlite"
+
+# SQLite가 한 쿼리에 허용하는 바인딩 변수 수(구버전 기본값 999)보다 작게 나눠 조회합니다.
+_FETCH_BATCH = 500
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    청크 본문과 metadata를 SQLite 파일에 저장하는 FAISS docstore입니다.
+    InMemoryDocstore와 달리 모든 Document를 메모리에 올리지 않고 필요한 청크만 읽으며,
+    파일을 mmap(DOCSTORE_MMAP_MB)으로 읽으므로 같은 인덱스를 여는 여러 프로세스가 OS 페이지 캐시를 공유합니다.
+    연결 하나를 잠금으로 보호하여 여러 스레드에서 사용할 수 있습니다.
+    """
+
+    def __init__(self, path: str, mmap_mb: Optional[int] = None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        mmap_mb = config.DOCSTORE_MMAP_MB if mmap_mb is None else mmap_mb
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_mb) * 2**20}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        rows = [
+            (doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str))
+            for doc_id, doc in texts.items()
+        ]
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT INTO documents VALUES (?, ?, ?)", rows)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Tried to add ids that already exist: {set(texts)}")
+
+    def delete(self, ids: List) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM documents WHERE id = ?", [(doc_id,) for doc_id in ids])
+
+    def search(self, search: str) -> Union[str, Document]:
+        document = self.mget([search])[0]
+        return document if document is not None else f"ID {search} not found."
+
+    def mget(self, ids: Sequence[str]) -> List[Optional[Document]]:
+        """여러 ID의 Document를 입력 순서대로 반환합니다. 없는 ID는 None입니다."""
+        found: Dict[str, Document] = {}
+        with self._lock:
+            for i in range(0, len(ids), _FETCH_BATCH):
+                batch = list(ids[i:i + _FETCH_BATCH])
+                rows = self._conn.execute(
+                    f"SELECT id, page_content, metadata FROM documents WHERE id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for doc_id, page_content, metadata in rows:
+                    found[doc_id] = Document(id=doc_id, page_content=page_content, metadata=json.loads(metadata))
+        return [found.get(doc_id) for doc_id in ids]
+
+    def backup(self, path: str) -> None:
+        """현재 내용을 path의 새 SQLite 파일로 복사합니다."""
+        target = sqlite3.connect(path)
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def fetch_documents(docstore: Docstore, ids: Sequence[str]) -> List[Optional[Document]]:
+    """
+    docstore에서 여러 ID의 Document를 입력 순서대로 가져옵니다. 없는 ID는 None입니다.
+    mget을 제공하는 docstore(SQLiteDocstore, shards.ShardedDocstore)는 한 번에 묶어 조회합니다.
+    """
+    if hasattr(docstore, "mget"):
+        return docstore.mget(ids)
+    return [doc if isinstance(doc := docstore.search(doc_id), Document) else None for doc_id in ids]
+
+def iter_documents(db: FAISS, batch_size: int = _FETCH_BATCH) -> Iterator[Tuple[str, Document]]:
+    """벡터 인덱스에 들어 있는 청크를 (docstore ID, Document)로 batch_size개씩 읽어 생성합니다."""
+    ids = list(db.index_to_docstore_id.values())
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        for doc_id, doc in zip(batch, fetch_documents(db.docstore, batch)):
+            if doc is not None:
+                yield doc_id, doc
+
+def save_sqlite_docstore(db: FAISS, path: str) -> None:
+    """db의 docstore 내용을 path의 SQLite 파일로 저장합니다."""
+    if isinstance(db.docstore, SQLiteDocstore):
+        db.docstore.backup(path)
+        return
+    store = SQLiteDocstore(path)
+    try:
+        batch: Dict[str, Document] = {}
+        for doc_id, doc in iter_documents(db):
+            batch[doc_id] = doc
+            if len(batch) >= _FETCH_BATCH:
+                store.add(batch)
+                batch = {}
+        if batch:
+            store.add(batch)
+    finally:
+        store.close()
@@ -0,0 +1,239 @@
+from langchain_core.embeddings import Embeddings
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+from . import config
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f16"
+INDEX_FILE = "index.log"
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델을 감싸 문서 임베딩을 (모델명 + 텍스트 해시) 키로 디스크에 캐시합니다.
+    - 벡터는 float16 memmap 배열(vectors.f16)에, 키 → 슬롯 매핑은 추가 전용 로그(index.log)에 저장합니다.
+    - max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 제거(LRU)하고 슬롯을 재사용합니다.
+    - 질문 임베딩(embed_query)은 캐시하지 않고 원래 모델에 위임합니다.
+    한 캐시 디렉토리에는 한 프로세스만 기록한다고 가정합니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str,
+                 cache_dir: Optional[str] = None, max_entries: Optional[int] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache_dir = os.path.join(cache_dir or config.EMBED_CACHE_DIR, re.sub(r"[^\w.-]", "_", model_name))
+        self.max_entries = max_entries if max_entries is not None else config.EMBED_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._size = 0
+        self._log_lines = 0
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    # --- 저장소 관리 ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self) -> None:
+        """meta/벡터/인덱스 로그를 읽어 캐시 상태를 복원합니다."""
+        try:
+            with open(self._path(META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            self._dim = meta["dim"]
+            self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float16, mode="r+",
+                                      shape=(meta["capacity"], self._dim))
+        except (OSError, ValueError, KeyError):
+            self._dim, self._vectors = None, None
+            return
+
+        if os.path.exists(self._path(INDEX_FILE)):
+            with open(self._path(INDEX_FILE), encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 2:
+                        continue
+                    key, slot = parts[0], int(parts[1])
+                    self._log_lines += 1
+                    if slot < 0:
+                        self._slots.pop(key, None)
+                    else:
+                        self._slots[key] = slot
+                        self._slots.move_to_end(key)
+
+        self._size = max(self._slots.values(), default=-1) + 1
+        used = set(self._slots.values())
+        self._free = [slot for slot in range(self._size) if slot not in used]
+
+    def _allocate(self, dim: int) -> int:
+        """벡터를 저장할 슬롯을 할당합니다. 필요하면 memmap 파일을 두 배로 늘립니다."""
+        if self._free:
+            return self._free.pop()
+        if self._vectors is None:
+            self._dim = dim
+            self._resize(1024)
+        elif self._size >= self._vectors.shape[0]:
+            self._resize(self._vectors.shape[0] * 2)
+        self._size += 1
+        return self._size - 1
+
+    def _resize(self, capacity: int) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self._path(VECTORS_FILE), "ab") as f:
+            f.truncate(capacity * self._dim * np.dtype(np.float16).itemsize)
+        self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float16, mode="r+",
+                                  shape=(capacity, self._dim))
+        with open(self._path(META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"model_name": self.model_name, "dim": self._dim, "capacity": capacity}, f)
+
+    def _compact(self) -> None:
+        """현재 항목만 LRU 순서대로 담아 인덱스 로그를 다시 씁니다."""
+        tmp_path = self._path(INDEX_FILE) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, slot in self._slots.items():
+                f.write(f"{key} {slot}\n")
+        os.replace(tmp_path, self._path(INDEX_FILE))
+        self._log_lines = len(self._slots)
+
+    def _append_log(self, lines: List[str]) -> None:
+        """인덱스 로그에 줄을 추가하고 디스크에 내려 씁니다."""
+        with open(self._path(INDEX_FILE), "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lines += len(lines)
+
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        """
+        새 벡터들을 저장하고, max_entries를 넘으면 LRU 항목을 제거합니다.
+        제거한 키의 삭제 기록을 먼저 로그에 내려 쓴 뒤 슬롯을 덮어쓰고, 새 키의 슬롯은 벡터를 쓴 뒤에 기록하므로
+        도중에 중단되어도 로그가 다른 키의 벡터를 가리키지 않습니다.
+        """
+        evicted, slots = [], {}
+        for key, vector in vectors.items():
+            while self.max_entries and len(self._slots) >= self.max_entries:
+                evicted_key, evicted_slot = self._slots.popitem(last=False)
+                self._free.append(evicted_slot)
+                if slots.pop(evicted_key, None) is None:
+                    evicted.append(f"{evicted_key} -1\n")
+            slots[key] = self._slots[key] = self._allocate(len(vector))
+        if evicted:
+            self._append_log(evicted)
+
+        for key, slot in slots.items():
+            self._vectors[slot] = np.asarray(vectors[key], dtype=np.float16)
+        self._vectors.flush()
+        self._append_log([f"{key} {slot}\n" for key, slot in slots.items()])
+        if self._log_lines > 2 * len(self._slots) + 1024:
+            self._compact()
+
+    # --- Embeddings 인터페이스 ---
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """캐시에 있는 텍스트는 저장된 벡터를 쓰고, 처음 보는 텍스트만 인코딩합니다."""
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            if key in self._slots:
+                self._slots.move_to_end(key)
+                found[key] = self._vectors[self._slots[key]].astype(np.float32).tolist()
+            else:
+                missing[key] = text
+
+        if missing:
+            # 캐시 적중 시와 같은 값을 반환하도록 float16으로 반올림합니다.
+            encoded = np.asarray(self.embeddings.embed_documents(list(missing.values())), dtype=np.float16)
+            new_vectors = dict(zip(missing, encoded.astype(np.float32).tolist()))
+            self._store(new_vectors)
+            found.update(new_vectors)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [list(found[key]) for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    # --- 통계 ---
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "entries": len(self._slots),
+            "max_entries": self.max_entries,
+        }
+
+class QueryCacheEmbeddings(Embeddings):
+    """
+    질문 임베딩(embed_query)에 크기 제한 LRU 캐시를 두는 래퍼입니다.
+    키는 앞뒤 공백을 없애고 연속 공백을 하나로 줄인 질문 텍스트입니다.
+    query_embeddings를 주면 질문은 그 모델(예: ONNX 질문 인코더)로, 문서는 embeddings로 인코딩합니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, query_embeddings: Optional[Embeddings] = None,
+                 max_size: Optional[int] = None):
+        self.embeddings = embeddings
+        self.query_embeddings = query_embeddings or embeddings
+        self.max_size = max_size if max_size is not None else config.QUERY_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        return " ".join(text.split())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.normalize_query(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            self.misses += 1
+
+        vector = self.query_embeddings.embed_query(key)
+        with self._lock:
+            self._cache[key] = vector
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return list(vector)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._cache),
+            "max_size": self.max_size,
+        }
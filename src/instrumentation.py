@@ -0,0 +1,219 @@
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.manager import dispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from . import config
+
+# 체인 안의 단계가 자신의 소요 시간을 알릴 때 쓰는 LangChain custom event 이름
+STAGE_EVENT = "rag_stage"
+
+# 프롬프트 토큰 수 추정용 (한국어 법령 텍스트 기준 대략적인 값)
+CHARS_PER_TOKEN = 2.0
+
+def estimate_tokens(text: str) -> int:
+    """문자 수로 토큰 수를 대략 추정합니다."""
+    return int(len(text) / CHARS_PER_TOKEN + 0.5)
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스의 최대 RSS(MB)를 반환합니다. resource 모듈이 없는 환경(Windows)에서는 None을 반환합니다."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss 단위는 macOS는 바이트, 그 외는 KB입니다.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10, 1)
+
+def current_rss_mb() -> Optional[float]:
+    """현재 프로세스의 RSS(MB)를 반환합니다. 측정할 수 없는 환경이면 None을 반환합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    # /proc이 없는 환경(macOS 등)에서는 최대 RSS로 대신합니다.
+    return peak_rss_mb()
+
+class StageRecorder:
+    """
+    단계별 측정 기록을 JSON lines 파일(log_path)에 쓰고, 단계마다 최근 history개의 소요 시간을 보관하여
+    p50/p95/p99 요약을 제공합니다. 여러 스레드에서 동시에 기록해도 안전합니다.
+    파일이 max_mb(기본값: INSTRUMENTATION_LOG_MAX_MB)를 넘으면 '<log_path>.1'로 교체하여 디스크 사용량을 제한합니다.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, history: Optional[int] = None, max_mb: Optional[float] = None):
+        self.log_path = log_path
+        self.history = history or config.INSTRUMENTATION_HISTORY
+        self.max_bytes = (config.INSTRUMENTATION_LOG_MAX_MB if max_mb is None else max_mb) * 2**20
+        self._seconds: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.history))
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, **fields) -> dict:
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            **fields,
+            "rss_mb": current_rss_mb(),
+        }
+        with self._lock:
+            self._seconds[stage].append(seconds)
+            if self.log_path:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    size = f.tell()
+                if self.max_bytes and size > self.max_bytes:
+                    os.replace(self.log_path, self.log_path + ".1")
+        return record
+
+    def summary(self) -> Dict[str, dict]:
+        """단계별 기록 수와 소요 시간(초)의 p50/p95/p99를 반환합니다."""
+        with self._lock:
+            samples = {stage: np.array(values) for stage, values in self._seconds.items() if values}
+        return {
+            stage: {
+                "count": len(values),
+                "p50": round(float(np.percentile(values, 50)), 4),
+                "p95": round(float(np.percentile(values, 95)), 4),
+                "p99": round(float(np.percentile(values, 99)), 4),
+            }
+            for stage, values in samples.items()
+        }
+
+_recorder: Optional[StageRecorder] = None
+_recorder_lock = threading.Lock()
+
+def get_recorder() -> StageRecorder:
+    """INSTRUMENTATION_LOG 설정을 사용하는 프로세스 공용 StageRecorder를 반환합니다."""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = StageRecorder(config.INSTRUMENTATION_LOG or None)
+        return _recorder
+
+class StageTotals:
+    """
+    스트리밍 인덱싱처럼 여러 단계가 번갈아 실행되는 작업에서 단계별 누적 시간과 처리 개수를 모았다가,
+    emit() 시 단계마다 하나의 기록으로 남깁니다.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def add(self, stage: str, seconds: float, count: int = 0) -> None:
+        self.seconds[stage] += seconds
+        self.counts[stage] += count
+
+    @contextmanager
+    def timed(self, stage: str, count: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, count)
+
+    def iterate(self, stage: str, iterable: Iterable) -> Iterator:
+        """iterable에서 다음 항목을 꺼내는 데 걸린 시간과 항목 수를 stage에 누적합니다."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start)
+                return
+            self.add(stage, time.perf_counter() - start, 1)
+            yield item
+
+    def emit(self, recorder: Optional[StageRecorder] = None, **fields) -> List[dict]:
+        recorder = recorder or get_recorder()
+        return [
+            recorder.record(stage, seconds, count=self.counts[stage], **fields)
+            for stage, seconds in self.seconds.items()
+        ]
+
+@contextmanager
+def timed_stage(stage: str, recorder: Optional[StageRecorder] = None, **fields):
+    """with 블록의 소요 시간을 하나의 단계 기록으로 남깁니다. 블록 안에서 yield된 dict에 필드를 추가할 수 있습니다."""
+    extra: Dict[str, Any] = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        (recorder or get_recorder()).record(stage, time.perf_counter() - start, **extra)
+
+def report_stage(stage: str, seconds: float, run_config: Optional[RunnableConfig] = None, **fields) -> None:
+    """
+    체인 안의 단계(RunnableLambda 등)가 자신의 소요 시간을 알립니다.
+    실행 시 QueryTrace 콜백을 넘긴 경우에만 기록되며, 콜백이 없으면 아무것도 하지 않습니다.
+    """
+    if not run_config or not run_config.get("callbacks"):
+        return
+    dispatch_custom_event(STAGE_EVENT, {"stage": stage, "seconds": seconds, **fields}, config=run_config)
+
+class QueryTrace(BaseCallbackHandler):
+    """
+    질문 하나의 단계별 측정 기록을 모으는 콜백입니다. `chain.invoke(query, config={"callbacks": [trace]})`로 넘깁니다.
+    - retrieve / rerank / format: 각 단계가 report_stage()로 보낸 기록
+    - llm: 채팅 모델 콜백으로 측정 (프롬프트 문자/추정 토큰 수, 첫 토큰까지 시간, 출력 문자 수)
+    모든 기록은 같은 trace ID로 StageRecorder에도 남습니다.
+    """
+
+    def __init__(self, recorder: Optional[StageRecorder] = None):
+        self.recorder = recorder or get_recorder()
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.records: List[dict] = []
+        self._llm_runs: Dict[uuid.UUID, dict] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, stage: str, seconds: float, **fields) -> None:
+        record = self.recorder.record(stage, seconds, trace=self.trace_id, **fields)
+        with self._lock:
+            self.records.append(record)
+
+    def on_custom_event(self, name: str, data: Any, *, run_id: uuid.UUID, **kwargs) -> None:
+        if name == STAGE_EVENT:
+            data = dict(data)
+            self._record(data.pop("stage"), data.pop("seconds"), **data)
+
+    def _start_llm(self, run_id: uuid.UUID, prompt: str) -> None:
+        self._llm_runs[run_id] = {"start": time.perf_counter(), "first_token": None, "prompt": prompt}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: uuid.UUID, **kwargs) -> None:
+        self._start_llm(run_id, "".join(str(message.content) for batch in messages for message in batch))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: uuid.UUID, **kwargs) -> None:
+        self._start_llm(run_id, "".join(prompts))
+
+    def on_llm_new_token(self, token: str, *, run_id: uuid.UUID, **kwargs) -> None:
+        run = self._llm_runs.get(run_id)
+        if run is not None and run["first_token"] is None:
+            run["first_token"] = time.perf_counter() - run["start"]
+
+    def on_llm_end(self, response, *, run_id: uuid.UUID, **kwargs) -> None:
+        run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        output = "".join(g.text for generations in response.generations for g in generations)
+        self._record(
+            "llm",
+            time.perf_counter() - run["start"],
+            prompt_chars=len(run["prompt"]),
+            prompt_tokens=estimate_tokens(run["prompt"]),
+            first_token_seconds=None if run["first_token"] is None else round(run["first_token"], 4),
+            output_chars=len(output),
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs) -> None:
+        self._llm_runs.pop(run_id, None)
@@ -1,11 +1,84 @@
 import os
+import re
+import time
+from typing import Any, Iterator, List, Optional
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from . import config
+
+class FakeLegalChatModel(BaseChatModel):
+    """
+    네트워크 없이 벤치마크/로컬 실행에 쓰는 결정적(deterministic) 채팅 모델입니다.
+    프롬프트의 질문과 컨텍스트 앞부분으로 항상 같은 답변을 만들며,
+    첫 토큰 전 latency초, 토큰마다 token_delay초를 기다려 실제 LLM의 지연 시간을 흉내 냅니다.
+    """
+
+    latency: float = 0.0
+    token_delay: float = 0.0
+    max_context_chars: int = 200
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-legal-chat"
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        question = re.search(r"\[질문\]\s*(.+)", prompt)
+        context = re.search(r"<컨텍스트>\n(.*?)\s*\[질문\]", prompt, re.DOTALL)
+        excerpt = " ".join((context.group(1) if context else "").split())[:self.max_context_chars]
+        return (
+            f"- 요약: '{question.group(1).strip() if question else ''}'에 대한 테스트 답변입니다.\n"
+            f"- 핵심포인트: {excerpt}\n"
+            "- 인용: 컨텍스트 참조\n"
+            "- 면책고지: 로컬 테스트 모델이 생성한 답변입니다."
+        )
+
+    def _tokens(self, text: str) -> List[str]:
+        return re.findall(r"\S+\s*|\s+", text)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        answer = self._answer(messages)
+        time.sleep(self.latency + self.token_delay * len(self._tokens(answer)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=answer))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for i, token in enumerate(self._tokens(self._answer(messages))):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
 
 def get_llm():
     """
-    .env 파일에서 API 키를 로드하고, Google Gemini 모델 인스턴스를 반환합니다.
+    LLM_BACKEND 설정에 따라 LLM 인스턴스를 반환합니다.
+    - "gemini": .env 파일에서 API 키를 로드하고, Google Gemini 모델 인스턴스를 반환합니다.
+    - "fake": 네트워크 없이 동작하는 FakeLegalChatModel (FAKE_LLM_LATENCY, FAKE_LLM_TOKEN_DELAY)
     """
+    if config.LLM_BACKEND == "fake":
+        return FakeLegalChatModel(latency=config.FAKE_LLM_LATENCY, token_delay=config.FAKE_LLM_TOKEN_DELAY)
+    if config.LLM_BACKEND != "gemini":
+        raise ValueError(f"지원하지 않는 LLM_BACKEND입니다: {config.LLM_BACKEND} (지원: gemini, fake)")
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     # .env 파일에서 환경 변수를 로드합니다.
     load_dotenv()
 
@@ -15,9 +88,9 @@ def get_llm():
 
     # Google Gemini 모델을 초기화합니다.
     llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash-exp",
+        model=config.LLM_MODEL,
         google_api_key=api_key,
         temperature=0,
     )
-    
-    return llm
\ No newline at end of file
+
+    return llm
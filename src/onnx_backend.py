@@ -0,0 +1,170 @@
+from langchain_community.cross_encoders import BaseCrossEncoder
+from langchain_core.embeddings import Embeddings
+from typing import List, Optional, Tuple
+import json
+import os
+import re
+import numpy as np
+from . import config
+
+# onnxruntime / transformers / torch는 ONNX 백엔드를 사용할 때만 필요하므로 함수 안에서 import합니다.
+
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+
+def onnx_model_dir(model_name: str) -> str:
+    """모델별 ONNX 변환 결과를 저장할 디렉토리를 반환합니다."""
+    return os.path.join(config.ONNX_DIR, re.sub(r"[^\w.-]", "_", model_name))
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("ONNX 백엔드를 사용하려면 onnxruntime을 설치하세요: pip install onnxruntime") from e
+    return onnxruntime
+
+def export_onnx_model(model_name: str, task: str, quantize: bool = True, output_dir: Optional[str] = None) -> str:
+    """
+    HuggingFace 모델을 ONNX로 변환하고, quantize가 참이면 동적 int8 양자화까지 수행합니다.
+    task는 'sequence-classification'(cross-encoder) 또는 'feature-extraction'(임베딩 모델)입니다.
+    토크나이저도 같은 디렉토리에 저장하며, 사용할 모델 파일 경로를 반환합니다.
+    이미 변환된 파일이 있으면 다시 변환하지 않습니다.
+    """
+    output_dir = output_dir or onnx_model_dir(model_name)
+    fp32_path = os.path.join(output_dir, FP32_MODEL_FILE)
+    int8_path = os.path.join(output_dir, INT8_MODEL_FILE)
+    target_path = int8_path if quantize else fp32_path
+    if os.path.exists(target_path):
+        return target_path
+
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+        print(f"ONNX 변환 시작: {model_name} ({task})")
+        os.makedirs(output_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model_cls = AutoModelForSequenceClassification if task == "sequence-classification" else AutoModel
+        model = model_cls.from_pretrained(model_name).eval()
+
+        dummy = tokenizer([("질문", "문서")] if task == "sequence-classification" else ["문장"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+        output_name = "logits" if task == "sequence-classification" else "last_hidden_state"
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes[output_name] = {0: "batch"}
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(dummy[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=[output_name],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+        tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        _import_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"동적 int8 양자화: {fp32_path}")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return target_path
+
+def create_session(model_path: str, intra_op_threads: Optional[int] = None):
+    """CPU용 ONNX Runtime 세션을 만듭니다. intra_op_threads가 0이면 onnxruntime 기본값을 씁니다."""
+    ort = _import_onnxruntime()
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    threads = config.ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    if threads:
+        options.intra_op_num_threads = threads
+    return ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+def tokenizer_max_length(model_name: str, tokenizer) -> Optional[int]:
+    """
+    sentence-transformers CrossEncoder와 같이 토크나이저의 model_max_length를 최대 토큰 수로 씁니다.
+    토크나이저에 값이 없으면(transformers의 매우 큰 기본값) 모델 config의 max_position_embeddings를 씁니다.
+    """
+    if tokenizer.model_max_length < 10**6:
+        return tokenizer.model_max_length
+    from transformers import AutoConfig
+
+    return getattr(AutoConfig.from_pretrained(model_name), "max_position_embeddings", None)
+
+def sentence_max_length(model_name: str, tokenizer) -> Optional[int]:
+    """
+    sentence-transformers SentenceTransformer와 같이 sentence_bert_config.json의 max_seq_length를 최대 토큰 수로 씁니다.
+    파일이 없으면 tokenizer_max_length를 씁니다.
+    """
+    try:
+        from huggingface_hub import hf_hub_download
+
+        with open(hf_hub_download(model_name, "sentence_bert_config.json"), encoding="utf-8") as f:
+            max_seq_length = json.load(f).get("max_seq_length")
+    except (ImportError, OSError, ValueError):
+        max_seq_length = None
+    return max_seq_length or tokenizer_max_length(model_name, tokenizer)
+
+class OnnxCrossEncoder(BaseCrossEncoder):
+    """
+    ONNX Runtime으로 실행하는 cross-encoder입니다. HuggingFaceCrossEncoder와 같은 점수 척도를 반환하므로
+    CrossEncoderReranker / AdaptiveCrossEncoderReranker에 그대로 꽂아 쓸 수 있습니다.
+    (출력이 1개인 모델은 sentence-transformers CrossEncoder와 같이 sigmoid를 적용합니다.)
+    max_length를 주지 않으면 PyTorch 모델과 같은 최대 토큰 수(tokenizer_max_length)로 자릅니다.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = True, intra_op_threads: Optional[int] = None, max_length: Optional[int] = None):
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx_model(model_name, "sequence-classification", quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+        self.session = create_session(model_path, intra_op_threads)
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.max_length = max_length or tokenizer_max_length(model_name, self.tokenizer)
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        if not text_pairs:
+            return []
+        encoded = self.tokenizer(
+            [query for query, _ in text_pairs],
+            [doc for _, doc in text_pairs],
+            padding=True, truncation=True, max_length=self.max_length, return_tensors="np",
+        )
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        if logits.shape[1] == 1:
+            return (1.0 / (1.0 + np.exp(-logits[:, 0]))).tolist()
+        return logits[:, 1].tolist()
+
+class OnnxSentenceEmbeddings(Embeddings):
+    """
+    ONNX Runtime으로 실행하는 sentence-transformers 임베딩 모델입니다.
+    mean pooling 후 L2 정규화하여 HuggingFaceEmbeddings(normalize_embeddings=True)와 같은 형태의 벡터를 반환합니다.
+    (jhgan/ko-sbert-nli처럼 mean pooling을 쓰는 모델을 전제로 합니다.)
+    max_length를 주지 않으면 PyTorch 모델과 같은 최대 토큰 수(sentence_max_length)로 자릅니다.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False, intra_op_threads: Optional[int] = None, max_length: Optional[int] = None):
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx_model(model_name, "feature-extraction", quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+        self.session = create_session(model_path, intra_op_threads)
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.max_length = max_length or sentence_max_length(model_name, self.tokenizer)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
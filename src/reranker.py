@@ -0,0 +1,162 @@
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor
+from langchain.docstore.document import Document
+from langchain.retrievers.document_compressors import CrossEncoderReranker
+from langchain_community.cross_encoders import BaseCrossEncoder, HuggingFaceCrossEncoder
+from pydantic import ConfigDict, PrivateAttr
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+import hashlib
+import threading
+from . import config
+
+class AdaptiveCrossEncoderReranker(BaseDocumentCompressor):
+    """
+    후보를 1차 검색 순서대로 작은 배치씩 채점하다가, 남은 후보가 상위 top_n에 들 수 없다고 판단되면
+    채점을 멈추는 재순위화 단계입니다. (질문, 청크) 점수는 LRU 캐시에 보관합니다.
+
+    조기 종료 조건 (최소 top_n개를 채점한 뒤 배치마다 확인):
+    - 점수 마진: 현재 top_n번째 점수가 stop_score 이상이면 이미 충분히 확실한 결과로 보고 종료합니다.
+    - 밀집 점수 추정 (dense_bound가 참일 때만): 남은 후보의 cross-encoder 점수를 'dense_score + dense_slack'으로
+      추정하여, 그 최댓값이 현재 top_n번째 점수보다 낮으면 종료합니다. dense_score(1 - L2거리/4)와 cross-encoder 점수는
+      척도가 달라 이 값은 상한이 아닌 경험적 추정이므로, 채점하지 않은 관련 후보를 놓칠 수 있습니다.
+      dense_score가 없는 후보(BM25로만 찾은 후보 등)는 1.0으로 보므로 반드시 채점됩니다.
+      켜기 전에 실제 (dense_score, cross-encoder 점수) 쌍으로 dense_slack을 맞추고 sweep.py로 지표 변화를 확인해야 합니다.
+    """
+
+    model: BaseCrossEncoder
+    top_n: int = 6
+    batch_size: int = 4
+    stop_score: float = 0.95
+    dense_bound: bool = False
+    dense_slack: float = 0.35
+    cache_size: int = 10000
+
+    model_config = ConfigDict(arbitrary_types_allowed=True, extra="forbid")
+
+    _cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _cache_key(self, query: str, doc: Document) -> Tuple[str, str]:
+        return query, hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+    def _score_batch(self, query: str, docs: List[Document]) -> Tuple[List[float], int]:
+        """배치를 채점합니다. 캐시에 있는 쌍은 건너뛰고, (점수 목록, 캐시 적중 수)를 반환합니다."""
+        keys = [self._cache_key(query, doc) for doc in docs]
+        with self._lock:
+            scores = [self._cache.get(key) for key in keys]
+            for key, score in zip(keys, scores):
+                if score is not None:
+                    self._cache.move_to_end(key)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            new_scores = self.model.score([(query, docs[i].page_content) for i in missing])
+            with self._lock:
+                for i, score in zip(missing, new_scores):
+                    scores[i] = float(score)
+                    self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores, len(docs) - len(missing)
+
+    def _should_stop(self, scored: List[Tuple[float, int]], remaining: Sequence[Document]) -> Optional[str]:
+        if len(scored) < self.top_n:
+            return None
+        kth_score = sorted((score for score, _ in scored), reverse=True)[self.top_n - 1]
+        if kth_score >= self.stop_score:
+            return "score_margin"
+        if not self.dense_bound:
+            return None
+        estimate = max(
+            (doc.metadata["dense_score"] + self.dense_slack if "dense_score" in doc.metadata else 1.0)
+            for doc in remaining
+        )
+        if estimate < kth_score:
+            return "dense_bound"
+        return None
+
+    def rerank(self, documents: Sequence[Document], query: str) -> Tuple[List[Document], dict]:
+        """
+        후보를 재순위화하여 (상위 top_n 문서, 채점 통계)를 반환합니다.
+        통계(후보 수, 실제 채점 수, 캐시 적중 수, 건너뛴 수, 종료 사유)는 호출마다 따로 반환하므로
+        여러 요청이 같은 인스턴스를 동시에 써도 섞이지 않습니다.
+        """
+        scored: List[Tuple[float, int]] = []
+        cached = 0
+        stop_reason = "exhausted"
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            scores, hits = self._score_batch(query, list(batch))
+            cached += hits
+            scored.extend((score, start + i) for i, score in enumerate(scores))
+
+            remaining = documents[start + self.batch_size:]
+            if not remaining:
+                break
+            reason = self._should_stop(scored, remaining)
+            if reason:
+                stop_reason = reason
+                break
+
+        stats = {
+            "candidates": len(documents),
+            "scored": len(scored) - cached,
+            "cached": cached,
+            "skipped": len(documents) - len(scored),
+            "stop_reason": stop_reason,
+        }
+        top = sorted(scored, key=lambda item: item[0], reverse=True)[:self.top_n]
+        return [
+            Document(id=documents[i].id, page_content=documents[i].page_content,
+                     metadata=dict(documents[i].metadata, rerank_score=score))
+            for score, i in top
+        ], stats
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        return self.rerank(documents, query)[0]
+
+def get_cross_encoder(backend: Optional[str] = None) -> BaseCrossEncoder:
+    """
+    RERANKER_BACKEND 설정에 따라 cross-encoder 모델을 로드합니다.
+    - "torch": sentence-transformers(PyTorch) 모델
+    - "onnx": ONNX로 변환(RERANKER_ONNX_QUANTIZE이면 동적 int8 양자화)한 모델을 ONNX Runtime으로 실행
+    """
+    backend = backend or config.RERANKER_BACKEND
+    if backend == "onnx":
+        from .onnx_backend import OnnxCrossEncoder
+        return OnnxCrossEncoder(config.RERANKER_MODEL, quantize=config.RERANKER_ONNX_QUANTIZE)
+    if backend != "torch":
+        raise ValueError(f"지원하지 않는 RERANKER_BACKEND입니다: {backend} (지원: torch, onnx)")
+    return HuggingFaceCrossEncoder(model_name=config.RERANKER_MODEL)
+
+def get_reranker(top_n: Optional[int] = None, model: Optional[BaseCrossEncoder] = None) -> BaseDocumentCompressor:
+    """
+    재순위화 단계를 만듭니다.
+    ADAPTIVE_RERANK가 켜져 있으면 조기 종료/점수 캐시를 쓰는 AdaptiveCrossEncoderReranker,
+    아니면 모든 후보를 채점하는 CrossEncoderReranker를 반환합니다.
+    model을 주지 않으면 RERANKER_BACKEND 설정에 따라 cross-encoder를 로드합니다.
+    """
+    top_n = top_n or config.RERANK_TOP_N
+    cross_encoder_model = model or get_cross_encoder()
+    if not config.ADAPTIVE_RERANK:
+        return CrossEncoderReranker(model=cross_encoder_model, top_n=top_n)
+    return AdaptiveCrossEncoderReranker(
+        model=cross_encoder_model,
+        top_n=top_n,
+        batch_size=config.RERANK_BATCH_SIZE,
+        stop_score=config.RERANK_STOP_SCORE,
+        dense_bound=config.RERANK_DENSE_BOUND,
+        dense_slack=config.RERANK_DENSE_SLACK,
+        cache_size=config.RERANK_CACHE_SIZE,
+    )
+
+def rerank_with_stats(compressor: BaseDocumentCompressor, documents: Sequence[Document], query: str) -> Tuple[List[Document], dict]:
+    """재순위화 결과와 그 호출의 채점 통계를 반환합니다. 통계를 내지 않는 재순위화 단계는 빈 통계를 반환합니다."""
+    if isinstance(compressor, AdaptiveCrossEncoderReranker):
+        return compressor.rerank(documents, query)
+    return list(compressor.compress_documents(documents, query)), {}
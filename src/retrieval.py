@@ -0,0 +1,137 @@
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import time
+import numpy as np
+from . import config
+from .bm25 import BM25Index
+from .docstore import fetch_documents, iter_documents
+from .shards import ShardedVectorStore
+
+# 단일 FAISS 저장소(INDEX_SHARDING="none") 또는 원본 파일별 샤드 묶음(INDEX_SHARDING="source")
+VectorStore = Union[FAISS, ShardedVectorStore]
+
+def build_bm25_index(db: VectorStore) -> BM25Index:
+    """
+    FAISS docstore에 저장된 청크(= 벡터 인덱스와 같은 분할 결과)로 BM25 인덱스를 만듭니다.
+    """
+    start_time = time.perf_counter()
+    index = BM25Index.from_texts((doc_id, doc.page_content) for doc_id, doc in iter_documents(db))
+    print(f"BM25 인덱스 구축: 청크 {len(index)}개, 용어 {len(index.vocabulary)}개 ({time.perf_counter() - start_time:.1f}s)")
+    return index
+
+def load_bm25_index(db: VectorStore, index_dir: Optional[str] = None) -> BM25Index:
+    """
+    인덱스 아티팩트(index_dir)에 함께 저장된 BM25 인덱스를 불러옵니다.
+    index_dir이 없거나, 파일이 없거나, 청크 수가 벡터 인덱스와 다르면 docstore에서 새로 만듭니다.
+    """
+    index = BM25Index.load(index_dir) if index_dir else None
+    num_vectors = db.ntotal if isinstance(db, ShardedVectorStore) else db.index.ntotal
+    if index is None or len(index) != num_vectors:
+        return build_bm25_index(db)
+    return index
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[Tuple[str, float]]:
+    """
+    여러 검색 결과 순위를 RRF(Reciprocal Rank Fusion)로 합칩니다.
+    각 문서의 점수는 Σ 1 / (rrf_k + 순위)이며, 점수가 높은 순으로 반환합니다.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+def dense_search_ids(db: VectorStore, query: str, k: int, shards: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+    """
+    FAISS 검색 결과를 docstore를 읽지 않고 (docstore ID, 0~1 범위의 관련도 'dense_score') 목록으로 반환합니다.
+    임베딩이 정규화되어 있으므로 FAISS의 L2 제곱 거리 d에 대해 코사인 유사도는 1 - d/2이고,
+    이를 0~1 범위로 옮긴 (1 + cos) / 2 = 1 - d/4를 관련도로 사용합니다.
+    샤드 묶음이면 shards(샤드 키 목록, None이면 전체 샤드)만 검색합니다.
+    """
+    vector = np.array([db.embeddings.embed_query(query)], dtype=np.float32)
+    if isinstance(db, ShardedVectorStore):
+        hits = db.search(vector, k, shards)
+    else:
+        distances, indices = db.index.search(vector, k)
+        hits = [(db.index_to_docstore_id[int(i)], float(distance)) for distance, i in zip(distances[0], indices[0]) if i != -1]
+    return [(doc_id, min(1.0, max(0.0, 1.0 - distance / 4))) for doc_id, distance in hits]
+
+def route_shards(db: VectorStore, query: str) -> Optional[List[str]]:
+    """질문이 법령명을 언급하면 해당 법령의 샤드 키 목록을, 아니면(또는 단일 저장소이면) None을 반환합니다."""
+    return db.route(query) if isinstance(db, ShardedVectorStore) else None
+
+def fetch_with_scores(db: VectorStore, scored_ids: List[Tuple[str, float]], score_key: str) -> List[Document]:
+    """(docstore ID, 점수) 순서대로 청크를 한 번에 가져와 metadata[score_key]에 점수를 기록합니다."""
+    docs = fetch_documents(db.docstore, [doc_id for doc_id, _ in scored_ids])
+    return [
+        Document(id=doc_id, page_content=doc.page_content, metadata=dict(doc.metadata, **{score_key: score}))
+        for (doc_id, score), doc in zip(scored_ids, docs)
+        if doc is not None
+    ]
+
+def dense_search(db: VectorStore, query: str, k: int, shards: Optional[Sequence[str]] = None) -> List[Document]:
+    """
+    FAISS 검색 결과를 반환하며, 각 문서 metadata에 0~1 범위의 관련도 'dense_score'를 기록합니다.
+    (재순위화 단계의 조기 종료 판단에 사용됩니다.)
+    """
+    return fetch_with_scores(db, dense_search_ids(db, query, k, shards), "dense_score")
+
+class HybridRetriever(BaseRetriever):
+    """
+    FAISS(밀집 벡터) 검색과 BM25(문자 bigram) 검색 결과를 RRF로 결합하는 리트리버입니다.
+    '근로기준법 제60조'처럼 정확한 토큰 일치가 중요한 질문의 후보 재현율을 높입니다.
+    두 검색 모두 ID만으로 순위를 합친 뒤, 최종 k개 청크만 docstore에서 읽습니다.
+    샤드 묶음에서 질문이 법령명을 언급하면 두 검색 모두 해당 법령의 샤드로 제한합니다.
+    """
+
+    vector_store: VectorStore
+    bm25_index: BM25Index
+    k: int = 20
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        shards = route_shards(self.vector_store, query)
+        dense = dense_search_ids(self.vector_store, query, self.fetch_k, shards)
+        allowed = self.vector_store.doc_ids(shards) if shards else None
+        lexical = self.bm25_index.search(query, self.fetch_k, allowed)
+
+        dense_scores = dict(dense)
+        fused = reciprocal_rank_fusion(
+            [[doc_id for doc_id, _ in dense], [doc_id for doc_id, _ in lexical]], self.rrf_k
+        )[:self.k]
+        results = fetch_with_scores(self.vector_store, fused, "rrf_score")
+        # 밀집 검색에도 나온 청크는 재순위화 조기 종료 판단에 쓰도록 dense_score를 함께 기록합니다.
+        for doc in results:
+            if doc.id in dense_scores:
+                doc.metadata["dense_score"] = dense_scores[doc.id]
+        return results
+
+class DenseRetriever(BaseRetriever):
+    """FAISS 단독 검색 리트리버입니다. 결과 metadata에 'dense_score'를 기록합니다."""
+
+    vector_store: VectorStore
+    k: int = 20
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return dense_search(self.vector_store, query, self.k, route_shards(self.vector_store, query))
+
+def get_base_retriever(
+    db: VectorStore,
+    k: Optional[int] = None,
+    fetch_k: Optional[int] = None,
+    index_dir: Optional[str] = None,
+) -> BaseRetriever:
+    """
+    재순위화 전 단계의 기본 리트리버를 만듭니다.
+    HYBRID_RETRIEVAL이 켜져 있으면 FAISS + BM25 하이브리드(각각 fetch_k개를 RRF로 합쳐 k개), 아니면 FAISS 단독 리트리버입니다.
+    index_dir을 주면 그 아티팩트에 저장된 BM25 인덱스를 씁니다 (load_bm25_index 참고).
+    """
+    k = k or config.RETRIEVAL_K
+    if not config.HYBRID_RETRIEVAL:
+        return DenseRetriever(vector_store=db, k=k)
+    fetch_k = max(fetch_k or config.RETRIEVAL_FETCH_K, k)
+    return HybridRetriever(vector_store=db, bm25_index=load_bm25_index(db, index_dir), k=k, fetch_k=fetch_k)
@@ -0,0 +1,119 @@
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+import heapq
+import re
+import threading
+import numpy as np
+from . import config
+from .article_lookup import SUBORDINATE_SUFFIX, _name_pattern
+from .docstore import fetch_documents
+
+class ShardedDocstore(Docstore):
+    """여러 샤드의 docstore를 하나처럼 조회합니다. 각 ID를 가진 샤드의 docstore에서 읽습니다."""
+
+    def __init__(self, shards: Dict[str, FAISS]):
+        self._shards = shards
+        self._shard_of = {doc_id: key for key, db in shards.items() for doc_id in db.index_to_docstore_id.values()}
+
+    def search(self, search: str) -> Union[str, Document]:
+        key = self._shard_of.get(search)
+        if key is None:
+            return f"ID {search} not found."
+        return self._shards[key].docstore.search(search)
+
+    def mget(self, ids: Sequence[str]) -> List[Optional[Document]]:
+        """여러 ID의 Document를 입력 순서대로 반환합니다. 샤드별로 묶어 한 번씩 조회하며, 없는 ID는 None입니다."""
+        by_shard: Dict[str, List[str]] = {}
+        for doc_id in ids:
+            key = self._shard_of.get(doc_id)
+            if key is not None:
+                by_shard.setdefault(key, []).append(doc_id)
+        found: Dict[str, Document] = {}
+        for key, shard_ids in by_shard.items():
+            for doc_id, doc in zip(shard_ids, fetch_documents(self._shards[key].docstore, shard_ids)):
+                if doc is not None:
+                    found[doc_id] = doc
+        return [found.get(doc_id) for doc_id in ids]
+
+class ShardedVectorStore:
+    """
+    원본 파일(source)별 FAISS 샤드 묶음입니다.
+    - route(): 질문에 법령명이 있으면 해당 법령의 샤드만 고릅니다 ('근로기준법 시행령'처럼 색인되지 않은 하위 법령은 제외).
+    - search(): 고른 샤드(없으면 전체 샤드)를 SHARD_SEARCH_WORKERS개 스레드로 병렬 검색하고 거리순 상위 k개를 합칩니다.
+      FAISS 검색은 GIL을 놓으므로 스레드로 병렬화됩니다. Flat 인덱스이면 단일 인덱스 검색과 결과가 같습니다.
+    docstore / index_to_docstore_id / embeddings는 단일 FAISS 저장소와 같은 방식으로 쓸 수 있습니다.
+    """
+
+    def __init__(self, shards: Dict[str, FAISS], embeddings, laws: Dict[str, str], workers: Optional[int] = None):
+        self.shards = shards
+        self.embeddings = embeddings
+        self.laws = laws
+        self.docstore = ShardedDocstore(shards)
+        self.workers = workers or config.SHARD_SEARCH_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._doc_ids: Dict[str, FrozenSet[str]] = {}
+
+        self._keys_by_law: Dict[str, List[str]] = {}
+        for key in sorted(shards):
+            self._keys_by_law.setdefault(laws.get(key) or key, []).append(key)
+        names = sorted(self._keys_by_law, key=lambda law: len(law.replace(" ", "")), reverse=True)
+        self._law_by_name = {law.replace(" ", ""): law for law in names}
+        self._pattern = re.compile("|".join(f"(?:{_name_pattern(law)})" for law in names)) if names else None
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    @property
+    def ntotal(self) -> int:
+        return sum(db.index.ntotal for db in self.shards.values())
+
+    @property
+    def index_to_docstore_id(self) -> Dict[int, str]:
+        """샤드 순서대로 이어 붙인 (위치 → docstore ID)입니다. 전체 청크를 순회할 때 사용합니다."""
+        doc_ids = (doc_id for key in sorted(self.shards) for doc_id in self.shards[key].index_to_docstore_id.values())
+        return dict(enumerate(doc_ids))
+
+    def route(self, query: str) -> Optional[List[str]]:
+        """질문에 등장한 법령의 샤드 키 목록을 반환합니다. 법령명이 없으면 None(전체 샤드)입니다."""
+        if self._pattern is None:
+            return None
+        keys: List[str] = []
+        for match in self._pattern.finditer(query):
+            law = self._law_by_name[re.sub(r"\s+", "", match.group(0))]
+            if SUBORDINATE_SUFFIX.match(query, match.end()) and not SUBORDINATE_SUFFIX.search(law):
+                continue
+            keys.extend(key for key in self._keys_by_law[law] if key not in keys)
+        return keys or None
+
+    def doc_ids(self, keys: Sequence[str]) -> FrozenSet[str]:
+        """샤드들에 들어 있는 docstore ID 집합입니다 (BM25 검색 결과를 라우팅한 샤드로 제한할 때 사용)."""
+        sets = []
+        for key in keys:
+            if key not in self._doc_ids:
+                self._doc_ids[key] = frozenset(self.shards[key].index_to_docstore_id.values())
+            sets.append(self._doc_ids[key])
+        return frozenset().union(*sets)
+
+    def _search_shard(self, key: str, vector: np.ndarray, k: int) -> List[Tuple[float, str]]:
+        db = self.shards[key]
+        distances, indices = db.index.search(vector, min(k, db.index.ntotal))
+        return [(float(d), db.index_to_docstore_id[int(i)]) for d, i in zip(distances[0], indices[0]) if i != -1]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard-search")
+            return self._executor
+
+    def search(self, vector: np.ndarray, k: int, keys: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """질문 벡터로 샤드들을 검색하여 L2 거리가 가까운 순서로 상위 k개의 (docstore ID, 거리)를 반환합니다."""
+        keys = list(keys) if keys is not None else sorted(self.shards)
+        if len(keys) == 1 or self.workers <= 1:
+            results = [self._search_shard(key, vector, k) for key in keys]
+        else:
+            results = list(self._get_executor().map(lambda key: self._search_shard(key, vector, k), keys))
+        return [(doc_id, distance) for distance, doc_id in heapq.nsmallest(k, (hit for hits in results for hit in hits))]
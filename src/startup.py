@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+import threading
+import time
+from . import config
+
+# 이 모듈은 UI가 먼저 뜰 수 있도록 가벼운 모듈만 import하고,
+# langchain/faiss/torch 등 무거운 모듈은 백그라운드 스레드 안에서 import합니다.
+
+class StartupLoader:
+    """
+    RAG 체인 준비(무거운 모듈 import, 임베딩/재순위화 모델 로드, 인덱스 로드, 체인 구성)를
+    백그라운드 스레드에서 수행합니다. UI는 바로 표시하고, 질문이 들어오면 wait()로 준비를 기다립니다.
+    - 재순위화 모델은 임베딩 모델/인덱스 로드와 병렬로 로드합니다.
+    - 저장된 인덱스가 현재 설정/코퍼스와 일치하면 불러오기만 하고, 아닐 때만 구축(인제스트)합니다.
+    - 단계별 소요 시간은 timings에, 전체 결과는 instrumentation 기록("startup")으로 남습니다.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, budget_seconds: Optional[float] = None):
+        self.index_dir = index_dir or config.INDEX_DIR
+        self.budget_seconds = config.STARTUP_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+        self.timings: List[dict] = []
+        self.index_source: Optional[str] = None
+        self.chain = None
+        self.error: Optional[BaseException] = None
+        self.total_seconds: Optional[float] = None
+        self._started_at: Optional[float] = None
+        self._instrumentation = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._load, name="startup-loader", daemon=True)
+
+    def start(self) -> "StartupLoader":
+        self._started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """로드 시작부터 지금(완료되었으면 완료 시점)까지의 시간(초)"""
+        if self.total_seconds is not None:
+            return self.total_seconds
+        return time.perf_counter() - self._started_at if self._started_at else 0.0
+
+    def wait(self, timeout: Optional[float] = None):
+        """준비가 끝날 때까지 기다려 체인을 반환합니다. 로드 중 예외가 났으면 그 예외를 다시 발생시킵니다."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{timeout}초 안에 모델/인덱스 로드가 끝나지 않았습니다.")
+        if self.error is not None:
+            raise self.error
+        return self.chain
+
+    def _step(self, name: str, fn: Callable[[], Any], **fields) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        with self._lock:
+            self.timings.append({"step": name, "seconds": round(time.perf_counter() - start, 3), **fields})
+        return result
+
+    def _load(self) -> None:
+        try:
+            self.chain = self._build()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.total_seconds = time.perf_counter() - self._started_at
+            try:
+                self._report()
+            finally:
+                # 보고(출력/기록)에 실패해도 wait()가 멈추지 않도록 완료 표시는 항상 합니다.
+                self._done.set()
+
+    def _build(self):
+        def import_modules():
+            from . import chain, instrumentation, llm, reranker, vector_store
+            return chain, instrumentation, llm, reranker, vector_store
+
+        chain, instrumentation, llm, reranker, vector_store = self._step("import", import_modules)
+        self._instrumentation = instrumentation
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup-reranker") as executor:
+            # 재순위화 모델은 인덱스와 무관하므로 임베딩 모델/인덱스 로드와 동시에 불러옵니다.
+            compressor_future = executor.submit(self._step, "reranker_model", reranker.get_reranker)
+            embeddings = self._step("embedding_model", vector_store.get_embedding_model)
+
+            manifest = vector_store.load_manifest(self.index_dir)
+            db = self._step("index", lambda: vector_store.get_or_build_vector_store(embeddings, self.index_dir))
+            # manifest가 그대로면 저장된 인덱스를 불러온 것이고, 바뀌었으면 구축(또는 증분 갱신)한 것입니다.
+            if db is None:
+                self.index_source = "empty"
+            else:
+                self.index_source = "loaded" if manifest == vector_store.load_manifest(self.index_dir) else "built"
+            with self._lock:
+                next(t for t in self.timings if t["step"] == "index")["source"] = self.index_source
+            compressor = compressor_future.result()
+
+        if db is None:
+            return None
+        llm_instance = self._step("llm", llm.get_llm)
+        return self._step(
+            "chain",
+            lambda: chain.build_rag_chain(db, embeddings, llm_instance, compressor, index_dir=self.index_dir),
+        )
+
+    def _report(self) -> None:
+        status = "실패" if self.error else ("예산 초과" if not self.within_budget else "완료")
+        steps = ", ".join(f"{t['step']} {t['seconds']:.2f}s" for t in self.timings)
+        print(f"시작 준비 {status}: 전체 {self.total_seconds:.2f}s / 목표 {self.budget_seconds:.0f}s ({steps})")
+        if self._instrumentation is not None:
+            self._instrumentation.get_recorder().record(
+                "startup", self.total_seconds,
+                index_source=self.index_source,
+                within_budget=self.within_budget,
+                error=repr(self.error) if self.error else None,
+                **{f"{t['step']}_seconds": t["seconds"] for t in self.timings},
+            )
+
+    @property
+    def within_budget(self) -> bool:
+        return self.elapsed <= self.budget_seconds
+
+    def breakdown(self) -> dict:
+        """단계별 소요 시간과 목표 대비 결과를 반환합니다. (재순위화 모델은 다른 단계와 병렬로 로드되므로 단계 합이 전체보다 클 수 있습니다.)"""
+        with self._lock:
+            steps = list(self.timings)
+        return {
+            "ready": self.ready,
+            "total_seconds": round(self.elapsed, 3),
+            "budget_seconds": self.budget_seconds,
+            "within_budget": self.within_budget,
+            "index_source": self.index_source,
+            "steps": steps,
+        }
@@ -0,0 +1,170 @@
+from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import re
+from .docstore import iter_documents
+
+TABLE_INDEX_FILE = "fitness_table.json"
+
+Key = Tuple[str, str, str, str]
+
+def _normalize(text: str) -> str:
+    """공백을 제거하고 소문자로 바꿉니다. 표 셀 값은 파싱 시 공백이 제거되어 있으므로 질문도 맞춰줍니다."""
+    return re.sub(r"\s+", "", text).lower()
+
+def _parse_age_band(band: str) -> Tuple[Optional[int], Optional[int]]:
+    """'25세이하', '26~30세', '55세이상' 같은 나이 구간을 (하한, 상한)으로 변환합니다."""
+    numbers = [int(n) for n in re.findall(r"\d+", band)]
+    if not numbers:
+        return None, None
+    if "이하" in band:
+        return None, numbers[0]
+    if "이상" in band:
+        return numbers[0], None
+    return numbers[0], numbers[-1]
+
+class FitnessTableIndex:
+    """
+    '[별표 31]' 체력검정 기준표 행(complex_table_row)을 (구분, 종목, 등급, 나이) 키로 조회하는 인덱스입니다.
+    질문이 키의 네 요소를 모두 지정하면 벡터 검색·재순위화·LLM을 거치지 않고 바로 답합니다.
+    """
+
+    def __init__(self, rows: Optional[Dict[Key, dict]] = None):
+        self.rows: Dict[Key, dict] = rows or {}
+        self.categories = sorted({key[0] for key in self.rows}, key=len, reverse=True)
+        self.sports = sorted({key[1] for key in self.rows}, key=len, reverse=True)
+        self.grades = sorted({key[2] for key in self.rows}, key=len, reverse=True)
+        self.ages = sorted({key[3] for key in self.rows}, key=len, reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_documents(cls, documents: List[Document]) -> "FitnessTableIndex":
+        """
+        기준표 행으로 인덱스를 만듭니다. 같은 키에 값이 다른 행이 여러 개면 어느 쪽이 맞는지 알 수 없으므로
+        그 키는 인덱스에서 제외합니다 (해당 질문은 RAG 체인이 답합니다).
+        """
+        rows, collisions = {}, set()
+        for doc in documents:
+            meta = doc.metadata
+            if meta.get("type") != "complex_table_row" or "value" not in meta:
+                continue
+            key = (meta["category"], meta["sport"], meta["grade"], meta["age"])
+            if key in rows and rows[key]["value"] != meta["value"]:
+                collisions.add(key)
+                continue
+            rows.setdefault(key, {
+                "value": meta["value"], "source": meta["source"], "page": meta["page"],
+                "text": doc.page_content,
+            })
+        for key in collisions:
+            print(f"경고: 기준표 키 {key}에 값이 다른 행이 있어 직접 조회에서 제외합니다.")
+            del rows[key]
+        return cls(rows)
+
+    # --- 저장/로드 ---
+
+    def save(self, index_dir: str) -> None:
+        records = [dict(zip(("category", "sport", "grade", "age"), key), **row) for key, row in self.rows.items()]
+        with open(os.path.join(index_dir, TABLE_INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "FitnessTableIndex":
+        """저장된 인덱스를 읽습니다. 파일이 없으면 빈 인덱스를 반환합니다."""
+        path = os.path.join(index_dir, TABLE_INDEX_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        rows = {}
+        for record in records:
+            key = (record.pop("category"), record.pop("sport"), record.pop("grade"), record.pop("age"))
+            rows[key] = record
+        return cls(rows)
+
+    # --- 조회 ---
+
+    def _matches(self, candidates: List[str], normalized_query: str) -> List[str]:
+        """
+        질문에 포함된 후보 값을 모두 반환합니다. 긴 후보부터 찾고 찾은 부분은 지우므로,
+        더 긴 후보 안에만 들어 있는 짧은 후보는 따로 세지 않습니다.
+        """
+        found = []
+        for candidate in candidates:
+            normalized = _normalize(candidate)
+            if normalized and normalized in normalized_query:
+                found.append(candidate)
+                normalized_query = normalized_query.replace(normalized, "\0")
+        return found
+
+    def _find(self, candidates: List[str], normalized_query: str) -> Optional[str]:
+        """질문에 포함된 후보 값이 정확히 하나면 그 값을, 없거나 여러 개(예: '남군과 여군')면 None을 반환합니다."""
+        found = self._matches(candidates, normalized_query)
+        return found[0] if len(found) == 1 else None
+
+    def _band_of(self, years: int) -> Optional[str]:
+        for band in self.ages:
+            low, high = _parse_age_band(band)
+            if (low is not None or high is not None) and (low is None or low <= years) and (high is None or years <= high):
+                return band
+        return None
+
+    def _find_age(self, normalized_query: str) -> Optional[str]:
+        """
+        질문의 나이 구간 표기 또는 'N세/N살'을 기준표의 나이 구간으로 매핑합니다.
+        서로 다른 구간이 둘 이상 언급되면 None을 반환합니다.
+        """
+        found = self._matches(self.ages, normalized_query)
+        if found:
+            return found[0] if len(found) == 1 else None
+        bands = {self._band_of(int(years)) for years in re.findall(r"(\d{2})(?:세|살)", normalized_query)}
+        return bands.pop() if len(bands) == 1 else None
+
+    def match_key(self, query: str) -> Optional[Key]:
+        """
+        질문이 (구분, 종목, 등급, 나이)를 각각 하나씩 지정하면 해당 키를, 아니면 None을 반환합니다.
+        한 요소에 값이 여러 개 언급된 비교 질문은 LLM을 거치지 않는 직접 답변이 한 행만 보여주게 되므로 RAG 체인에 맡깁니다.
+        """
+        if not self.rows:
+            return None
+        normalized = _normalize(query)
+        key = (
+            self._find(self.categories, normalized),
+            self._find(self.sports, normalized),
+            self._find(self.grades, normalized),
+            self._find_age(normalized),
+        )
+        if None in key or key not in self.rows:
+            return None
+        return key
+
+    def lookup(self, query: str) -> Optional[dict]:
+        """
+        질문이 키를 완전히 지정하면 RAG 체인과 같은 형식({'question', 'context', 'answer'})의 결과를,
+        아니면 None을 반환합니다.
+        """
+        key = self.match_key(query)
+        if key is None:
+            return None
+        category, sport, grade, age = key
+        row = self.rows[key]
+        answer = (
+            f"'{row['source']}' 문서의 체력검정 기준표에 따르면, {category} {sport} {grade} "
+            f"({age}) 기준은 '{row['value']}'입니다.\n\n"
+            f"- 인용: {row['source']} (p.{row['page']})"
+        )
+        context = [Document(
+            page_content=row["text"],
+            metadata={"source": row["source"], "page": row["page"], "type": "complex_table_row", "category": category},
+        )]
+        return {"question": query, "context": context, "answer": answer}
+
+def build_table_index(db: FAISS) -> FitnessTableIndex:
+    """FAISS docstore에 저장된 체력검정 기준표 행으로 조회 인덱스를 만듭니다."""
+    return FitnessTableIndex.from_documents(
+        [doc for _, doc in iter_documents(db)]
+    )
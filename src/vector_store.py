@@ -1,21 +1,557 @@
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from typing import List
-from . import config
+from langchain.docstore.document import Document
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+from itertools import islice
+import json
+import math
+import os
+import shutil
+import time
+import uuid
+import faiss
+import hashlib
+import numpy as np
+from . import config, article_lookup, bm25, data_loader, instrumentation, retrieval, table_lookup
+from .docstore import DOCSTORE_FILE, SQLiteDocstore, save_sqlite_docstore
+from .embedding_cache import CachedEmbeddings, QueryCacheEmbeddings
+from .shards import ShardedVectorStore
+
+# 인덱스 아티팩트 형식 버전 (저장 구조가 바뀌면 올려서 기존 아티팩트를 무효화합니다)
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+# DOCSTORE="sqlite"일 때 FAISS 인덱스와 (벡터 위치 → docstore ID) 목록 파일
+FAISS_INDEX_FILE = "index.faiss"
+DOCSTORE_IDS_FILE = "docstore_ids.json"
+# 증분 갱신 중 삭제/추가를 반영할 SQLite docstore 사본 (인덱스 디렉토리 옆, index_dir + 접미사)
+REFRESH_DOCSTORE_SUFFIX = ".refresh.sqlite"
+# INDEX_SHARDING="source"일 때 파일별 샤드(FAISS 인덱스 + docstore)를 두는 하위 디렉토리
+SHARDS_DIR = "shards"
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+SHARDING_MODES = ("source", "none")
 
 def get_embedding_model():
-    """임베딩 모델을 로드합니다."""
-    return HuggingFaceEmbeddings(
+    """
+    임베딩 모델을 로드합니다.
+    - EMBED_CACHE가 켜져 있으면 문서 임베딩을 디스크에 캐시하는 CachedEmbeddings로 감쌉니다.
+    - 질문 임베딩은 QUERY_ENCODER_BACKEND("torch" 또는 "onnx") 모델로 인코딩하고,
+      QueryCacheEmbeddings의 LRU 캐시(QUERY_CACHE_SIZE)를 거칩니다.
+    """
+    base_embeddings = HuggingFaceEmbeddings(
         model_name=config.EMBED_MODEL,
         model_kwargs={'device': 'cpu'},
         encode_kwargs={'normalize_embeddings': True}
     )
+    document_embeddings = base_embeddings
+    if config.EMBED_CACHE:
+        document_embeddings = CachedEmbeddings(base_embeddings, config.EMBED_MODEL)
+
+    query_embeddings = base_embeddings
+    if config.QUERY_ENCODER_BACKEND == "onnx":
+        from .onnx_backend import OnnxSentenceEmbeddings
+        query_embeddings = OnnxSentenceEmbeddings(config.EMBED_MODEL, quantize=config.QUERY_ENCODER_ONNX_QUANTIZE)
+    elif config.QUERY_ENCODER_BACKEND != "torch":
+        raise ValueError(f"지원하지 않는 QUERY_ENCODER_BACKEND입니다: {config.QUERY_ENCODER_BACKEND} (지원: torch, onnx)")
+    return QueryCacheEmbeddings(document_embeddings, query_embeddings)
+
+def index_build_params(index_type: Optional[str] = None) -> dict:
+    """
+    인덱스 구조를 결정하는 (구축 시점) 파라미터를 반환합니다. manifest에 기록되어,
+    값이 바뀌면 인덱스를 재구축합니다. nprobe/efSearch 같은 검색 파라미터는 포함하지 않습니다.
+    """
+    index_type = index_type or config.INDEX_TYPE
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 INDEX_TYPE입니다: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+    params = {"type": index_type}
+    if index_type == "hnsw":
+        params.update(m=config.HNSW_M, ef_construction=config.HNSW_EF_CONSTRUCTION)
+    elif index_type.startswith("ivf"):
+        params.update(nlist=config.IVF_NLIST)
+        if index_type == "ivf_pq":
+            params.update(pq_m=config.PQ_M, pq_nbits=config.PQ_NBITS)
+    return params
+
+def create_faiss_index(dim: int, index_type: Optional[str] = None, num_vectors: Optional[int] = None, **overrides) -> faiss.Index:
+    """
+    설정에 따라 FAISS 인덱스를 만듭니다 (Flat, HNSW, IVF-Flat, IVF-PQ).
+    num_vectors(학습 벡터 수)를 주면 IVF 클러스터 수와 PQ 비트 수를 학습 가능한 범위로 줄입니다.
+    overrides로 index_build_params의 값을 덮어쓸 수 있습니다 (튜닝용).
+    """
+    params = dict(index_build_params(index_type), **overrides)
+    index_type = params["type"]
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"], faiss.METRIC_L2)
+        index.hnsw.efConstruction = params["ef_construction"]
+        return index
+
+    nlist = params["nlist"]
+    if num_vectors is not None:
+        nlist = max(1, min(nlist, int(4 * math.sqrt(num_vectors)), num_vectors))
+    if index_type == "ivf_flat":
+        return faiss.index_factory(dim, f"IVF{nlist},Flat", faiss.METRIC_L2)
+
+    nbits = params["pq_nbits"]
+    if num_vectors is not None:
+        nbits = max(1, min(nbits, int(math.log2(num_vectors))))
+    return faiss.index_factory(dim, f"IVF{nlist},PQ{params['pq_m']}x{nbits}", faiss.METRIC_L2)
+
+def apply_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """IVF 인덱스의 nprobe, HNSW 인덱스의 efSearch 검색 파라미터를 설정합니다."""
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search or config.HNSW_EF_SEARCH
+        return
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return
+    ivf.nprobe = nprobe or config.IVF_NPROBE
+
+def build_manifest(corpus_fingerprint: str, files: Optional[Dict[str, dict]] = None) -> dict:
+    """
+    현재 설정(임베딩 모델, 청킹 파라미터, 조문 단위 분할 여부, 샤딩 방식)과 코퍼스 지문으로 인덱스 manifest를 만듭니다.
+    files에는 파일별 {"hash": 내용 해시, "ids": 벡터 ID 목록}을 기록합니다
+    (INDEX_SHARDING="source"이면 {"hash", "shard": 샤드 디렉토리, "law": 법령명, "vectors": 벡터 수}).
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "embed_model": config.EMBED_MODEL,
+        "chunk_size": config.CHUNK_SIZE,
+        "overlap": config.OVERLAP,
+        "article_split": config.ARTICLE_SPLIT,
+        "docstore": config.DOCSTORE,
+        "sharding": config.INDEX_SHARDING,
+        "parser_version": data_loader.PARSER_VERSION,
+        "bm25_version": bm25.BM25_VERSION,
+        "corpus_fingerprint": corpus_fingerprint,
+        "index": index_build_params(),
+    }
+    if files is not None:
+        manifest["files"] = files
+    return manifest
+
+def manifest_matches(manifest: Optional[dict], expected: dict, keys: Optional[List[str]] = None) -> bool:
+    """
+    저장된 manifest가 기대하는 manifest와 일치하는지 확인합니다.
+    keys를 지정하면 해당 항목만 비교합니다 (기본값: 파일 목록을 제외한 모든 항목).
+    """
+    if not manifest:
+        return False
+    if keys is None:
+        keys = [key for key in expected if key != "files"]
+    return all(manifest.get(key) == expected.get(key) for key in keys)
+
+def load_manifest(index_dir: str = config.INDEX_DIR) -> Optional[dict]:
+    """인덱스 디렉토리의 manifest를 읽습니다. 없거나 손상된 경우 None을 반환합니다."""
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_faiss_files(db: FAISS, directory: str) -> None:
+    """
+    FAISS 인덱스와 docstore를 새 디렉토리에 저장합니다.
+    - DOCSTORE="sqlite": FAISS 인덱스, (벡터 위치 → docstore ID) 목록, SQLite docstore 파일
+    - DOCSTORE="memory": LangChain save_local (index.faiss + pickle)
+    """
+    if config.DOCSTORE == "sqlite":
+        os.makedirs(directory)
+        faiss.write_index(db.index, os.path.join(directory, FAISS_INDEX_FILE))
+        with open(os.path.join(directory, DOCSTORE_IDS_FILE), "w", encoding="utf-8") as f:
+            json.dump([db.index_to_docstore_id[i] for i in range(len(db.index_to_docstore_id))], f)
+        save_sqlite_docstore(db, os.path.join(directory, DOCSTORE_FILE))
+    else:
+        db.save_local(directory)
+
+def load_faiss_files(embeddings, directory: str) -> FAISS:
+    """
+    save_faiss_files로 저장한 FAISS 인덱스와 docstore를 불러오고 검색 파라미터를 적용합니다.
+    - DOCSTORE="sqlite": 청크는 SQLite 파일에 둔 채 검색된 청크만 읽습니다.
+    - DOCSTORE="memory": docstore가 pickle로 저장되므로, 이 프로젝트가 직접 만든 아티팩트만 불러와야 합니다.
+    """
+    if config.DOCSTORE == "sqlite":
+        with open(os.path.join(directory, DOCSTORE_IDS_FILE), encoding="utf-8") as f:
+            doc_ids = json.load(f)
+        db = FAISS(
+            embedding_function=embeddings,
+            index=faiss.read_index(os.path.join(directory, FAISS_INDEX_FILE)),
+            docstore=SQLiteDocstore(os.path.join(directory, DOCSTORE_FILE)),
+            index_to_docstore_id=dict(enumerate(doc_ids)),
+        )
+    else:
+        db = FAISS.load_local(directory, embeddings, allow_dangerous_deserialization=True)
+    apply_search_params(db.index)
+    return db
+
+def save_vector_store(db: FAISS, manifest: dict, index_dir: str = config.INDEX_DIR) -> None:
+    """
+    FAISS 인덱스와 docstore, BM25 인덱스, 체력검정 기준표/조문 조회 인덱스, manifest를 아티팩트 디렉토리로 저장합니다.
+    임시 디렉토리에 먼저 기록한 뒤 교체하므로, 저장 도중 중단되어도 기존 아티팩트가 깨지지 않습니다.
+    """
+    tmp_dir = index_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_faiss_files(db, tmp_dir)
+    retrieval.build_bm25_index(db).save(tmp_dir)
+    table_lookup.build_table_index(db).save(tmp_dir)
+    article_lookup.build_article_index(db).save(tmp_dir)
+
+    manifest = dict(manifest, created_at=datetime.now().isoformat(timespec="seconds"))
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # 이전 아티팩트의 SQLite 파일을 열고 있으면 닫은 뒤 교체합니다 (열린 파일은 Windows에서 지울 수 없음).
+    if isinstance(db.docstore, SQLiteDocstore):
+        db.docstore.close()
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+
+    # 방금 저장한 SQLite 파일을 docstore로 사용하여, 구축 중 메모리에 모았던 청크 본문을 내려놓습니다.
+    if config.DOCSTORE == "sqlite":
+        db.docstore = SQLiteDocstore(os.path.join(index_dir, DOCSTORE_FILE))
+
+def load_vector_store(embeddings, index_dir: str = config.INDEX_DIR) -> FAISS:
+    """저장된 (단일) FAISS 인덱스와 docstore를 불러옵니다."""
+    return load_faiss_files(embeddings, index_dir)
+
+def build_vector_store_from_embeddings(
+    documents: List[Document],
+    ids: List[str],
+    vectors: np.ndarray,
+    embeddings,
+    index_type: Optional[str] = None,
+) -> FAISS:
+    """
+    이미 계산한 청크 임베딩으로 FAISS 저장소(InMemoryDocstore)를 만듭니다.
+    같은 청크로 인덱스 종류만 바꿔 비교할 때(sweep.py) 다시 임베딩하지 않도록 사용합니다.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    index = create_faiss_index(vectors.shape[1], index_type, num_vectors=len(vectors))
+    if not index.is_trained:
+        index.train(vectors)
+    apply_search_params(index)
+    db = FAISS(embedding_function=embeddings, index=index, docstore=InMemoryDocstore(), index_to_docstore_id={})
+    db.add_embeddings(
+        list(zip((doc.page_content for doc in documents), vectors.tolist())),
+        metadatas=[doc.metadata for doc in documents],
+        ids=ids,
+    )
+    return db
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """iterable을 size개씩 묶어 리스트로 생성합니다."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
-def build_vector_store(documents: List[dict], embeddings) -> FAISS:
+def _train_index(db: FAISS, vectors: np.ndarray) -> None:
     """
-    문서 청크로부터 FAISS 벡터 저장소를 구축합니다.
+    학습이 필요한 인덱스(IVF 계열)를 주어진 벡터로 학습합니다.
+    벡터 수가 설정된 클러스터 수에 비해 적으면 학습 가능한 크기로 인덱스를 다시 만듭니다.
     """
+    db.index = create_faiss_index(vectors.shape[1], num_vectors=len(vectors))
+    db.index.train(vectors)
+    apply_search_params(db.index)
+
+def add_documents_streaming(
+    db: Optional[FAISS],
+    chunks: Iterable[Tuple[str, Document]],
+    embeddings,
+    batch_size: Optional[int] = None,
+    stages: Optional[instrumentation.StageTotals] = None,
+) -> Optional[FAISS]:
+    """
+    (벡터 ID, 청크) 스트림을 batch_size개씩 임베딩하여 인덱스에 추가합니다.
+    db가 None이면 INDEX_TYPE에 맞는 새 인덱스를 만듭니다. 진행 상황과 처리량(chunks/sec)을 출력하며,
+    중간 결과를 모두 모아두지 않으므로 최대 메모리는 배치 크기에 비례합니다.
+    단, 학습이 필요한 IVF 계열 인덱스는 처음 IVF_TRAIN_SIZE개 벡터를 모아 학습한 뒤 추가합니다.
+    stages를 주면 임베딩(embed)과 인덱스 추가/학습(build)에 걸린 시간을 누적합니다.
+    """
+    batch_size = batch_size or config.EMBED_BATCH_SIZE
+    stages = stages or instrumentation.StageTotals()
+    pending = []
+    total = 0
+    start_time = time.perf_counter()
+
+    def flush_pending():
+        vectors = np.array([v for _, _, _, vs in pending for v in vs], dtype=np.float32)
+        with stages.timed("build", len(vectors)):
+            _train_index(db, vectors)
+            for ids, texts, metadatas, vs in pending:
+                db.add_embeddings(list(zip(texts, vs)), metadatas=metadatas, ids=ids)
+        pending.clear()
+
+    for batch in batched(chunks, batch_size):
+        ids = [vector_id for vector_id, _ in batch]
+        texts = [doc.page_content for _, doc in batch]
+        metadatas = [doc.metadata for _, doc in batch]
+        with stages.timed("embed", len(texts)):
+            vectors = embeddings.embed_documents(texts)
+        if db is None:
+            db = FAISS(
+                embedding_function=embeddings,
+                index=create_faiss_index(len(vectors[0])),
+                docstore=InMemoryDocstore(),
+                index_to_docstore_id={},
+            )
+            apply_search_params(db.index)
+
+        if db.index.is_trained:
+            with stages.timed("build", len(texts)):
+                db.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+        else:
+            pending.append((ids, texts, metadatas, vectors))
+            if sum(len(p[0]) for p in pending) >= config.IVF_TRAIN_SIZE:
+                flush_pending()
+
+        total += len(batch)
+        elapsed = time.perf_counter() - start_time
+        print(f"임베딩 진행: {total}개 청크 ({total / elapsed:.1f} chunks/sec)")
+
+    if pending:
+        flush_pending()
+    document_embeddings = embeddings.embeddings if isinstance(embeddings, QueryCacheEmbeddings) else embeddings
+    if isinstance(document_embeddings, CachedEmbeddings):
+        print(f"임베딩 캐시: {document_embeddings.stats()}")
+    return db
+
+def _iter_file_chunks(
+    rel_paths: List[str],
+    file_ids: Dict[str, List[str]],
+    stages: Optional[instrumentation.StageTotals] = None,
+) -> Iterator[Tuple[str, Document]]:
+    """
+    지정된 파일들을 순서대로 로드/분할하며 (새 벡터 ID, 청크)를 생성합니다.
+    각 파일에 부여한 ID 목록은 file_ids에 기록하고, stages를 주면 로드(load)/분할(split) 시간을 누적합니다.
+    """
+    stages = stages or instrumentation.StageTotals()
+    paths = [os.path.join(config.DATA_DIR, rel_path) for rel_path in rel_paths]
+    for path, documents in stages.iterate("load", data_loader.iter_file_documents(paths)):
+        rel_path = data_loader.relative_source_path(path)
+        file_ids[rel_path] = []
+        for chunk in stages.iterate("split", data_loader.iter_split_documents(documents)):
+            vector_id = str(uuid.uuid4())
+            file_ids[rel_path].append(vector_id)
+            yield vector_id, chunk
+
+def use_working_docstore(db: FAISS, path: str) -> None:
+    """
+    SQLite docstore를 path에 복사한 사본으로 바꿉니다. 증분 갱신의 삭제/추가는 사본에만 반영되므로,
+    save_vector_store가 새 아티팩트로 교체하기 전까지 저장된 인덱스 디렉토리는 바뀌지 않습니다.
+    """
+    if not isinstance(db.docstore, SQLiteDocstore):
+        return
+    if os.path.exists(path):
+        os.remove(path)
+    db.docstore.backup(path)
+    db.docstore.close()
+    db.docstore = SQLiteDocstore(path)
+
+def refresh_vector_store(
+    db: FAISS,
+    embeddings,
+    files: Dict[str, dict],
+    file_hashes: Dict[str, str],
+    stages: Optional[instrumentation.StageTotals] = None,
+) -> Dict[str, dict]:
+    """
+    manifest의 파일 목록(files)과 현재 파일 해시를 비교하여 인덱스를 증분 갱신합니다.
+    - 삭제/수정된 파일의 벡터를 제거하고
+    - 추가/수정된 파일만 다시 파싱/임베딩하여 추가합니다.
+    갱신된 파일 목록을 반환합니다. db는 메모리에서 수정되므로, SQLite docstore는 먼저
+    use_working_docstore로 사본으로 바꾼 뒤 호출해야 저장된 아티팩트가 교체 전에 바뀌지 않습니다.
+    """
+    added = [p for p in file_hashes if p not in files]
+    modified = [p for p in file_hashes if p in files and files[p]["hash"] != file_hashes[p]]
+    deleted = [p for p in files if p not in file_hashes]
+    print(f"증분 인덱싱: 추가 {len(added)}, 수정 {len(modified)}, 삭제 {len(deleted)}")
+
+    stale_ids = [vector_id for p in modified + deleted for vector_id in files[p]["ids"]]
+    if stale_ids:
+        if isinstance(db.index, faiss.IndexHNSW):
+            raise ValueError("HNSW 인덱스는 벡터 삭제를 지원하지 않아 증분 갱신할 수 없습니다.")
+        db.delete(stale_ids)
+
+    file_ids = {}
+    add_documents_streaming(db, _iter_file_chunks(sorted(added + modified), file_ids, stages), embeddings, stages=stages)
+
+    refreshed = {p: info for p, info in files.items() if p in file_hashes}
+    for rel_path, vector_ids in file_ids.items():
+        refreshed[rel_path] = {"hash": file_hashes[rel_path], "ids": vector_ids}
+    return refreshed
+
+def vector_count(db) -> int:
+    """단일 FAISS 저장소 또는 샤드 묶음에 들어 있는 벡터 수"""
+    return db.ntotal if isinstance(db, ShardedVectorStore) else db.index.ntotal
+
+def get_or_build_vector_store(embeddings, index_dir: str = config.INDEX_DIR) -> Optional[FAISS]:
+    """
+    INDEX_SHARDING="source"이면 원본 파일별 샤드 묶음(get_or_build_sharded_store)을 반환합니다.
+
+    단일 인덱스("none")는 manifest가 현재 설정 및 코퍼스와 일치하면 저장된 인덱스를 불러오고,
+    설정은 같고 코퍼스만 바뀐 경우 변경된 파일만 증분 갱신합니다.
+    그 외에는 문서를 로드/분할/임베딩하여 새로 구축한 뒤 저장합니다.
+    로드할 문서가 없으면 None을 반환합니다.
+    단계별(load_index / load, split, embed, build, save) 소요 시간은 instrumentation 기록으로 남깁니다.
+    """
+    if config.INDEX_SHARDING not in SHARDING_MODES:
+        raise ValueError(f"지원하지 않는 INDEX_SHARDING입니다: {config.INDEX_SHARDING} (지원: {', '.join(SHARDING_MODES)})")
+    if config.INDEX_SHARDING == "source":
+        return get_or_build_sharded_store(embeddings, index_dir)
+
+    file_hashes = data_loader.compute_file_hashes()
+    expected = build_manifest(data_loader.compute_corpus_fingerprint(file_hashes))
+    manifest = load_manifest(index_dir)
+    settings_keys = [key for key in expected if key != "corpus_fingerprint"]
+
+    if manifest_matches(manifest, expected, settings_keys):
+        try:
+            print(f"저장된 인덱스 로드: {index_dir}")
+            with instrumentation.timed_stage("load_index") as stage:
+                db = load_vector_store(embeddings, index_dir)
+                stage["count"] = db.index.ntotal
+        except Exception as e:
+            print(f"저장된 인덱스 로드 실패, 재구축합니다: {e}")
+            db = None
+
+        if db is not None and manifest_matches(manifest, expected):
+            return db
+        if db is not None and "files" in manifest and file_hashes:
+            stages = instrumentation.StageTotals()
+            working_docstore = index_dir + REFRESH_DOCSTORE_SUFFIX
+            use_working_docstore(db, working_docstore)
+            try:
+                files = refresh_vector_store(db, embeddings, manifest["files"], file_hashes, stages)
+            except ValueError as e:
+                print(f"{e} 전체 재구축합니다.")
+                if isinstance(db.docstore, SQLiteDocstore):
+                    db.docstore.close()
+            else:
+                with stages.timed("save", db.index.ntotal):
+                    save_vector_store(db, dict(expected, files=files), index_dir)
+                stages.emit(build="incremental")
+                return db
+            finally:
+                if os.path.exists(working_docstore):
+                    os.remove(working_docstore)
+
+    file_ids = {}
+    stages = instrumentation.StageTotals()
     print("빌드 시작")
-    vector_store = FAISS.from_documents(documents, embeddings)
+    db = add_documents_streaming(None, _iter_file_chunks(sorted(file_hashes), file_ids, stages), embeddings, stages=stages)
+    if db is None:
+        return None
     print("빌드 완료")
-    return vector_store
\ No newline at end of file
+    files = {p: {"hash": file_hashes[p], "ids": file_ids[p]} for p in file_ids}
+    with stages.timed("save", db.index.ntotal):
+        save_vector_store(db, dict(expected, files=files), index_dir)
+    stages.emit(build="full")
+    return db
+
+def _shard_name(rel_path: str, file_hash: str) -> str:
+    """파일 경로와 내용 해시로 정한 샤드 디렉토리 이름 (내용이 바뀌면 새 디렉토리에 구축하므로 샤드는 변경되지 않습니다)"""
+    return hashlib.sha256(f"{rel_path}\0{file_hash}".encode("utf-8")).hexdigest()[:16]
+
+def _save_shard(db: FAISS, shard_dir: str) -> None:
+    """샤드를 임시 디렉토리에 저장한 뒤 교체하고, SQLite docstore이면 저장한 파일을 docstore로 사용합니다."""
+    tmp_dir = shard_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_faiss_files(db, tmp_dir)
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    os.replace(tmp_dir, shard_dir)
+    if config.DOCSTORE == "sqlite":
+        db.docstore = SQLiteDocstore(os.path.join(shard_dir, DOCSTORE_FILE))
+
+def _remove_unused_artifacts(index_dir: str, shard_names: Iterable[str]) -> None:
+    """manifest가 가리키지 않는 샤드 디렉토리와 단일 인덱스(INDEX_SHARDING="none") 시절의 파일을 지웁니다."""
+    shards_dir = os.path.join(index_dir, SHARDS_DIR)
+    keep = set(shard_names)
+    for name in os.listdir(shards_dir) if os.path.isdir(shards_dir) else []:
+        if name not in keep:
+            shutil.rmtree(os.path.join(shards_dir, name), ignore_errors=True)
+    for name in (FAISS_INDEX_FILE, DOCSTORE_IDS_FILE, DOCSTORE_FILE, "index.pkl"):
+        path = os.path.join(index_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+def get_or_build_sharded_store(embeddings, index_dir: str = config.INDEX_DIR) -> Optional[ShardedVectorStore]:
+    """
+    원본 파일(source)마다 별도의 FAISS 인덱스와 docstore(샤드)를 index_dir/shards 아래에 두고 묶어서 반환합니다.
+    - 설정이 manifest와 같으면 내용 해시가 같은 파일의 샤드는 불러오기만 하고, 추가/수정된 파일의 샤드만 구축합니다.
+      샤드마다 따로 구축하므로 HNSW 인덱스도 벡터 삭제 없이 증분 갱신됩니다.
+    - 전체 샤드의 BM25 인덱스, 조문/기준표 조회 인덱스와 manifest는 index_dir에 두며, 코퍼스가 바뀐 경우에만 다시 씁니다.
+    로드할 문서가 없으면 None을 반환합니다. 단계별 소요 시간은 instrumentation 기록으로 남깁니다.
+    """
+    file_hashes = data_loader.compute_file_hashes()
+    expected = build_manifest(data_loader.compute_corpus_fingerprint(file_hashes))
+    manifest = load_manifest(index_dir)
+    settings_keys = [key for key in expected if key != "corpus_fingerprint"]
+    files = manifest.get("files", {}) if manifest_matches(manifest, expected, settings_keys) else {}
+    shards_dir = os.path.join(index_dir, SHARDS_DIR)
+
+    shards: Dict[str, FAISS] = {}
+    laws: Dict[str, str] = {}
+    refreshed: Dict[str, dict] = {}
+    reusable = [p for p in sorted(file_hashes) if p in files and files[p]["hash"] == file_hashes[p]]
+    if reusable:
+        print(f"저장된 인덱스 로드: {index_dir} (샤드 {sum(files[p]['shard'] is not None for p in reusable)}개)")
+        with instrumentation.timed_stage("load_index") as stage:
+            for rel_path in reusable:
+                info = files[rel_path]
+                if info["shard"] is not None:
+                    try:
+                        shards[rel_path] = load_faiss_files(embeddings, os.path.join(shards_dir, info["shard"]))
+                    except Exception as e:
+                        print(f"샤드 로드 실패, 재구축합니다: {rel_path} ({e})")
+                        continue
+                    laws[rel_path] = info["law"]
+                refreshed[rel_path] = info
+            stage["count"] = sum(db.index.ntotal for db in shards.values())
+
+    pending = [p for p in sorted(file_hashes) if p not in refreshed]
+    if not pending and set(files) == set(refreshed) and manifest_matches(manifest, expected):
+        return ShardedVectorStore(shards, embeddings, laws) if shards else None
+
+    deleted = [p for p in files if p not in file_hashes]
+    build = "incremental" if refreshed else "full"
+    print(f"샤드 구축: 재사용 {len(refreshed)}, 구축 {len(pending)}, 삭제 {len(deleted)}")
+    stages = instrumentation.StageTotals()
+    for rel_path in pending:
+        file_ids: Dict[str, List[str]] = {}
+        db = add_documents_streaming(None, _iter_file_chunks([rel_path], file_ids, stages), embeddings, stages=stages)
+        if db is None:
+            refreshed[rel_path] = {"hash": file_hashes[rel_path], "shard": None, "law": None, "vectors": 0}
+            continue
+        shard = _shard_name(rel_path, file_hashes[rel_path])
+        with stages.timed("save", db.index.ntotal):
+            _save_shard(db, os.path.join(shards_dir, shard))
+        shards[rel_path] = db
+        laws[rel_path] = data_loader.law_name_from_source(rel_path)
+        refreshed[rel_path] = {
+            "hash": file_hashes[rel_path], "shard": shard, "law": laws[rel_path], "vectors": db.index.ntotal,
+        }
+
+    store = ShardedVectorStore(shards, embeddings, laws) if shards else None
+    with stages.timed("save", store.ntotal if store else 0):
+        os.makedirs(index_dir, exist_ok=True)
+        (retrieval.build_bm25_index(store) if store else bm25.BM25Index()).save(index_dir)
+        table_index = table_lookup.build_table_index(store) if store else table_lookup.FitnessTableIndex()
+        article_index = article_lookup.build_article_index(store) if store else article_lookup.ArticleIndex()
+        table_index.save(index_dir)
+        article_index.save(index_dir)
+        # manifest를 마지막에 교체하므로, 중단되더라도 manifest가 가리키는 샤드는 항상 온전합니다.
+        tmp_path = os.path.join(index_dir, MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                dict(expected, files=refreshed, created_at=datetime.now().isoformat(timespec="seconds")),
+                f, ensure_ascii=False, indent=2,
+            )
+        os.replace(tmp_path, os.path.join(index_dir, MANIFEST_FILE))
+        _remove_unused_artifacts(index_dir, (info["shard"] for info in refreshed.values() if info["shard"]))
+    stages.emit(build=build)
+    return store
@@ -0,0 +1,306 @@
+import argparse
+import itertools
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from src import config, data_loader, instrumentation
+from src.article_lookup import ArticleIndex, Key
+
+RAGAS_METRICS = ("faithfulness", "answer_relevancy", "context_precision", "context_recall")
+
+def parse_list(value: str, cast=str) -> list:
+    """'800,500' 같은 쉼표 구분 값을 목록으로 변환합니다."""
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+def load_ground_truth(dataset_path: str, laws: Set[str]) -> Tuple[List[str], List[List[Key]]]:
+    """평가 데이터셋의 질문과, ground_truth가 인용한 (법령명, 조 번호) 목록을 반환합니다 (예: '근로기준법 제60조')."""
+    df = pd.read_csv(dataset_path)
+    references = ArticleIndex(laws=laws)
+    return df["question"].tolist(), [references.references(str(text)) for text in df["ground_truth"]]
+
+def chunk_articles(doc) -> Set[Key]:
+    """
+    청크가 담고 있는 (법령명, 조 번호) 집합입니다.
+    조문 단위 청크는 metadata(law, article)를, 그 외 청크는 원본 파일명의 법령명과 청크 안의 조문 제목 줄(제N조)을 사용합니다.
+    (글자 수 기준 청크가 조문 중간에서 시작하면 제목 줄이 없어 해당 조문으로 보지 않습니다.)
+    """
+    meta = doc.metadata
+    if meta.get("supplement"):
+        return set()
+    if "law" in meta and "article" in meta:
+        return {(meta["law"], meta["article"])}
+    law = data_loader.law_name_from_source(meta.get("source", ""))
+    articles = set()
+    for line in doc.page_content.splitlines():
+        match = data_loader.ARTICLE_PATTERN.match(line)
+        if match:
+            articles.add((law, match.group(1) + (f"의{match.group(2)}" if match.group(2) else "")))
+    return articles
+
+def first_relevant_rank(docs, references: List[Key]) -> Optional[int]:
+    """인용된 조문을 담은 첫 청크의 순위(1부터)입니다. 없으면 None입니다."""
+    wanted = set(references)
+    for rank, doc in enumerate(docs, start=1):
+        if chunk_articles(doc) & wanted:
+            return rank
+    return None
+
+def retrieval_metrics(ranks: List[Optional[int]], prefix: str) -> Dict[str, float]:
+    """질문별 첫 정답 순위로 hit@k(정답 조문이 결과에 있는 질문 비율)와 MRR을 계산합니다."""
+    if not ranks:
+        return {f"{prefix}_hit": None, f"{prefix}_mrr": None}
+    return {
+        f"{prefix}_hit": round(sum(rank is not None for rank in ranks) / len(ranks), 4),
+        f"{prefix}_mrr": round(sum(1.0 / rank for rank in ranks if rank is not None) / len(ranks), 4),
+    }
+
+class ChunkingCache:
+    """
+    청킹 설정(CHUNK_SIZE, OVERLAP, ARTICLE_SPLIT)별 (청크, ID, 임베딩, BM25 인덱스)를 한 번만 만들어 재사용합니다.
+    문서는 처음 한 번만 로드하며(PDF는 PARSE_CACHE로 실행 간에도 재사용), 같은 청크 텍스트의 임베딩은
+    EMBED_CACHE 디스크 캐시로 청킹 설정 간에도 재사용됩니다. 인덱스 종류/k/top_n만 다른 격자점은 임베딩을 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, documents, embeddings):
+        self.documents = documents
+        self.embeddings = embeddings
+        self._entries: Dict[tuple, dict] = {}
+
+    def get(self, chunking: tuple) -> dict:
+        if chunking not in self._entries:
+            from src import vector_store
+            from src.bm25 import BM25Index
+
+            apply_chunking(chunking)
+            stages = instrumentation.StageTotals()
+            with stages.timed("split"):
+                chunks = data_loader.split_documents(self.documents)
+            ids = [str(uuid.uuid4()) for _ in chunks]
+            vectors = []
+            with stages.timed("embed", len(chunks)):
+                for batch in vector_store.batched([doc.page_content for doc in chunks], config.EMBED_BATCH_SIZE):
+                    vectors.extend(self.embeddings.embed_documents(batch))
+            bm25_index = BM25Index.from_texts(zip(ids, (doc.page_content for doc in chunks)))
+            print(f"청킹 {chunking}: 청크 {len(chunks)}개 "
+                  + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in stages.seconds.items()))
+            self._entries[chunking] = {
+                "chunks": chunks, "ids": ids, "vectors": np.array(vectors, dtype=np.float32), "bm25": bm25_index,
+                "split_seconds": stages.seconds.get("split", 0.0), "embed_seconds": stages.seconds.get("embed", 0.0),
+            }
+        return self._entries[chunking]
+
+def apply_chunking(chunking: tuple) -> None:
+    config.CHUNK_SIZE, config.OVERLAP, config.ARTICLE_SPLIT = chunking
+
+def build_store(entry: dict, embeddings, index_type: str):
+    """
+    캐시된 청크 임베딩으로 인덱스 종류별 벡터 저장소를 만듭니다.
+    INDEX_SHARDING="source"이면 앱과 같이 원본 파일별 샤드 묶음(법령명 라우팅 포함)으로 만듭니다.
+    """
+    from src import vector_store
+    from src.shards import ShardedVectorStore
+
+    chunks, ids, vectors = entry["chunks"], entry["ids"], entry["vectors"]
+    if config.INDEX_SHARDING != "source":
+        return vector_store.build_vector_store_from_embeddings(chunks, ids, vectors, embeddings, index_type)
+    positions: Dict[str, List[int]] = {}
+    for i, doc in enumerate(chunks):
+        positions.setdefault(doc.metadata.get("source", ""), []).append(i)
+    shards = {
+        source: vector_store.build_vector_store_from_embeddings(
+            [chunks[i] for i in rows], [ids[i] for i in rows], vectors[rows], embeddings, index_type,
+        )
+        for source, rows in positions.items()
+    }
+    return ShardedVectorStore(shards, embeddings, {source: data_loader.law_name_from_source(source) for source in shards})
+
+def make_retriever(db, bm25_index, k: int, fetch_k: int):
+    """앱과 같은 기본 리트리버(retrieval.get_base_retriever)를 만들되, BM25 인덱스는 청킹 설정별로 재사용합니다."""
+    from src import retrieval
+
+    if not config.HYBRID_RETRIEVAL:
+        return retrieval.DenseRetriever(vector_store=db, k=k)
+    return retrieval.HybridRetriever(vector_store=db, bm25_index=bm25_index, k=k, fetch_k=fetch_k)
+
+def retrieval_depths(grid: dict) -> List[Tuple[int, int]]:
+    """(k, fetch_k) 조합입니다. fetch_k는 k 이상으로 올리며, FAISS 단독 검색에서는 fetch_k를 쓰지 않으므로 k와 같게 둡니다."""
+    depths = []
+    for k, fetch_k in itertools.product(grid["k"], grid["fetch_k"]):
+        depth = (k, max(fetch_k, k) if config.HYBRID_RETRIEVAL else k)
+        if depth not in depths:
+            depths.append(depth)
+    return depths
+
+def config_name(row: dict) -> str:
+    return (f"cs{row['chunk_size']}_ov{row['overlap']}_as{int(row['article_split'])}"
+            f"_{row['index_type']}_k{row['k']}_f{row['fetch_k']}_n{row['top_n']}")
+
+def sweep(cache: ChunkingCache, grid: dict, questions: List[str], references: List[List[Key]], compressor) -> List[dict]:
+    """격자의 모든 설정에 대해 검색(hit@k, MRR)과 재순위화 후(hit@top_n, MRR) 지표, 지연 시간을 계산합니다."""
+    from src import reranker
+
+    # ground_truth가 조문을 인용한 질문만 지표 계산에 사용합니다.
+    scored = [(question, refs) for question, refs in zip(questions, references) if refs]
+    rows = []
+    for chunking in itertools.product(grid["chunk_sizes"], grid["overlaps"], grid["article_splits"]):
+        if chunking[1] >= chunking[0]:
+            print(f"건너뜀: OVERLAP({chunking[1]})이 CHUNK_SIZE({chunking[0]}) 이상입니다.")
+            continue
+        entry = cache.get(chunking)
+        for index_type in grid["index_types"]:
+            start = time.perf_counter()
+            db = build_store(entry, cache.embeddings, index_type)
+            build_seconds = time.perf_counter() - start
+            for k, fetch_k in retrieval_depths(grid):
+                retriever = make_retriever(db, entry["bm25"], k, fetch_k)
+                candidates, retrieve_seconds = [], 0.0
+                for question, _ in scored:
+                    start = time.perf_counter()
+                    candidates.append(retriever.invoke(question))
+                    retrieve_seconds += time.perf_counter() - start
+                retrieved = retrieval_metrics([first_relevant_rank(docs, refs) for docs, (_, refs) in zip(candidates, scored)], "retrieval")
+
+                for top_n in grid["top_n"]:
+                    # 점수 캐시를 끈 재순위화 단계(main 참고)이므로 top_n만 바꿔 재사용해도 격자점마다 모든 후보를 새로 채점합니다.
+                    compressor.top_n = top_n
+                    ranks, rerank_seconds, pairs = [], 0.0, 0
+                    for docs, (question, refs) in zip(candidates, scored):
+                        start = time.perf_counter()
+                        final, stats = reranker.rerank_with_stats(compressor, docs, question)
+                        rerank_seconds += time.perf_counter() - start
+                        pairs += stats.get("scored", len(docs))
+                        ranks.append(first_relevant_rank(final, refs))
+                    count = max(len(scored), 1)
+                    row = {
+                        "chunk_size": chunking[0], "overlap": chunking[1], "article_split": chunking[2],
+                        "index_type": index_type, "k": k, "fetch_k": fetch_k, "top_n": top_n,
+                        "chunks": len(entry["chunks"]), "questions": len(scored),
+                        **retrieved, **retrieval_metrics(ranks, "final"),
+                        "retrieve_ms": round(retrieve_seconds / count * 1000, 2),
+                        "rerank_ms": round(rerank_seconds / count * 1000, 2),
+                        "rerank_pairs": round(pairs / count, 1),
+                        "index_build_seconds": round(build_seconds, 3),
+                        "embed_seconds": round(entry["embed_seconds"], 3),
+                    }
+                    row["name"] = config_name(row)
+                    print(f"{row['name']}: retrieval hit {row['retrieval_hit']} mrr {row['retrieval_mrr']} / "
+                          f"final hit {row['final_hit']} mrr {row['final_mrr']}")
+                    rows.append(row)
+    return rows
+
+def run_ragas(row: dict, cache: ChunkingCache, cross_encoder, work_dir: str, dataset_path: str, concurrency: int) -> Dict[str, float]:
+    """
+    후보로 고른 설정 하나를 앱과 같은 RAG 체인으로 구성하여 evaluate.py의 Ragas 평가를 실행하고 지표 평균을 반환합니다.
+    질문별 답변은 설정별 체크포인트에 기록되므로, 중단되면 같은 명령으로 이어서 실행됩니다.
+    """
+    import evaluate
+    from src import article_lookup, chain, reranker, table_lookup
+
+    chunking = (row["chunk_size"], row["overlap"], row["article_split"])
+    entry = cache.get(chunking)
+    apply_chunking(chunking)
+    config.RETRIEVAL_K, config.RETRIEVAL_FETCH_K, config.RERANK_TOP_N = row["k"], row["fetch_k"], row["top_n"]
+    config.ANSWER_CACHE = False
+    db = build_store(entry, cache.embeddings, row["index_type"])
+
+    # 체인이 읽는 조문/기준표 조회 인덱스를 설정별 디렉토리에 둡니다.
+    index_dir = os.path.join(work_dir, row["name"])
+    os.makedirs(index_dir, exist_ok=True)
+    article_lookup.build_article_index(db).save(index_dir)
+    table_lookup.build_table_index(db).save(index_dir)
+    rag_chain = chain.build_rag_chain(
+        db, cache.embeddings, compressor=reranker.get_reranker(row["top_n"], model=cross_encoder), index_dir=index_dir,
+    )
+    dataset = evaluate.create_evaluation_dataset(
+        os.path.join(work_dir, f"checkpoint_{row['name']}.jsonl"),
+        concurrency=concurrency, rag_chain=rag_chain, dataset_path=dataset_path,
+    )
+    result = evaluate.run_evaluation(dataset).to_pandas()
+    result.to_csv(os.path.join(work_dir, f"evaluation_result_{row['name']}.csv"), index=False, encoding="utf-8-sig")
+    return {f"ragas_{metric}": round(float(result[metric].mean()), 4) for metric in RAGAS_METRICS if metric in result}
+
+def load_models(fake_models: bool):
+    """(임베딩, cross-encoder)를 로드합니다. fake_models이면 benchmark.py의 다운로드 없는 대체 모델을 씁니다."""
+    if fake_models:
+        import benchmark
+        return benchmark.HashingEmbeddings(), benchmark.OverlapCrossEncoder()
+    from src import reranker, vector_store
+    return vector_store.get_embedding_model(), reranker.get_cross_encoder()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="청킹/검색 k/재순위화 top_n/인덱스 종류 격자를 LLM 없는 검색 지표로 비교하고, 상위 설정만 Ragas로 평가합니다.",
+    )
+    parser.add_argument("--chunk-sizes", default=str(config.CHUNK_SIZE), help="쉼표로 구분한 CHUNK_SIZE 목록")
+    parser.add_argument("--overlaps", default=str(config.OVERLAP), help="쉼표로 구분한 OVERLAP 목록")
+    parser.add_argument("--article-split", default=str(int(config.ARTICLE_SPLIT)), help="ARTICLE_SPLIT 목록 (예: 1,0)")
+    parser.add_argument("--k", default=str(config.RETRIEVAL_K), help="쉼표로 구분한 RETRIEVAL_K 목록")
+    parser.add_argument("--fetch-k", default=str(config.RETRIEVAL_FETCH_K), help="쉼표로 구분한 RETRIEVAL_FETCH_K 목록")
+    parser.add_argument("--top-n", default=str(config.RERANK_TOP_N), help="쉼표로 구분한 RERANK_TOP_N 목록")
+    parser.add_argument("--index-types", default=config.INDEX_TYPE, help="쉼표로 구분한 INDEX_TYPE 목록")
+    parser.add_argument("--dataset", default="eval_dataset.csv", help="question, ground_truth 열이 있는 평가 데이터셋")
+    parser.add_argument("--rank-by", choices=["final_mrr", "final_hit", "retrieval_mrr", "retrieval_hit"], default="final_mrr")
+    parser.add_argument("--shortlist", type=int, default=2, help="Ragas로 평가할 상위 설정 수 (0이면 검색 지표만 계산)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Ragas 평가 시 동시에 실행할 질문 수")
+    parser.add_argument("--work-dir", default="sweep_work", help="설정별 조회 인덱스/Ragas 체크포인트 디렉토리")
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--fake-models", action="store_true", help="임베딩/재순위화 모델 대신 해시 임베딩/겹침 점수 사용 (Ragas 제외)")
+    args = parser.parse_args()
+
+    grid = {
+        "chunk_sizes": parse_list(args.chunk_sizes, int),
+        "overlaps": parse_list(args.overlaps, int),
+        "article_splits": [value == "1" for value in parse_list(args.article_split)],
+        "k": parse_list(args.k, int),
+        "fetch_k": parse_list(args.fetch_k, int),
+        "top_n": parse_list(args.top_n, int),
+        "index_types": parse_list(args.index_types),
+    }
+
+    from src import reranker, vector_store
+    for index_type in grid["index_types"]:
+        vector_store.index_build_params(index_type)  # 지원하지 않는 인덱스 종류는 시작 전에 오류로 알립니다.
+
+    print("1. 문서 로드...")
+    start = time.perf_counter()
+    documents = data_loader.load_all_documents()
+    if not documents:
+        raise ValueError(f"'{config.DATA_DIR}' 디렉토리에 문서가 없습니다.")
+    laws = {data_loader.law_name_from_source(doc.metadata.get("source", "")) for doc in documents}
+    questions, references = load_ground_truth(args.dataset, laws)
+    print(f"문서 {len(documents)}개 ({time.perf_counter() - start:.1f}s), "
+          f"조문 인용이 있는 질문 {sum(bool(refs) for refs in references)}/{len(questions)}개")
+
+    print("2. 격자 탐색 (검색 지표)...")
+    # 격자점마다 같은 질문을 다시 실행하므로, 질문 임베딩/재순위화 점수 캐시를 끄고 지연 시간과 채점 수를 캐시 없는 상태로 비교합니다.
+    config.QUERY_CACHE_SIZE = config.RERANK_CACHE_SIZE = 0
+    embeddings, cross_encoder = load_models(args.fake_models)
+    # 첫 격자점에만 모델 워밍업 비용이 실리지 않도록 미리 한 번 실행합니다.
+    embeddings.embed_query(questions[0])
+    cross_encoder.score([(questions[0], questions[0])])
+    cache = ChunkingCache(documents, embeddings)
+    rows = sweep(cache, grid, questions, references, reranker.get_reranker(model=cross_encoder))
+    rows.sort(key=lambda row: (row[args.rank_by] or 0.0, row["final_hit"] or 0.0), reverse=True)
+
+    if args.shortlist and not args.fake_models:
+        print(f"3. 상위 {args.shortlist}개 설정 Ragas 평가...")
+        os.makedirs(args.work_dir, exist_ok=True)
+        for row in rows[:args.shortlist]:
+            print(f"--- {row['name']} ---")
+            row.update(run_ragas(row, cache, cross_encoder, args.work_dir, args.dataset, args.concurrency))
+
+    df = pd.DataFrame(rows)
+    df.insert(0, "timestamp", datetime.now().isoformat(timespec="seconds"))
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    columns = ["name", "retrieval_hit", "retrieval_mrr", "final_hit", "final_mrr", "rerank_ms"]
+    columns += [column for column in df.columns if column.startswith("ragas_")]
+    print(df[columns].to_string(index=False))
+    print(f"\n'{args.output}' 파일로 스윕 결과가 저장되었습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from langchain.docstore.document import Document
+
+from benchmark import HashingEmbeddings
+from src.answer_cache import SemanticAnswerCache, citation_signature
+
+def _result(answer):
+    return {"answer": answer, "context": [Document(page_content="근거", metadata={"source": "근로기준법.txt"})]}
+
+def _cache(**kwargs):
+    params = dict(threshold=0.5, max_entries=10, ttl_seconds=0)
+    params.update(kwargs)
+    return SemanticAnswerCache(HashingEmbeddings(), "fp", **params)
+
+def test_similar_question_with_same_citations_hits():
+    cache = _cache()
+    cache.store("근로기준법 제60조 연차 유급휴가는 며칠인가요?", _result("15일"))
+    hit = cache.lookup("근로기준법 제60조의 연차 유급휴가는 며칠이야?")
+    assert hit["answer"] == "15일" and hit["context"][0].metadata["source"] == "근로기준법.txt"
+
+def test_different_article_or_subordinate_law_misses():
+    """임베딩이 거의 같아도 조 번호나 하위 법령이 다르면 다른 질문의 답을 반환하지 않습니다."""
+    cache = _cache(threshold=0.0)
+    cache.store("근로기준법 제60조 연차 유급휴가는?", _result("제60조 답변"))
+    cache.store("근로기준법 시행령 제33조 연차 유급휴가는?", _result("시행령 답변"))
+    assert cache.lookup("근로기준법 제61조 연차 유급휴가는?") is None
+    assert cache.lookup("근로기준법 시행규칙 제33조 연차 유급휴가는?") is None
+    assert cache.lookup("시행령 제33조 연차 유급휴가는?") is None
+    assert cache.lookup("근로기준법 시행령 제33조 연차 유급휴가 기준은?")["answer"] == "시행령 답변"
+    assert citation_signature("근로기준법 제60조") != citation_signature("근로기준법 제 61 조")
+
+def test_expired_entries_are_not_returned():
+    cache = _cache(ttl_seconds=60)
+    cache.store("근로기준법 제60조 연차 유급휴가는?", _result("15일"))
+    assert cache.lookup("근로기준법 제60조 연차 유급휴가는?") is not None
+    cache._entries["근로기준법 제60조 연차 유급휴가는?"]["created_at"] -= 61
+    assert cache.lookup("근로기준법 제60조 연차 유급휴가는?") is None
+    assert cache.stats()["entries"] == 0
+
+def test_entries_persist_until_fingerprint_changes():
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "answers.jsonl")
+        _cache(path=path).store("근로기준법 제60조 연차 유급휴가는?", _result("15일"))
+        assert _cache(path=path).lookup("근로기준법 제60조 연차 유급휴가는?")["answer"] == "15일"
+        changed = SemanticAnswerCache(HashingEmbeddings(), "other", path=path, threshold=0.5, ttl_seconds=0)
+        assert changed.lookup("근로기준법 제60조 연차 유급휴가는?") is None
+
+
+if __name__ == "__main__":
+    test_similar_question_with_same_citations_hits()
+    test_different_article_or_subordinate_law_misses()
+    test_expired_entries_are_not_returned()
+    test_entries_persist_until_fingerprint_changes()
+    print("[PASS] answer_cache")
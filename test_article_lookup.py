@@ -0,0 +1,45 @@
+from langchain.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+
+from src.article_lookup import ArticleIndex
+from src.data_loader import split_statute_articles
+
+STATUTE = """근로기준법
+제1장 총칙
+제1조(목적) 이 법은 근로조건의 기준을 정한다.
+제60조(연차 유급휴가) ① 사용자는 1년간 80퍼센트 이상 출근한 근로자에게 15일의 유급휴가를 주어야 한다.
+제60조의2(휴가의 사용) 사용자는 휴가를 사용하도록 촉진할 수 있다.
+부칙
+제1조(시행일) 이 법은 공포한 날부터 시행한다."""
+
+def _index():
+    """근로기준법 텍스트를 조문 단위로 나누어 docstore와 조회 인덱스를 만듭니다."""
+    chunks = split_statute_articles(Document(page_content=STATUTE, metadata={"source": "근로기준법(법률).txt"}))
+    docs = {f"id{i}": chunk for i, chunk in enumerate(chunks)}
+    return ArticleIndex.from_documents(docs.items()), InMemoryDocstore(docs)
+
+def test_articles_are_split_and_indexed():
+    index, _ = _index()
+    assert set(index.articles) == {("근로기준법", "1"), ("근로기준법", "60"), ("근로기준법", "60의2")}
+
+def test_cited_articles_are_returned_in_order():
+    index, docstore = _index()
+    docs = index.lookup("근로기준법 제 60 조의 2와 제60조제1항의 차이는?", docstore)
+    assert [doc.metadata["article"] for doc in docs] == ["60의2", "60"]
+    assert index.lookup("연차 유급휴가는 며칠인가요?", docstore) == []
+
+def test_partially_indexed_citation_falls_back_to_retrieval():
+    """인용한 조문 중 하나라도 색인되어 있지 않으면 빈 목록을 반환하여 검색 경로로 넘깁니다."""
+    index, docstore = _index()
+    assert index.lookup("근로기준법 제60조 및 시행령 제33조에 따른 휴가 기준", docstore) == []
+    assert index.lookup("근로기준법 제60조와 제99조", docstore) == []
+    assert index.lookup("근로기준법 제60조와 산업안전보건법 제5조", docstore) == []
+    assert index.lookup("근로기준법 시행령 제60조", docstore) == []
+    assert index.references("근로기준법 제60조와 제99조") == [("근로기준법", "60"), ("근로기준법", "99")]
+
+
+if __name__ == "__main__":
+    test_articles_are_split_and_indexed()
+    test_cited_articles_are_returned_in_order()
+    test_partially_indexed_citation_falls_back_to_retrieval()
+    print("[PASS] article_lookup")
@@ -0,0 +1,38 @@
+from langchain.docstore.document import Document
+
+from src.context_packing import pack_context
+
+SOURCE = "[별표 31] 체력검정 기준.pdf"
+PAGE_TEXT = "구분 종목 등급 25세이하 26~30세\n남군 팔굽혀펴기 특급 72 70\n1급 64 62\n여군 팔굽혀펴기 특급 35 33"
+
+def _page():
+    return Document(page_content=PAGE_TEXT, metadata={"source": SOURCE, "page": 3, "type": "text"})
+
+def test_complex_table_row_is_kept_with_page_text():
+    """셀 값이 모두 페이지 본문에 있어도 complex_table_row는 구분/등급/나이 연결을 담고 있으므로 제외하지 않습니다."""
+    row = Document(
+        page_content=(f"'{SOURCE}' 문서의 체력검정 기준표에 따르면, '구분': '남군', '종목': '팔굽혀펴기', "
+                      "'등급': '1급', '나이': '26~30세' 조건의 기준은 '62'입니다."),
+        metadata={"source": SOURCE, "page": 3, "type": "complex_table_row", "category": "남군",
+                  "sport": "팔굽혀펴기", "grade": "1급", "age": "26~30세", "value": "62"},
+    )
+    for docs in ([row, _page()], [_page(), row]):
+        context, stats = pack_context(docs, budget=0)
+        assert row.page_content in context
+        assert stats["deduplicated"] == 0 and stats["passages"] == 2
+
+def test_simple_table_row_is_deduplicated_against_page_text():
+    row = Document(
+        page_content=(f"'{SOURCE}' 문서의 표에서 '구분'이(가) '남군'이고 '종목'이(가) '팔굽혀펴기'인 경우, "
+                      "세부 내용은 다음과 같습니다: 등급: 특급, 25세이하: 72."),
+        metadata={"source": SOURCE, "page": 3, "type": "table_row"},
+    )
+    context, stats = pack_context([_page(), row], budget=0)
+    assert context == PAGE_TEXT
+    assert stats["deduplicated"] == 1
+
+
+if __name__ == "__main__":
+    test_complex_table_row_is_kept_with_page_text()
+    test_simple_table_row_is_deduplicated_against_page_text()
+    print("[PASS] context_packing")
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import threading
+
+from langchain.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from benchmark import HashingEmbeddings
+from src.docstore import SQLiteDocstore, fetch_documents, iter_documents, save_sqlite_docstore
+
+DOCS = {
+    f"id{i}": Document(page_content=f"근로기준법 제{i}조", metadata={"source": "근로기준법.txt", "article": str(i)})
+    for i in range(1, 1201)
+}
+
+def test_add_mget_delete_round_trip():
+    with tempfile.TemporaryDirectory() as work_dir:
+        store = SQLiteDocstore(os.path.join(work_dir, "docstore.sqlite"))
+        store.add(DOCS)
+        assert len(store) == len(DOCS)
+        # 바인딩 변수 제한보다 많은 ID도 입력 순서대로, 없는 ID는 None으로 반환합니다.
+        ids = ["id1200", "missing", "id3"] + list(DOCS)[:1000]
+        docs = store.mget(ids)
+        assert docs[0].page_content == "근로기준법 제1200조" and docs[1] is None
+        assert docs[2].metadata == {"source": "근로기준법.txt", "article": "3"} and docs[2].id == "id3"
+        assert len([doc for doc in docs if doc is not None]) == len(ids) - 1
+        try:
+            store.add({"id1": DOCS["id1"]})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("중복 ID는 ValueError여야 합니다.")
+        store.delete(["id1", "id2"])
+        assert store.mget(["id1", "id2", "id4"])[:2] == [None, None]
+        assert isinstance(store.search("id1"), str) and store.search("id4").page_content == "근로기준법 제4조"
+        store.close()
+
+def test_backup_and_save_from_in_memory_store():
+    embeddings = HashingEmbeddings(dim=16)
+    texts = [(doc.page_content, embeddings.embed_query(doc.page_content)) for doc in list(DOCS.values())[:20]]
+    db = FAISS.from_embeddings(texts, embeddings, metadatas=[doc.metadata for doc in list(DOCS.values())[:20]],
+                               ids=list(DOCS)[:20])
+    assert isinstance(db.docstore, InMemoryDocstore)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "saved.sqlite")
+        save_sqlite_docstore(db, path)
+        db.docstore = SQLiteDocstore(path)
+        assert [doc_id for doc_id, _ in iter_documents(db, batch_size=7)] == list(DOCS)[:20]
+
+        copy_path = os.path.join(work_dir, "copy.sqlite")
+        save_sqlite_docstore(db, copy_path)
+        copy = SQLiteDocstore(copy_path)
+        assert [doc.page_content for doc in fetch_documents(copy, ["id5", "id20"])] == ["근로기준법 제5조", "근로기준법 제20조"]
+        copy.close()
+        db.docstore.close()
+
+def test_concurrent_reads():
+    with tempfile.TemporaryDirectory() as work_dir:
+        store = SQLiteDocstore(os.path.join(work_dir, "docstore.sqlite"))
+        store.add(DOCS)
+        errors = []
+
+        def read(offset):
+            try:
+                ids = list(DOCS)[offset::8]
+                assert [doc.id for doc in store.mget(ids)] == ids
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.close()
+        assert not errors
+
+
+if __name__ == "__main__":
+    test_add_mget_delete_round_trip()
+    test_backup_and_save_from_in_memory_store()
+    test_concurrent_reads()
+    print("[PASS] docstore")
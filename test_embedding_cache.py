@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+import numpy as np
+
+from benchmark import HashingEmbeddings
+from src.embedding_cache import INDEX_FILE, CachedEmbeddings, QueryCacheEmbeddings
+
+class CountingEmbeddings(HashingEmbeddings):
+    """인코딩한 텍스트를 기록하는 해시 임베딩"""
+
+    def __init__(self):
+        super().__init__(dim=16)
+        self.encoded = []
+
+    def embed_documents(self, texts):
+        self.encoded.extend(texts)
+        return super().embed_documents(texts)
+
+TEXTS = ["근로기준법 제60조", "근로기준법 제61조", "산업안전보건법 제5조", "시행령 제33조"]
+
+def test_hits_and_misses_return_the_same_vectors():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CachedEmbeddings(CountingEmbeddings(), "fake", cache_dir=cache_dir)
+        first = cache.embed_documents(TEXTS)
+        second = cache.embed_documents(TEXTS)
+        assert first == second
+        assert cache.embeddings.encoded == TEXTS
+        assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 4
+        expected = np.asarray(HashingEmbeddings(dim=16).embed_documents(TEXTS), dtype=np.float16)
+        assert np.array_equal(np.asarray(first, dtype=np.float16), expected)
+
+def test_cache_is_restored_from_disk():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        vectors = CachedEmbeddings(CountingEmbeddings(), "fake", cache_dir=cache_dir).embed_documents(TEXTS)
+        reopened = CachedEmbeddings(CountingEmbeddings(), "fake", cache_dir=cache_dir)
+        assert reopened.embed_documents(TEXTS) == vectors
+        assert reopened.embeddings.encoded == []
+
+def test_eviction_reuses_slots_without_mixing_vectors():
+    """LRU로 제거된 키의 슬롯을 재사용해도, 다시 연 캐시의 키는 모두 자기 벡터를 가리킵니다."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CachedEmbeddings(CountingEmbeddings(), "fake", cache_dir=cache_dir, max_entries=2)
+        vectors = dict(zip(TEXTS, cache.embed_documents(TEXTS)))
+        assert cache.stats()["entries"] == 2
+        reopened = CachedEmbeddings(CountingEmbeddings(), "fake", cache_dir=cache_dir, max_entries=2)
+        assert reopened.embed_documents(TEXTS[2:]) == [vectors[text] for text in TEXTS[2:]]
+        assert reopened.embeddings.encoded == []
+        assert reopened.embed_documents(TEXTS[:1]) == [vectors[TEXTS[0]]]
+        # 슬롯을 넘겨받은 키의 기록보다 이전 키의 제거 기록(-1)이 먼저 있어야 합니다.
+        owners = {}
+        with open(os.path.join(reopened.cache_dir, INDEX_FILE), encoding="utf-8") as f:
+            for line in f:
+                key, slot = line.split()
+                if int(slot) < 0:
+                    owners = {s: owner for s, owner in owners.items() if owner != key}
+                else:
+                    assert owners.get(slot, key) == key
+                    owners[slot] = key
+
+def test_query_cache_normalizes_whitespace():
+    model = CountingEmbeddings()
+    cache = QueryCacheEmbeddings(model, max_size=1)
+    cache.embed_query(" 근로기준법  제60조 ")
+    cache.embed_query("근로기준법 제60조")
+    assert cache.stats()["hits"] == 1 and cache.stats()["entries"] == 1
+
+
+if __name__ == "__main__":
+    test_hits_and_misses_return_the_same_vectors()
+    test_cache_is_restored_from_disk()
+    test_eviction_reuses_slots_without_mixing_vectors()
+    test_query_cache_normalizes_whitespace()
+    print("[PASS] embedding_cache")
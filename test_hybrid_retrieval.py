@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from benchmark import HashingEmbeddings, write_synthetic_corpus
+from src import bm25, config, retrieval, vector_store
+from src.bm25 import BM25Index
+
+TEXTS = {
+    "a": "근로기준법 제60조 연차 유급휴가",
+    "b": "근로기준법 제61조 연차 유급휴가의 사용 촉진",
+    "c": "산업안전보건법 제5조 사업주의 의무",
+}
+
+def test_rrf_prefers_documents_ranked_high_in_both_lists():
+    fused = retrieval.reciprocal_rank_fusion([["a", "b", "c"], ["b", "c"]], rrf_k=60)
+    assert [doc_id for doc_id, _ in fused] == ["b", "c", "a"]
+    assert abs(dict(fused)["b"] - (1 / 62 + 1 / 61)) < 1e-12
+
+def test_bm25_search_and_allowed_filter():
+    index = BM25Index.from_texts(TEXTS.items())
+    assert index.search("근로기준법 제60조", k=1)[0][0] == "a"
+    assert [doc_id for doc_id, _ in index.search("근로기준법 제60조", k=3, allowed={"b", "c"})][0] == "b"
+
+def test_bm25_round_trip():
+    index = BM25Index.from_texts(TEXTS.items())
+    with tempfile.TemporaryDirectory() as index_dir:
+        index.save(index_dir)
+        loaded = BM25Index.load(index_dir)
+    assert loaded.doc_ids == index.doc_ids and loaded.vocabulary == index.vocabulary
+    for query in ("연차 유급휴가", "사업주 의무", "제61조"):
+        assert loaded.search(query, k=3) == index.search(query, k=3)
+
+def test_saved_bm25_index_is_reused():
+    """인덱스 아티팩트에 BM25 인덱스가 저장되어, 리트리버를 만들 때 docstore에서 다시 구축하지 않습니다."""
+    names = ("DATA_DIR", "INDEX_DIR", "INDEX_SHARDING", "DOCSTORE", "INDEX_TYPE", "PARSE_CACHE", "EMBED_CACHE",
+             "INSTRUMENTATION_LOG", "HYBRID_RETRIEVAL")
+    saved = {name: getattr(config, name) for name in names}
+    build_bm25_index = retrieval.build_bm25_index
+    builds = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            config.DATA_DIR = os.path.join(work_dir, "raw")
+            config.INDEX_DIR = os.path.join(work_dir, "index")
+            config.INDEX_SHARDING, config.DOCSTORE, config.INDEX_TYPE = "source", "sqlite", "flat"
+            config.PARSE_CACHE = config.EMBED_CACHE = False
+            config.INSTRUMENTATION_LOG = ""
+            config.HYBRID_RETRIEVAL = True
+            write_synthetic_corpus(config.DATA_DIR, laws=2, articles=5, seed=1)
+            db = vector_store.get_or_build_vector_store(HashingEmbeddings(), config.INDEX_DIR)
+            assert os.path.exists(os.path.join(config.INDEX_DIR, bm25.BM25_INDEX_FILE))
+
+            retrieval.build_bm25_index = lambda store: builds.append(store) or build_bm25_index(store)
+            retriever = retrieval.get_base_retriever(db, index_dir=config.INDEX_DIR)
+            assert builds == [] and len(retriever.bm25_index) == db.ntotal
+            assert retriever.invoke("합성법001 제3조")
+            retrieval.get_base_retriever(db)
+            assert len(builds) == 1
+    finally:
+        retrieval.build_bm25_index = build_bm25_index
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+if __name__ == "__main__":
+    test_rrf_prefers_documents_ranked_high_in_both_lists()
+    test_bm25_search_and_allowed_filter()
+    test_bm25_round_trip()
+    test_saved_bm25_index_is_reused()
+    print("[PASS] hybrid_retrieval")
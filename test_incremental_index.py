@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+from benchmark import HashingEmbeddings, write_synthetic_corpus
+from src import config, vector_store
+from src.docstore import SQLiteDocstore
+
+def _configure(work_dir: str) -> None:
+    """합성 코퍼스와 단일 인덱스(INDEX_SHARDING="none", SQLite docstore)를 쓰도록 설정을 바꿉니다."""
+    config.DATA_DIR = os.path.join(work_dir, "raw")
+    config.INDEX_DIR = os.path.join(work_dir, "index")
+    config.INDEX_SHARDING, config.DOCSTORE, config.INDEX_TYPE = "none", "sqlite", "flat"
+    config.PARSE_CACHE = config.EMBED_CACHE = False
+    config.INSTRUMENTATION_LOG = ""
+
+def _docstore_ids(index_dir: str) -> set:
+    store = SQLiteDocstore(os.path.join(index_dir, vector_store.DOCSTORE_FILE))
+    try:
+        return {row[0] for row in store._conn.execute("SELECT id FROM documents")}
+    finally:
+        store.close()
+
+def _edit_corpus(raw_dir: str) -> None:
+    """합성법001 수정, 합성법002 삭제, 합성법004 추가"""
+    with open(os.path.join(raw_dir, "합성법001.txt"), "a", encoding="utf-8") as f:
+        f.write("\n제99조(추가 조문) ① 사용자는 지체 없이 보고하여야 한다.\n")
+    os.remove(os.path.join(raw_dir, "합성법002.txt"))
+    with open(os.path.join(raw_dir, "합성법004.txt"), "w", encoding="utf-8") as f:
+        f.write("합성법004\n\n제1조(목적) ① 이 법은 합성 시험용이다.\n")
+
+def test_refresh_replaces_only_changed_files():
+    saved = {name: getattr(config, name) for name in (
+        "DATA_DIR", "INDEX_DIR", "INDEX_SHARDING", "DOCSTORE", "INDEX_TYPE", "PARSE_CACHE", "EMBED_CACHE", "INSTRUMENTATION_LOG")}
+    embeddings = HashingEmbeddings()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            _configure(work_dir)
+            write_synthetic_corpus(config.DATA_DIR, laws=3, articles=5, seed=1)
+            vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR).docstore.close()
+            before = vector_store.load_manifest(config.INDEX_DIR)["files"]
+
+            _edit_corpus(config.DATA_DIR)
+            db = vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR)
+            after = vector_store.load_manifest(config.INDEX_DIR)["files"]
+
+            assert sorted(after) == ["합성법001.txt", "합성법003.txt", "합성법004.txt"]
+            assert after["합성법003.txt"]["ids"] == before["합성법003.txt"]["ids"]
+            assert not set(after["합성법001.txt"]["ids"]) & set(before["합성법001.txt"]["ids"])
+            live_ids = _docstore_ids(config.INDEX_DIR)
+            assert live_ids == {vector_id for info in after.values() for vector_id in info["ids"]}
+            assert db.index.ntotal == len(live_ids)
+            assert not os.path.exists(config.INDEX_DIR + vector_store.REFRESH_DOCSTORE_SUFFIX)
+            db.docstore.close()
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+def test_interrupted_refresh_keeps_saved_index():
+    """교체 전에 중단되면 삭제가 저장된 SQLite docstore에 반영되지 않아, 기존 manifest와 docstore가 일치합니다."""
+    saved = {name: getattr(config, name) for name in (
+        "DATA_DIR", "INDEX_DIR", "INDEX_SHARDING", "DOCSTORE", "INDEX_TYPE", "PARSE_CACHE", "EMBED_CACHE", "INSTRUMENTATION_LOG")}
+    save_vector_store = vector_store.save_vector_store
+    embeddings = HashingEmbeddings()
+
+    def interrupted_save(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            _configure(work_dir)
+            write_synthetic_corpus(config.DATA_DIR, laws=3, articles=5, seed=1)
+            vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR).docstore.close()
+            before = vector_store.load_manifest(config.INDEX_DIR)["files"]
+
+            _edit_corpus(config.DATA_DIR)
+            vector_store.save_vector_store = interrupted_save
+            try:
+                vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR)
+            except KeyboardInterrupt:
+                pass
+            vector_store.save_vector_store = save_vector_store
+
+            assert vector_store.load_manifest(config.INDEX_DIR)["files"] == before
+            assert _docstore_ids(config.INDEX_DIR) == {vector_id for info in before.values() for vector_id in info["ids"]}
+    finally:
+        vector_store.save_vector_store = save_vector_store
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+if __name__ == "__main__":
+    test_refresh_replaces_only_changed_files()
+    test_interrupted_refresh_keeps_saved_index()
+    print("[PASS] incremental_index")
@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+from benchmark import HashingEmbeddings, write_synthetic_corpus
+from src import config, vector_store
+
+SETTINGS = ("DATA_DIR", "INDEX_DIR", "INDEX_SHARDING", "DOCSTORE", "INDEX_TYPE", "CHUNK_SIZE",
+            "PARSE_CACHE", "EMBED_CACHE", "INSTRUMENTATION_LOG")
+
+class CountingEmbeddings(HashingEmbeddings):
+    """문서 임베딩 호출 수를 세는 해시 임베딩 (인덱스를 다시 구축했는지 확인용)"""
+
+    def __init__(self):
+        super().__init__()
+        self.documents = 0
+
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return super().embed_documents(texts)
+
+def _build(embeddings):
+    db = vector_store.get_or_build_vector_store(embeddings, config.INDEX_DIR)
+    db.docstore.close()
+    return db
+
+def test_manifest_matches_compares_settings_without_files():
+    expected = vector_store.build_manifest("abc", files={"a.txt": {"hash": "1", "ids": []}})
+    assert vector_store.manifest_matches(dict(expected, files={}), expected)
+    assert not vector_store.manifest_matches(dict(expected, corpus_fingerprint="def"), expected)
+    assert vector_store.manifest_matches(dict(expected, corpus_fingerprint="def"), expected, ["embed_model"])
+    assert not vector_store.manifest_matches(None, expected)
+
+def test_saved_index_is_reused_until_settings_change():
+    saved = {name: getattr(config, name) for name in SETTINGS}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            config.DATA_DIR = os.path.join(work_dir, "raw")
+            config.INDEX_DIR = os.path.join(work_dir, "index")
+            config.INDEX_SHARDING, config.DOCSTORE, config.INDEX_TYPE = "none", "sqlite", "flat"
+            config.PARSE_CACHE = config.EMBED_CACHE = False
+            config.INSTRUMENTATION_LOG = ""
+            write_synthetic_corpus(config.DATA_DIR, laws=2, articles=5, seed=1)
+
+            embeddings = CountingEmbeddings()
+            first = _build(embeddings)
+            built = embeddings.documents
+            assert built == first.index.ntotal > 0
+            manifest = vector_store.load_manifest(config.INDEX_DIR)
+
+            # 설정과 코퍼스가 같으면 저장된 인덱스를 그대로 불러옵니다.
+            assert _build(embeddings).index.ntotal == first.index.ntotal
+            assert embeddings.documents == built
+            assert vector_store.load_manifest(config.INDEX_DIR) == manifest
+
+            # 청킹 설정이 바뀌면 전체 재구축합니다.
+            config.CHUNK_SIZE = saved["CHUNK_SIZE"] // 2
+            _build(embeddings)
+            assert embeddings.documents > built
+            assert vector_store.load_manifest(config.INDEX_DIR)["chunk_size"] == config.CHUNK_SIZE
+
+            # 손상된 manifest는 없는 것으로 보고 재구축합니다.
+            with open(os.path.join(config.INDEX_DIR, vector_store.MANIFEST_FILE), "w", encoding="utf-8") as f:
+                f.write("{")
+            assert vector_store.load_manifest(config.INDEX_DIR) is None
+            rebuilt = embeddings.documents
+            _build(embeddings)
+            assert embeddings.documents > rebuilt
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+if __name__ == "__main__":
+    test_manifest_matches_compares_settings_without_files()
+    test_saved_index_is_reused_until_settings_change()
+    print("[PASS] index_manifest")
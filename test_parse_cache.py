@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+
+from langchain.docstore.document import Document
+
+from src import config, data_loader, doc_cache
+
+def _fake_parser(calls, error_paths=()):
+    """pdfplumber 대신 파일 내용을 한 페이지 문서로 돌려주는 parse_pdf_pages (호출한 경로를 calls에 기록)"""
+    def parse_pdf_pages(pdf_path, start=0, end=None):
+        calls.append(os.path.basename(pdf_path))
+        part = data_loader._empty_part(error=pdf_path in error_paths)
+        with open(pdf_path, encoding="utf-8") as f:
+            text = f.read()
+        part["documents"].append(Document(page_content=text, metadata={"source": os.path.basename(pdf_path), "page": 1}))
+        part["pages"] = 1
+        return part
+    return parse_pdf_pages
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def test_cache_key_covers_name_content_and_parser_version():
+    key = doc_cache.make_cache_key("a.pdf", "hash", "2")
+    assert key == doc_cache.make_cache_key("a.pdf", "hash", "2")
+    assert len({key, doc_cache.make_cache_key("b.pdf", "hash", "2"),
+                doc_cache.make_cache_key("a.pdf", "other", "2"), doc_cache.make_cache_key("a.pdf", "hash", "3")}) == 4
+
+def test_pdfs_are_parsed_only_when_name_content_or_parser_changes():
+    saved = (config.PARSE_CACHE, config.PARSED_CACHE_DIR, data_loader.parse_pdf_pages, data_loader.PARSER_VERSION)
+    calls = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            config.PARSE_CACHE = True
+            config.PARSED_CACHE_DIR = os.path.join(work_dir, "cache")
+            data_loader.parse_pdf_pages = _fake_parser(calls)
+            path = os.path.join(work_dir, "a.pdf")
+            _write(path, "버전 1")
+
+            first = data_loader.load_pdf_files([path], workers=1)[path]
+            assert calls == ["a.pdf"]
+            cached = data_loader.load_pdf_files([path], workers=1)[path]
+            assert calls == ["a.pdf"]
+            assert [(doc.page_content, doc.metadata) for doc in cached] == [(doc.page_content, doc.metadata) for doc in first]
+
+            _write(path, "버전 2")
+            assert data_loader.load_pdf_files([path], workers=1)[path][0].page_content == "버전 2"
+            assert calls == ["a.pdf", "a.pdf"]
+
+            # 내용이 같아도 파일명이 다르면 metadata의 source가 달라지므로 다시 파싱합니다.
+            copy = os.path.join(work_dir, "b.pdf")
+            shutil.copy(path, copy)
+            assert data_loader.load_pdf_files([copy], workers=1)[copy][0].metadata["source"] == "b.pdf"
+            assert calls[-1] == "b.pdf"
+
+            data_loader.PARSER_VERSION = saved[3] + "-test"
+            data_loader.load_pdf_files([path], workers=1)
+            assert calls[-1] == "a.pdf" and len(calls) == 4
+    finally:
+        config.PARSE_CACHE, config.PARSED_CACHE_DIR, data_loader.parse_pdf_pages, data_loader.PARSER_VERSION = saved
+
+def test_failed_parse_is_not_cached():
+    saved = (config.PARSE_CACHE, config.PARSED_CACHE_DIR, data_loader.parse_pdf_pages)
+    calls = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            config.PARSE_CACHE = True
+            config.PARSED_CACHE_DIR = os.path.join(work_dir, "cache")
+            path = os.path.join(work_dir, "broken.pdf")
+            _write(path, "깨진 파일")
+            data_loader.parse_pdf_pages = _fake_parser(calls, error_paths={path})
+            data_loader.load_pdf_files([path], workers=1)
+            data_loader.load_pdf_files([path], workers=1)
+            assert calls == ["broken.pdf", "broken.pdf"]
+    finally:
+        config.PARSE_CACHE, config.PARSED_CACHE_DIR, data_loader.parse_pdf_pages = saved
+
+
+if __name__ == "__main__":
+    test_cache_key_covers_name_content_and_parser_version()
+    test_pdfs_are_parsed_only_when_name_content_or_parser_changes()
+    test_failed_parse_is_not_cached()
+    print("[PASS] parse_cache")
@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import List, Tuple
+
+from langchain.docstore.document import Document
+from langchain_community.cross_encoders import BaseCrossEncoder
+
+from src.reranker import AdaptiveCrossEncoderReranker
+
+class FixedScoreCrossEncoder(BaseCrossEncoder):
+    """청크 본문별로 정해 둔 점수를 돌려주는 cross-encoder (delay초 대기)"""
+
+    def __init__(self, scores: dict, delay: float = 0.0):
+        self.scores = scores
+        self.delay = delay
+        self.calls: List[str] = []
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        time.sleep(self.delay)
+        self.calls.extend(text for _, text in text_pairs)
+        return [self.scores[text] for _, text in text_pairs]
+
+# (본문, cross-encoder 점수, dense_score) - d4는 밀집 점수는 낮지만 가장 관련 있는 후보입니다.
+CANDIDATES = [
+    ("d0", 0.80, 0.60), ("d1", 0.70, 0.55), ("d2", 0.10, 0.30),
+    ("d3", 0.20, 0.30), ("d4", 0.90, 0.30), ("d5", 0.00, 0.20),
+]
+
+def _docs(bm25_only=()):
+    return [
+        Document(page_content=text, metadata={} if text in bm25_only else {"dense_score": dense})
+        for text, _, dense in CANDIDATES
+    ]
+
+def _reranker(**kwargs):
+    model = FixedScoreCrossEncoder({text: score for text, score, _ in CANDIDATES})
+    params = dict(model=model, top_n=2, batch_size=2, stop_score=0.95, dense_slack=0.35, cache_size=0)
+    params.update(kwargs)
+    return AdaptiveCrossEncoderReranker(**params)
+
+def test_dense_bound_is_off_by_default():
+    reranker = _reranker()
+    docs, stats = reranker.rerank(_docs(), "질문")
+    assert [doc.page_content for doc in docs] == ["d4", "d0"]
+    assert stats["skipped"] == 0 and stats["stop_reason"] == "exhausted"
+
+def test_dense_bound_skips_candidates_with_low_dense_score():
+    """추정치(0.30 + 0.35 = 0.65)가 2번째 점수(0.70)보다 낮아 d2~d5를 채점하지 않으므로 d4(0.90)를 놓칩니다."""
+    reranker = _reranker(dense_bound=True)
+    docs, stats = reranker.rerank(_docs(), "질문")
+    assert reranker.model.calls == ["d0", "d1"]
+    assert [doc.page_content for doc in docs] == ["d0", "d1"]
+    assert stats == {"candidates": 6, "scored": 2, "cached": 0, "skipped": 4, "stop_reason": "dense_bound"}
+
+def test_dense_bound_scores_candidates_without_dense_score():
+    """BM25로만 찾은 후보(dense_score 없음)가 남아 있으면 종료하지 않습니다."""
+    reranker = _reranker(dense_bound=True)
+    docs, stats = reranker.rerank(_docs(bm25_only={"d4"}), "질문")
+    assert reranker.model.calls == ["d0", "d1", "d2", "d3", "d4", "d5"]
+    assert [doc.page_content for doc in docs] == ["d4", "d0"]
+
+def test_score_margin_stops_when_top_n_is_certain():
+    reranker = _reranker(stop_score=0.7)
+    docs, stats = reranker.rerank(_docs(), "질문")
+    assert stats["stop_reason"] == "score_margin" and stats["skipped"] == 4
+    assert [doc.page_content for doc in docs] == ["d0", "d1"]
+
+def test_stats_are_returned_per_call_under_concurrency():
+    model = FixedScoreCrossEncoder({text: score for text, score, _ in CANDIDATES}, delay=0.01)
+    reranker = AdaptiveCrossEncoderReranker(model=model, top_n=1, batch_size=1, stop_score=2.0, cache_size=0)
+    results = {}
+
+    def run(count):
+        results[count] = reranker.rerank(_docs()[:count], f"질문 {count}")[1]
+
+    threads = [threading.Thread(target=run, args=(count,)) for count in range(1, 7)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(stats["candidates"] == stats["scored"] == count for count, stats in results.items())
+
+
+if __name__ == "__main__":
+    test_dense_bound_is_off_by_default()
+    test_dense_bound_skips_candidates_with_low_dense_score()
+    test_dense_bound_scores_candidates_without_dense_score()
+    test_score_margin_stops_when_top_n_is_certain()
+    test_stats_are_returned_per_call_under_concurrency()
+    print("[PASS] reranker")
@@ -0,0 +1,71 @@
+import numpy as np
+from langchain.docstore.document import Document
+
+from benchmark import HashingEmbeddings
+from src import config, vector_store
+from src.shards import ShardedVectorStore
+
+# 샤드 키(원본 파일) → (법령명, 청크 본문 목록)
+CORPUS = {
+    "근로기준법.txt": ("근로기준법", ["제60조 연차 유급휴가", "제61조 연차 유급휴가의 사용 촉진", "제50조 근로시간"]),
+    "근로기준법 시행령.txt": ("근로기준법 시행령", ["제33조 연차 유급휴가의 계산", "제30조 휴일"]),
+    "산업안전보건법.txt": ("산업안전보건법", ["제5조 사업주 등의 의무", "제29조 안전보건교육"]),
+}
+
+def _store(workers=2):
+    embeddings = HashingEmbeddings(dim=64)
+    shards, laws = {}, {}
+    saved = config.INDEX_TYPE
+    config.INDEX_TYPE = "flat"
+    try:
+        for key, (law, texts) in CORPUS.items():
+            docs = [Document(page_content=f"{law} {text}", metadata={"source": key}) for text in texts]
+            ids = [f"{key}#{i}" for i in range(len(docs))]
+            vectors = np.array(embeddings.embed_documents([doc.page_content for doc in docs]))
+            shards[key] = vector_store.build_vector_store_from_embeddings(docs, ids, vectors, embeddings)
+            laws[key] = law
+    finally:
+        config.INDEX_TYPE = saved
+    return ShardedVectorStore(shards, embeddings, laws, workers=workers)
+
+def test_route_selects_cited_laws():
+    store = _store()
+    assert store.route("근로기준법 제60조 연차 유급휴가는?") == ["근로기준법.txt"]
+    assert store.route("근로기준법 시행령 제33조") == ["근로기준법 시행령.txt"]
+    assert store.route("근로기준법시행령 제33조") == ["근로기준법 시행령.txt"]
+    assert store.route("산업안전보건법과 근로기준법의 차이") == ["산업안전보건법.txt", "근로기준법.txt"]
+    assert store.route("연차 유급휴가는 며칠인가요?") is None
+
+def test_unindexed_subordinate_law_searches_all_shards():
+    """색인되지 않은 하위 법령('산업안전보건법 시행령')은 상위 법령 샤드로 제한하지 않습니다."""
+    store = _store()
+    assert store.route("산업안전보건법 시행령 제5조") is None
+
+def test_parallel_shard_search_matches_exhaustive_search():
+    store = _store()
+    sequential = _store(workers=1)
+    vector = np.array([store.embeddings.embed_query("연차 유급휴가")], dtype=np.float32)
+    hits = store.search(vector, k=4)
+    assert [doc_id for doc_id, _ in hits] == [doc_id for doc_id, _ in sequential.search(vector, k=4)]
+    all_vectors = np.vstack([db.index.reconstruct_n(0, db.index.ntotal) for db in store.shards.values()])
+    distances = np.sort(((all_vectors - vector) ** 2).sum(axis=1))[:4]
+    assert np.allclose([distance for _, distance in hits], distances, atol=1e-5)
+
+def test_routed_search_and_docstore_stay_within_shards():
+    store = _store()
+    keys = store.route("근로기준법 시행령 연차 유급휴가")
+    vector = np.array([store.embeddings.embed_query("연차 유급휴가")], dtype=np.float32)
+    hits = store.search(vector, k=5, keys=keys)
+    assert hits and all(doc_id.startswith("근로기준법 시행령.txt#") for doc_id, _ in hits)
+    assert store.doc_ids(keys) == {"근로기준법 시행령.txt#0", "근로기준법 시행령.txt#1"}
+    docs = store.docstore.mget(["산업안전보건법.txt#1", "없는 ID", "근로기준법.txt#0"])
+    assert docs[0].metadata["source"] == "산업안전보건법.txt" and docs[1] is None
+    assert docs[2].page_content == "근로기준법 제60조 연차 유급휴가"
+
+
+if __name__ == "__main__":
+    test_route_selects_cited_laws()
+    test_unindexed_subordinate_law_searches_all_shards()
+    test_parallel_shard_search_matches_exhaustive_search()
+    test_routed_search_and_docstore_stay_within_shards()
+    print("[PASS] shards")
@@ -0,0 +1,52 @@
+from langchain.docstore.document import Document
+
+from src.table_lookup import FitnessTableIndex
+
+def _row(category, sport, grade, age, value):
+    return Document(
+        page_content=f"{category} {sport} {grade} {age}: {value}",
+        metadata={
+            "source": "[별표 31] 체력검정 기준.pdf", "page": 1, "type": "complex_table_row",
+            "category": category, "sport": sport, "grade": grade, "age": age, "value": value,
+        },
+    )
+
+def _index():
+    rows = []
+    for category, base in (("남군", 72), ("여군", 35)):
+        for age, offset in (("25세이하", 0), ("26~30세", -2)):
+            for grade, step in (("특급", 0), ("1급", -8)):
+                rows.append(_row(category, "팔굽혀펴기", grade, age, f"{base + offset + step}회 이상"))
+    return FitnessTableIndex.from_documents(rows)
+
+def test_unambiguous_query_is_answered():
+    index = _index()
+    assert index.match_key("26~30세 남군 팔굽혀펴기 특급 기준은?") == ("남군", "팔굽혀펴기", "특급", "26~30세")
+    assert index.match_key("28살 여군 팔굽혀펴기 1급 기준") == ("여군", "팔굽혀펴기", "1급", "26~30세")
+
+def test_ambiguous_query_falls_back_to_rag():
+    """한 요소에 값이 둘 이상 언급되면 (해시 순서와 관계없이) 직접 답하지 않습니다."""
+    index = _index()
+    assert index.lookup("26~30세 남군과 여군의 팔굽혀펴기 특급 기준 비교") is None
+    assert index.lookup("26~30세 남군 팔굽혀펴기 특급과 1급 기준 차이") is None
+    assert index.lookup("25세 이하와 26~30세 남군 팔굽혀펴기 특급 기준") is None
+    assert index.lookup("24살과 29살 남군 팔굽혀펴기 특급 기준") is None
+
+def test_colliding_rows_are_excluded():
+    rows = [
+        _row("남군", "팔굽혀펴기", "특급", "25세이하", "72회 이상"),
+        _row("남군", "팔굽혀펴기", "특급", "25세이하", "70회 이상"),
+        _row("남군", "팔굽혀펴기", "1급", "25세이하", "64회 이상"),
+        _row("남군", "팔굽혀펴기", "1급", "25세이하", "64회 이상"),
+    ]
+    index = FitnessTableIndex.from_documents(rows)
+    assert ("남군", "팔굽혀펴기", "특급", "25세이하") not in index.rows
+    assert index.rows[("남군", "팔굽혀펴기", "1급", "25세이하")]["value"] == "64회 이상"
+    assert index.lookup("25세 이하 남군 팔굽혀펴기 특급 기준") is None
+
+
+if __name__ == "__main__":
+    test_unambiguous_query_is_answered()
+    test_ambiguous_query_falls_back_to_rag()
+    test_colliding_rows_are_excluded()
+    print("[PASS] table_lookup")
@@ -0,0 +1,89 @@
+import argparse
+import time
+import faiss
+import numpy as np
+import pandas as pd
+
+from src import config, data_loader, vector_store
+
+# 인덱스 종류별로 비교할 검색 파라미터 (IVF: nprobe, HNSW: efSearch)
+SEARCH_GRID = {
+    "flat": [None],
+    "hnsw": [16, 32, 64, 128, 256],
+    "ivf_flat": [1, 4, 8, 16, 32, 64],
+    "ivf_pq": [1, 4, 8, 16, 32, 64],
+}
+
+def embed_corpus(embeddings) -> np.ndarray:
+    """현재 설정으로 코퍼스를 로드/분할하여 모든 청크의 임베딩 행렬을 만듭니다."""
+    chunks = data_loader.iter_split_documents(data_loader.iter_all_documents())
+    vectors = []
+    for batch in vector_store.batched(chunks, config.EMBED_BATCH_SIZE):
+        vectors.extend(embeddings.embed_documents([doc.page_content for doc in batch]))
+    return np.array(vectors, dtype=np.float32)
+
+def measure(index, queries: np.ndarray, ground_truth: np.ndarray, k: int, repeat: int) -> dict:
+    """질문을 하나씩 검색하여 recall@k(Flat 대비)와 p50/p99 지연 시간을 측정합니다."""
+    latencies, recalls = [], []
+    for _ in range(repeat):
+        for query, expected in zip(queries, ground_truth):
+            start = time.perf_counter()
+            _, found = index.search(query[None, :], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(set(found[0]) & set(expected)) / k)
+    return {
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류/검색 파라미터별 recall과 지연 시간을 비교합니다.")
+    parser.add_argument("--types", nargs="+", default=list(SEARCH_GRID), choices=list(SEARCH_GRID))
+    parser.add_argument("--k", type=int, default=20, help="기본 검색 후보 수 (app.py의 k와 동일)")
+    parser.add_argument("--repeat", type=int, default=5, help="지연 시간 측정을 위한 질문 반복 횟수")
+    parser.add_argument("--output", default="index_tuning_report.csv")
+    args = parser.parse_args()
+
+    embeddings = vector_store.get_embedding_model()
+    vectors = embed_corpus(embeddings)
+    if len(vectors) == 0:
+        raise ValueError(f"'{config.DATA_DIR}' 디렉토리에 문서가 없습니다.")
+    questions = pd.read_csv("eval_dataset.csv")["question"].tolist()
+    queries = np.array([embeddings.embed_query(q) for q in questions], dtype=np.float32)
+    print(f"청크 {len(vectors)}개, 질문 {len(queries)}개로 튜닝합니다.")
+
+    # Flat(정확 검색) 결과를 recall 기준으로 사용
+    exact = vector_store.create_faiss_index(vectors.shape[1], "flat")
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, args.k)
+
+    rows = []
+    for index_type in args.types:
+        start = time.perf_counter()
+        index = vector_store.create_faiss_index(vectors.shape[1], index_type, num_vectors=len(vectors))
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        build_sec = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / 2**20
+
+        for value in SEARCH_GRID[index_type]:
+            vector_store.apply_search_params(index, nprobe=value, ef_search=value)
+            row = {
+                "index_type": index_type,
+                "search_param": "" if value is None else ("efSearch" if index_type == "hnsw" else "nprobe") + f"={value}",
+                "build_sec": round(build_sec, 2),
+                "size_mb": round(size_mb, 2),
+            }
+            row.update(measure(index, queries, ground_truth, args.k, args.repeat))
+            rows.append(row)
+            print(row)
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    report.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"\n'{args.output}' 파일로 튜닝 결과가 저장되었습니다.")
+
+if __name__ == "__main__":
+    main()